@@ -5,7 +5,20 @@ import importlib.metadata
 import pytest
 
 from .get_tests import get_tests as get_tests
+from micromagnetictests import assertions as assertions
+from micromagnetictests import benchmark as benchmark
+from micromagnetictests import cache as cache
 from micromagnetictests import calculatortests as calculatortests
+from micromagnetictests import features as features
+from micromagnetictests import hooks as hooks
+from micromagnetictests import monitor as monitor
+from micromagnetictests import numpyc as numpyc
+from micromagnetictests import profiling as profiling
+from micromagnetictests import reference as reference
+from micromagnetictests import resultcache as resultcache
+from micromagnetictests import scheduler as scheduler
+from micromagnetictests import sharding as sharding
+from micromagnetictests import textures as textures
 
 __version__ = importlib.metadata.version(__package__)
 
@@ -0,0 +1,390 @@
+"""Whole-field comparisons for calculator results.
+
+The functions in this module compare ``discretisedfield.Field`` objects in all
+cells at once. They operate on the underlying arrays and therefore scale to
+large meshes. The ``reference`` can be a field defined on the same mesh, an
+array of the same shape, or a constant value that is broadcast to all cells.
+
+"""
+
+import numpy as np
+
+
+def _as_array(value, field):
+    """Array of ``value`` broadcast to the shape of ``field.array``."""
+    value = value.array if hasattr(value, "array") else value
+    return np.broadcast_to(np.asarray(value, dtype=float), field.array.shape)
+
+
+def _difference(field, reference):
+    """Norm of the difference between ``field`` and ``reference`` in all cells."""
+    return np.linalg.norm(field.array - _as_array(reference, field), axis=-1)
+
+
+def _masked(values, mask):
+    """Values in cells selected by ``mask``; all cells if ``mask`` is ``None``."""
+    return values if mask is None else values[np.asarray(mask, dtype=bool)]
+
+
+def nonzero(field):
+    """Mask of cells in which the norm of the field is not zero.
+
+    Parameters
+    ----------
+    field : discretisedfield.Field
+
+        Field to create the mask for.
+
+    Returns
+    -------
+    numpy.ndarray
+
+        Boolean array with the spatial shape of the mesh.
+
+    Examples
+    --------
+    1. Mask of a field that is zero in half of the cells.
+
+    >>> import discretisedfield as df
+    >>> import micromagnetictests as mt
+    ...
+    >>> mesh = df.Mesh(p1=(0, 0, 0), p2=(4e-9, 1e-9, 1e-9), n=(4, 1, 1))
+    >>> field = df.Field(mesh, nvdim=3, value=(0, 0, 1))
+    >>> field.array[:2] = 0
+    >>> mt.assertions.nonzero(field).ravel()
+    array([False, False,  True,  True])
+
+    """
+    return np.linalg.norm(field.array, axis=-1) > 0
+
+
+def max_error(field, reference, mask=None):
+    """Maximum norm of the difference between two fields.
+
+    Parameters
+    ----------
+    field : discretisedfield.Field
+
+        Field to be checked.
+
+    reference : discretisedfield.Field, array_like
+
+        Expected values.
+
+    mask : array_like, optional
+
+        Boolean array with the spatial shape of the mesh selecting the cells to
+        compare. If not specified, all cells are compared.
+
+    Returns
+    -------
+    float
+
+        Largest norm of the difference of any compared cell.
+
+    Examples
+    --------
+    1. Maximum error of a uniform field.
+
+    >>> import discretisedfield as df
+    >>> import micromagnetictests as mt
+    ...
+    >>> mesh = df.Mesh(p1=(0, 0, 0), p2=(4e-9, 1e-9, 1e-9), n=(4, 1, 1))
+    >>> field = df.Field(mesh, nvdim=3, value=(0, 3, 4))
+    >>> mt.assertions.max_error(field, (0, 0, 0))
+    5.0
+
+    """
+    values = _masked(_difference(field, reference), mask)
+    return float(values.max()) if values.size else 0.0
+
+
+def l2_error(field, reference, mask=None):
+    """Root-mean-square norm of the difference between two fields.
+
+    This is the discrete L2 norm of the difference normalised by the number of
+    compared cells.
+
+    Parameters
+    ----------
+    field : discretisedfield.Field
+
+        Field to be checked.
+
+    reference : discretisedfield.Field, array_like
+
+        Expected values.
+
+    mask : array_like, optional
+
+        Boolean array with the spatial shape of the mesh selecting the cells to
+        compare. If not specified, all cells are compared.
+
+    Returns
+    -------
+    float
+
+        Root-mean-square norm of the difference.
+
+    Examples
+    --------
+    1. Error of a field that differs in one out of four cells.
+
+    >>> import discretisedfield as df
+    >>> import micromagnetictests as mt
+    ...
+    >>> mesh = df.Mesh(p1=(0, 0, 0), p2=(4e-9, 1e-9, 1e-9), n=(4, 1, 1))
+    >>> field = df.Field(mesh, nvdim=3, value=(0, 0, 1))
+    >>> field.array[0] = (0, 0, 3)
+    >>> mt.assertions.l2_error(field, (0, 0, 1))
+    1.0
+
+    """
+    values = _masked(_difference(field, reference), mask)
+    return float(np.sqrt(np.mean(values**2))) if values.size else 0.0
+
+
+def subregion_errors(field, reference, norm="max"):
+    """Norm of the difference between two fields in each subregion.
+
+    Parameters
+    ----------
+    field : discretisedfield.Field
+
+        Field to be checked.
+
+    reference : discretisedfield.Field, array_like
+
+        Expected values.
+
+    norm : str, optional
+
+        Norm of the difference, either ``'max'`` or ``'l2'``. Defaults to
+        ``'max'``.
+
+    Returns
+    -------
+    dict
+
+        Dictionary mapping the names of the subregions of the mesh to the norm of
+        the difference in the cells of the subregion.
+
+    Raises
+    ------
+    ValueError
+
+        If ``norm`` is not one of the allowed values.
+
+    Examples
+    --------
+    1. Errors in two subregions.
+
+    >>> import discretisedfield as df
+    >>> import micromagnetictests as mt
+    ...
+    >>> subregions = {
+    ...     "r1": df.Region(p1=(0, 0, 0), p2=(2e-9, 1e-9, 1e-9)),
+    ...     "r2": df.Region(p1=(2e-9, 0, 0), p2=(4e-9, 1e-9, 1e-9)),
+    ... }
+    >>> mesh = df.Mesh(
+    ...     p1=(0, 0, 0), p2=(4e-9, 1e-9, 1e-9), n=(4, 1, 1), subregions=subregions
+    ... )
+    >>> field = df.Field(mesh, nvdim=3, value={"r1": (0, 0, 1), "r2": (0, 0, 2)})
+    >>> mt.assertions.subregion_errors(field, (0, 0, 1))
+    {'r1': 0.0, 'r2': 1.0}
+
+    """
+    norms = {"max": max_error, "l2": l2_error}
+    if norm not in norms:
+        raise ValueError(f"Unknown norm {norm!r}; must be one of {list(norms)}.")
+
+    errors = {}
+    for name, subregion in field.mesh.subregions.items():
+        mask = np.zeros(field.mesh.n, dtype=bool)
+        mask[field.mesh.region2slices(subregion)] = True
+        errors[name] = norms[norm](field, reference, mask=mask)
+    return errors
+
+
+def angle_error(field, reference, mask=None):
+    """Angle between two fields in all cells.
+
+    Cells in which either field has zero norm are excluded.
+
+    Parameters
+    ----------
+    field : discretisedfield.Field
+
+        Field to be checked.
+
+    reference : discretisedfield.Field, array_like
+
+        Expected values.
+
+    mask : array_like, optional
+
+        Boolean array with the spatial shape of the mesh selecting the cells to
+        compare. If not specified, all cells with non-zero norm are compared.
+
+    Returns
+    -------
+    numpy.ndarray
+
+        One-dimensional array of angles in radians in the compared cells.
+
+    Examples
+    --------
+    1. Angle between perpendicular fields.
+
+    >>> import discretisedfield as df
+    >>> import micromagnetictests as mt
+    >>> import numpy as np
+    ...
+    >>> mesh = df.Mesh(p1=(0, 0, 0), p2=(4e-9, 1e-9, 1e-9), n=(4, 1, 1))
+    >>> field = df.Field(mesh, nvdim=3, value=(0, 0, 1e6))
+    >>> mt.assertions.angle_error(field, (1, 0, 0)) / np.pi
+    array([0.5, 0.5, 0.5, 0.5])
+
+    """
+    reference = _as_array(reference, field)
+    norm = np.linalg.norm(field.array, axis=-1)
+    reference_norm = np.linalg.norm(reference, axis=-1)
+    valid = (norm > 0) & (reference_norm > 0)
+    if mask is not None:
+        valid &= np.asarray(mask, dtype=bool)
+
+    cos = np.sum(field.array[valid] * reference[valid], axis=-1) / (
+        norm[valid] * reference_norm[valid]
+    )
+    return np.arccos(np.clip(cos, -1, 1))
+
+
+def _describe(field, errors, index):
+    """Location of the worst cell for assertion messages."""
+    index = np.unravel_index(index, errors.shape)
+    point = field.mesh.index2point(index)
+    return f"cell {tuple(int(i) for i in index)} at {tuple(point.tolist())}"
+
+
+def assert_fields_close(field, reference, *, atol=0, rtol=1e-5, mask=None):
+    """Assert that two fields agree in all cells.
+
+    The check passes if in every compared cell the norm of the difference is not
+    larger than ``atol + rtol * max_norm``, where ``max_norm`` is the largest norm
+    of ``reference`` in the compared cells.
+
+    Parameters
+    ----------
+    field : discretisedfield.Field
+
+        Field to be checked.
+
+    reference : discretisedfield.Field, array_like
+
+        Expected values.
+
+    atol : numbers.Real, optional
+
+        Absolute tolerance. Defaults to 0.
+
+    rtol : numbers.Real, optional
+
+        Tolerance relative to the largest norm of ``reference``. Defaults to
+        ``1e-5``.
+
+    mask : array_like, optional
+
+        Boolean array with the spatial shape of the mesh selecting the cells to
+        compare. If not specified, all cells are compared.
+
+    Raises
+    ------
+    AssertionError
+
+        If the fields differ by more than the tolerance in any compared cell.
+
+    Examples
+    --------
+    1. Comparing a relaxed magnetisation with the expected uniform state.
+
+    >>> import discretisedfield as df
+    >>> import micromagnetictests as mt
+    ...
+    >>> mesh = df.Mesh(p1=(0, 0, 0), p2=(4e-9, 1e-9, 1e-9), n=(4, 1, 1))
+    >>> field = df.Field(mesh, nvdim=3, value=(0, 0, 1e6))
+    >>> mt.assertions.assert_fields_close(field, (0, 0, 1e6), atol=1e-3)
+    >>> mt.assertions.assert_fields_close(field, (0, 1e6, 0))
+    Traceback (most recent call last):
+    ...
+    AssertionError: ...
+
+    """
+    errors = _difference(field, reference)
+    if mask is None:
+        mask = np.ones(field.mesh.n, dtype=bool)
+    mask = np.asarray(mask, dtype=bool)
+    if not mask.any():
+        return
+
+    reference_norm = np.linalg.norm(_as_array(reference, field), axis=-1)
+    tolerance = atol + rtol * reference_norm[mask].max()
+    masked_errors = np.where(mask, errors, 0)
+    if masked_errors.max() > tolerance:
+        index = np.argmax(masked_errors)
+        raise AssertionError(
+            f"Fields differ in {np.count_nonzero(masked_errors > tolerance)} of"
+            f" {np.count_nonzero(mask)} cells (tolerance {tolerance:.6g}); maximum"
+            f" error {masked_errors.max():.6g} in {_describe(field, errors, index)},"
+            f" L2 error {l2_error(field, reference, mask=mask):.6g}."
+        )
+
+
+def assert_orientations_close(field, reference, *, max_angle, mask=None):
+    """Assert that the orientations of two fields agree in all cells.
+
+    Cells in which either field has zero norm are excluded.
+
+    Parameters
+    ----------
+    field : discretisedfield.Field
+
+        Field to be checked.
+
+    reference : discretisedfield.Field, array_like
+
+        Expected values; only the direction is compared.
+
+    max_angle : numbers.Real
+
+        Largest allowed angle in radians between the two fields.
+
+    mask : array_like, optional
+
+        Boolean array with the spatial shape of the mesh selecting the cells to
+        compare. If not specified, all cells with non-zero norm are compared.
+
+    Raises
+    ------
+    AssertionError
+
+        If the angle in any compared cell exceeds ``max_angle``.
+
+    Examples
+    --------
+    1. Checking that a field points in z direction.
+
+    >>> import discretisedfield as df
+    >>> import micromagnetictests as mt
+    ...
+    >>> mesh = df.Mesh(p1=(0, 0, 0), p2=(4e-9, 1e-9, 1e-9), n=(4, 1, 1))
+    >>> field = df.Field(mesh, nvdim=3, value=(0, 1e-3, 1))
+    >>> mt.assertions.assert_orientations_close(field, (0, 0, 1), max_angle=1e-2)
+
+    """
+    angles = angle_error(field, reference, mask=mask)
+    if angles.size and angles.max() > max_angle:
+        raise AssertionError(
+            f"Orientations differ in {np.count_nonzero(angles > max_angle)} of"
+            f" {angles.size} cells (maximum angle {max_angle:.6g} rad); largest"
+            f" angle {angles.max():.6g} rad."
+        )
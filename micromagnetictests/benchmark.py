@@ -0,0 +1,437 @@
+"""Helpers for performance tests of calculators.
+
+Benchmark tests are marked with ``pytest.mark.mm_benchmark`` and are only run
+if pytest is called with ``--mm-benchmark``. Measured values are attached to the
+test report with pytest's ``record_property`` and summarised at the end of the
+run.
+
+"""
+
+import functools
+import inspect
+import os
+import pathlib
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+import ubermagutil as uu
+
+
+def fit_power_law(x, y):
+    """Fit a power law :math:`y = c x^p` to measured data.
+
+    The fit is a linear least-squares fit in log-log space.
+
+    Parameters
+    ----------
+    x : array_like
+
+        Problem sizes, e.g. the number of cells. All values must be positive.
+
+    y : array_like
+
+        Measured values, e.g. the runtime. All values must be positive.
+
+    Returns
+    -------
+    tuple
+
+        Exponent :math:`p` and prefactor :math:`c`.
+
+    Raises
+    ------
+    ValueError
+
+        If fewer than two points are passed or if any value is not positive.
+
+    Examples
+    --------
+    1. Fitting data with quadratic scaling.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> exponent, prefactor = mt.benchmark.fit_power_law([1, 10, 100], [3, 300, 3e4])
+    >>> round(exponent, 6), round(prefactor, 6)
+    (2.0, 3.0)
+
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if x.size < 2 or x.shape != y.shape:
+        raise ValueError("At least two pairs of values are required for the fit.")
+    if np.any(x <= 0) or np.any(y <= 0):
+        raise ValueError("All values must be positive.")
+
+    exponent, log_prefactor = np.polyfit(np.log(x), np.log(y), 1)
+    return float(exponent), float(np.exp(log_prefactor))
+
+
+class TableMonitor:
+    """Record the times at which rows are written to the table of a running drive.
+
+    Calculators write one table row per stage (time step, field step, etc.) while
+    they run. The monitor polls the table files of new drives of ``system`` in a
+    background thread and records for every new row the time (from
+    ``time.perf_counter``) at which it was detected. It is used as a context
+    manager around ``drive``.
+
+    Parameters
+    ----------
+    system : micromagneticmodel.System
+
+        System that is driven.
+
+    dirname : str, optional
+
+        Directory passed to ``drive``. Defaults to ``'.'``.
+
+    patterns : tuple, optional
+
+        Glob patterns of table files inside the drive directory. Defaults to
+        ``('*.odt', 'table.txt')``.
+
+    interval : numbers.Real, optional
+
+        Polling interval in seconds. Defaults to ``0.01``.
+
+    Examples
+    --------
+    1. Monitoring a drive.
+
+    >>> import micromagneticmodel as mm
+    >>> import micromagnetictests as mt
+    ...
+    >>> system = mm.System(name="monitored")
+    >>> with mt.benchmark.TableMonitor(system) as monitor:
+    ...     pass  # td.drive(system, t=1e-9, n=100)
+    >>> monitor.times
+    []
+
+    """
+
+    def __init__(
+        self, system, dirname=".", patterns=("*.odt", "table.txt"), interval=0.01
+    ):
+        self.system_dir = pathlib.Path(dirname, system.name)
+        self.patterns = patterns
+        self.interval = interval
+        self.times = []
+        self._offsets = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _files(self):
+        for pattern in self.patterns:
+            yield from self.system_dir.glob(f"drive-*/{pattern}")
+
+    def _poll(self):
+        for path in self._files():
+            offset = self._offsets.setdefault(path, 0)
+            if offset is None:  # file existed before the monitor was started
+                continue
+            try:
+                with path.open("rb") as f:
+                    f.seek(offset)
+                    data = f.read()
+            except OSError:
+                continue
+            # only complete lines are processed; the rest is read again later
+            complete = data[: data.rfind(b"\n") + 1]
+            self._offsets[path] = offset + len(complete)
+            now = time.perf_counter()
+            for line in complete.splitlines():
+                line = line.strip()
+                if line:
+                    self._line(path, line, now)
+
+    def _line(self, path, line, now):
+        """Process a complete, non-empty line of a table file."""
+        if not line.startswith(b"#"):
+            self.times.append(now)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._poll()
+
+    def __enter__(self):
+        self._offsets = dict.fromkeys(self._files())
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        self._thread.join()
+        self._poll()
+
+
+class PhaseTimer:
+    """Measure the time spent in the phases of ``drive`` of an external driver.
+
+    ``micromagneticmodel.ExternalDriver.drive`` writes the input files, calls the
+    calculator, and reads the results. Within the context, the corresponding methods
+    of ``driver`` are wrapped and the time spent in each of them is accumulated in
+    ``times``.
+
+    If a driver class is passed, the methods are wrapped for all its instances,
+    including drivers created internally, e.g. by ``compute``.
+
+    Parameters
+    ----------
+    driver : micromagneticmodel.ExternalDriver, type
+
+        Driver instance or driver class to be timed.
+
+    Examples
+    --------
+    1. Timing the phases of a drive.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> # md = calculator.MinDriver()
+    >>> # with mt.benchmark.PhaseTimer(md) as timer:
+    >>> #     md.drive(system)
+    >>> # timer.times
+    >>> mt.benchmark.PhaseTimer.phases
+    ('write_input_files', 'call', 'read_data')
+
+    """
+
+    phases = ("write_input_files", "call", "read_data")
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.times = dict.fromkeys(self.phases, 0.0)
+        self._originals = {}
+
+    def _timed(self, phase, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.times[phase] += time.perf_counter() - start
+
+        return wrapper
+
+    def __enter__(self):
+        for phase in self.phases:
+            name = f"_{phase}"
+            self._originals[name] = vars(self.driver).get(name)
+            attribute = inspect.getattr_static(self.driver, name)
+            if isinstance(attribute, staticmethod):
+                wrapper = staticmethod(self._timed(phase, attribute.__func__))
+            elif isinstance(self.driver, type):
+                wrapper = self._timed(phase, attribute)
+            else:
+                wrapper = self._timed(phase, getattr(self.driver, name))
+            setattr(self.driver, name, wrapper)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        for name, original in self._originals.items():
+            if original is None:
+                delattr(self.driver, name)
+            else:
+                setattr(self.driver, name, original)
+
+
+def dry_run(driver, system, dirname, ovf_format="bin8", trace_memory=True, **kwargs):
+    """Write the input files of a drive without running the calculator.
+
+    The same steps as in ``micromagneticmodel.ExternalDriver.drive`` are performed
+    up to writing the input files, which includes sampling of time-dependent
+    parameters and serialisation of field-valued parameters. The time, the peak
+    memory allocated by Python (measured with ``tracemalloc``), and the size of the
+    written files are returned. Tracing slows down the allocation of memory, so
+    time measurements are more accurate with ``trace_memory=False``.
+
+    Parameters
+    ----------
+    driver : micromagneticmodel.ExternalDriver
+
+        Driver instance.
+
+    system : micromagneticmodel.System
+
+        System to be driven.
+
+    dirname : pathlib.Path, str
+
+        Directory into which the input files are written. It is created if it does
+        not exist.
+
+    ovf_format : str, optional
+
+        Format of the magnetisation file. Defaults to ``'bin8'``.
+
+    trace_memory : bool, optional
+
+        If ``False``, the peak memory is not measured and returned as ``None``.
+        Defaults to ``True``.
+
+    kwargs : dict
+
+        Keyword arguments passed to ``drive``, e.g. ``t`` and ``n``.
+
+    Returns
+    -------
+    dict
+
+        Dictionary with keys ``'time_s'``, ``'peak_memory_B'`` and
+        ``'input_size_B'``.
+
+    Examples
+    --------
+    1. Cost of writing the input files of a time drive.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> # td = calculator.TimeDriver()
+    >>> # mt.benchmark.dry_run(td, system, "dry-run", t=1e-6, n=100)
+
+    """
+    driver.drive_kwargs_setup(kwargs)
+    driver._check_system(system)
+
+    dirname = pathlib.Path(dirname)
+    dirname.mkdir(parents=True, exist_ok=True)
+
+    if not trace_memory:
+        start = time.perf_counter()
+        with uu.changedir(dirname):
+            driver._write_input_files(system=system, ovf_format=ovf_format, **kwargs)
+        elapsed = time.perf_counter() - start
+        peak = None
+    else:
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        try:
+            tracemalloc.reset_peak()
+            memory = tracemalloc.get_traced_memory()[0]
+            start = time.perf_counter()
+            with uu.changedir(dirname):
+                driver._write_input_files(
+                    system=system, ovf_format=ovf_format, **kwargs
+                )
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] - memory
+        finally:
+            if not tracing:
+                tracemalloc.stop()
+
+    size = sum(path.stat().st_size for path in dirname.rglob("*") if path.is_file())
+    return {"time_s": elapsed, "peak_memory_B": peak, "input_size_B": size}
+
+
+def open_file_descriptors():
+    """Number of file descriptors opened by the current process.
+
+    Returns
+    -------
+    int
+
+        Number of open file descriptors or ``None`` if it cannot be determined on
+        the current platform.
+
+    Examples
+    --------
+    1. Number of open file descriptors.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> fds = mt.benchmark.open_file_descriptors()
+
+    """
+    for fd_dir in ["/proc/self/fd", "/dev/fd"]:
+        if os.path.isdir(fd_dir):
+            return len(os.listdir(fd_dir))
+    return None
+
+
+def child_processes(pid=None):
+    """Process IDs of all descendants of a process.
+
+    The process table is read from ``/proc`` and therefore only available on Linux.
+
+    Parameters
+    ----------
+    pid : int, optional
+
+        Process ID of the parent. Defaults to the current process.
+
+    Returns
+    -------
+    list
+
+        Process IDs of children, grandchildren, etc. On platforms without ``/proc``
+        an empty list is returned.
+
+    Examples
+    --------
+    1. Descendants of the current process.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> pids = mt.benchmark.child_processes()
+
+    """
+    pid = os.getpid() if pid is None else pid
+    children = {}
+    for stat_file in pathlib.Path("/proc").glob("[0-9]*/stat"):
+        try:
+            # The second field (command name) can contain spaces and is enclosed
+            # in parentheses; the parent PID is the second field after it.
+            fields = stat_file.read_text().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue  # process finished in the meantime
+        children.setdefault(int(fields[1]), []).append(int(stat_file.parent.name))
+
+    descendants = []
+    parents = [pid]
+    while parents:
+        parent = parents.pop()
+        descendants.extend(children.get(parent, []))
+        parents.extend(children.get(parent, []))
+    return sorted(descendants)
+
+
+def growth(values):
+    """Growth of a series of measurements estimated with a linear fit.
+
+    The growth is the slope of a least-squares line through the values multiplied
+    by the length of the series. It is robust against noise in individual values
+    and is used to detect slow leaks.
+
+    Parameters
+    ----------
+    values : array_like
+
+        Measurements taken at equidistant points, e.g. after every drive.
+
+    Returns
+    -------
+    float
+
+        Fitted increase from the first to the last value.
+
+    Examples
+    --------
+    1. Growth of a series of values.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> round(mt.benchmark.growth([10, 12, 14, 16]), 3)
+    6.0
+    >>> round(mt.benchmark.growth([10, 12, 10, 12, 10, 12]), 3)
+    0.857
+
+    """
+    values = np.asarray(values, dtype=float)
+    if values.size < 2:
+        return 0.0
+    slope = np.polyfit(np.arange(values.size), values, 1)[0]
+    return float(slope * (values.size - 1))
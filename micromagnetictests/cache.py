@@ -0,0 +1,180 @@
+"""Meshes and initial fields shared between tests.
+
+Many tests build identical meshes and uniform initial magnetisations in every
+``setup_method``. The functions in this module create them once per process and
+return the cached objects afterwards.
+
+Meshes are shared and must not be modified. Fields are returned as new
+``discretisedfield.Field`` objects, because calculators update ``system.m`` in
+place; only the array of values is cached and copied into the new field.
+
+"""
+
+import discretisedfield as df
+
+from micromagnetictests.plugin import refinement_factor
+
+_meshes = {}
+_arrays = {}
+
+
+def _key(value):
+    return None if value is None else tuple(float(v) for v in value)
+
+
+def mesh(*, region=None, p1=None, p2=None, n=None, cell=None, bc="", subregions=None):
+    """Cached mesh.
+
+    The parameters are the same as for ``discretisedfield.Mesh``. Within
+    ``micromagnetictests.plugin.refined_meshes``, e.g. with ``--mm-scale``, the
+    number of cells is multiplied by the refinement factor in every direction.
+    Meshes with the same parameters and the same refinement factor are only
+    created once.
+
+    Parameters
+    ----------
+    region : discretisedfield.Region, optional
+
+        Region to be discretised. Either ``region`` or ``p1`` and ``p2`` must be
+        passed.
+
+    p1, p2 : array_like, optional
+
+        Diagonally opposite corners of the region.
+
+    n : array_like, optional
+
+        Number of discretisation cells.
+
+    cell : array_like, optional
+
+        Discretisation cell size.
+
+    bc : str, optional
+
+        Periodic boundary conditions. Defaults to ``''``.
+
+    subregions : dict, optional
+
+        Subregions of the mesh.
+
+    Returns
+    -------
+    discretisedfield.Mesh
+
+        Shared mesh. It must not be modified.
+
+    Examples
+    --------
+    1. Getting the same mesh twice.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> mesh = mt.cache.mesh(p1=(0, 0, 0), p2=(5e-9, 5e-9, 5e-9), n=(2, 2, 2))
+    >>> mt.cache.mesh(p1=(0, 0, 0), p2=(5e-9, 5e-9, 5e-9), n=(2, 2, 2)) is mesh
+    True
+
+    """
+    if region is not None:
+        p1, p2 = region.pmin, region.pmax
+    factor = refinement_factor()
+    key = (
+        factor,
+        _key(p1),
+        _key(p2),
+        _key(n),
+        _key(cell),
+        bc,
+        None
+        if subregions is None
+        else tuple(
+            (name, _key(subregion.pmin), _key(subregion.pmax))
+            for name, subregion in subregions.items()
+        ),
+    )
+    if key not in _meshes:
+        if n is not None:
+            n = tuple(int(ni) * factor for ni in n)
+        if cell is not None:
+            cell = tuple(ci / factor for ci in cell)
+        _meshes[key] = df.Mesh(
+            p1=p1, p2=p2, n=n, cell=cell, bc=bc, subregions=subregions
+        )
+    return _meshes[key]
+
+
+def field(mesh, nvdim, value, norm=None):
+    """New field with cached values.
+
+    The values are computed once for every combination of mesh, ``value``, and
+    ``norm``. Every call returns a new field, which can be modified without
+    affecting other tests.
+
+    Parameters
+    ----------
+    mesh : discretisedfield.Mesh
+
+        Mesh, usually obtained from ``mesh``.
+
+    nvdim : int
+
+        Number of value dimensions.
+
+    value : numbers.Real, tuple
+
+        Uniform value of the field.
+
+    norm : numbers.Real, optional
+
+        Norm of the field.
+
+    Returns
+    -------
+    discretisedfield.Field
+
+        Field with its own copy of the values.
+
+    Raises
+    ------
+    TypeError
+
+        If ``value`` or ``norm`` are not hashable, e.g. a callable defined inside a
+        test or a dictionary.
+
+    Examples
+    --------
+    1. Initial magnetisation.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> mesh = mt.cache.mesh(p1=(0, 0, 0), p2=(5e-9, 5e-9, 5e-9), n=(2, 2, 2))
+    >>> m = mt.cache.field(mesh, nvdim=3, value=(0, 0, 1), norm=1e6)
+    >>> m.mean()
+    array([      0.,       0., 1000000.])
+
+    """
+    if callable(value) or isinstance(value, dict):
+        raise TypeError(f"Cannot cache fields with {type(value)=}.")
+    key = (id(mesh), nvdim, value, norm)
+    if key not in _arrays:
+        array = df.Field(mesh, nvdim=nvdim, value=value, norm=norm).array
+        array.flags.writeable = False
+        # The mesh is stored to keep its id from being reused.
+        _arrays[key] = (mesh, array)
+    return df.Field(mesh, nvdim=nvdim, value=_arrays[key][1])
+
+
+def clear():
+    """Remove all cached meshes and values.
+
+    Examples
+    --------
+    1. Clearing the cache.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> mt.cache.clear()
+
+    """
+    _meshes.clear()
+    _arrays.clear()
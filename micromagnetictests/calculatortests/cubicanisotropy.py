@@ -3,6 +3,8 @@ import micromagneticmodel as mm
 import numpy as np
 import pytest
 
+import micromagnetictests as mt
+
 
 class TestCubicAnisotropy:
     @pytest.fixture(autouse=True)
@@ -22,7 +24,7 @@ class TestCubicAnisotropy:
     def test_scalar_vector_vector(self):
         name = "cubicanisotropy_scalar_vector_vector"
 
-        mesh = df.Mesh(region=self.region, cell=self.cell)
+        mesh = mt.cache.mesh(region=self.region, cell=self.cell)
 
         K = 1e5
         u1 = (0, 0, 1)
@@ -55,7 +57,7 @@ class TestCubicAnisotropy:
     def test_field_vector_vector(self):
         name = "cubicanisotropy_field_vector_vector"
 
-        mesh = df.Mesh(region=self.region, cell=self.cell)
+        mesh = mt.cache.mesh(region=self.region, cell=self.cell)
 
         def K_fun(pos):
             x, y, z = pos
@@ -87,7 +89,7 @@ class TestCubicAnisotropy:
     def test_field_field_field(self):
         name = "cubicanisotropy_field_field_field"
 
-        mesh = df.Mesh(region=self.region, cell=self.cell)
+        mesh = mt.cache.mesh(region=self.region, cell=self.cell)
 
         def K_fun(pos):
             x, y, z = pos
@@ -136,7 +138,9 @@ class TestCubicAnisotropy:
     def test_dict_vector_vector(self):
         name = "cubicanisotropy_dict_vector_vector"
 
-        mesh = df.Mesh(region=self.region, cell=self.cell, subregions=self.subregions)
+        mesh = mt.cache.mesh(
+            region=self.region, cell=self.cell, subregions=self.subregions
+        )
 
         K = {"r1": 0, "r2": 1e5}
         u1 = (0, 0, 1)
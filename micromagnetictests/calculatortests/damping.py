@@ -3,6 +3,8 @@ import micromagneticmodel as mm
 import numpy as np
 import pytest
 
+import micromagnetictests as mt
+
 
 class TestDamping:
     @pytest.fixture(autouse=True)
@@ -26,7 +28,7 @@ class TestDamping:
         alpha = 0
         Ms = 1e6
 
-        mesh = df.Mesh(region=self.region, n=self.n)
+        mesh = mt.cache.mesh(region=self.region, n=self.n)
 
         system = mm.System(name=name)
         system.energy = mm.Zeeman(H=H)
@@ -49,7 +51,7 @@ class TestDamping:
         alpha = {"r1": 0, "r2": 1}
         Ms = 1e6
 
-        mesh = df.Mesh(region=self.region, n=self.n, subregions=self.subregions)
+        mesh = mt.cache.mesh(region=self.region, n=self.n, subregions=self.subregions)
 
         system = mm.System(name=name)
         system.energy = mm.Zeeman(H=H)
@@ -72,7 +74,7 @@ class TestDamping:
     def test_field(self):
         name = "damping_field"
 
-        mesh = df.Mesh(region=self.region, n=self.n)
+        mesh = mt.cache.mesh(region=self.region, n=self.n)
 
         def value_fun(pos):
             x, y, z = pos
@@ -1,7 +1,12 @@
+import time
+
 import discretisedfield as df
 import micromagneticmodel as mm
+import numpy as np
 import pytest
 
+import micromagnetictests as mt
+
 
 class TestDemag:
     @pytest.fixture(autouse=True)
@@ -13,7 +18,7 @@ class TestDemag:
         p2 = (5e-9, 5e-9, 1e-9)
         self.cell = (1e-9, 1e-9, 1e-9)
         self.region = df.Region(p1=p1, p2=p2)
-        self.mesh = df.Mesh(region=self.region, cell=self.cell)
+        self.mesh = mt.cache.mesh(region=self.region, cell=self.cell)
 
     def test_demag(self):
         name = "demag"
@@ -60,7 +65,7 @@ class TestDemag:
         md = self.calculator.MinDriver()
 
         # 1D pbc
-        mesh = df.Mesh(region=self.region, cell=self.cell, bc="x")
+        mesh = mt.cache.mesh(region=self.region, cell=self.cell, bc="x")
         system.m = df.Field(mesh, nvdim=3, value=(0, 0, 1), norm=Ms)
 
         md.drive(system)
@@ -77,7 +82,7 @@ class TestDemag:
         md = self.calculator.MinDriver()
 
         # 2D pbc
-        mesh = df.Mesh(region=self.region, cell=self.cell, bc="xy")
+        mesh = mt.cache.mesh(region=self.region, cell=self.cell, bc="xy")
         system.m = df.Field(mesh, nvdim=3, value=(0, 0, 1), norm=Ms)
 
         if not hasattr(self.calculator, "RelaxDriver"):
@@ -99,7 +104,7 @@ class TestDemag:
         md = self.calculator.MinDriver()
 
         # 3D pbc
-        mesh = df.Mesh(region=self.region, cell=self.cell, bc="xyz")
+        mesh = mt.cache.mesh(region=self.region, cell=self.cell, bc="xyz")
         system.m = df.Field(mesh, nvdim=3, value=(0, 0, 1), norm=Ms)
 
         if not hasattr(self.calculator, "RelaxDriver"):
@@ -109,3 +114,101 @@ class TestDemag:
             md.drive(system)
 
         self.calculator.delete(system)
+
+
+@pytest.mark.mm_benchmark
+class TestDemagCost:
+    """Cost and accuracy of the demagnetisation field in thin films.
+
+    For every boundary condition and film size the demagnetisation field is
+    computed for different values of ``asymptotic_radius`` and compared with a
+    reference computed without asymptotic approximation (``asymptotic_radius=-1``).
+
+    The time per stage is obtained from two ``TimeDriver`` runs with a different
+    number of stages. The setup time is the remaining fixed cost of the run minus
+    the fixed cost of the same run without demagnetisation energy.
+
+    """
+
+    radii = [4, 8, 16, 32]
+    # The film has (10, 5, 1) * (k, k, 1) cells, i.e. 800 up to 204800 cells.
+    factors = [4, 16, 64]
+    stages = 10
+
+    @pytest.fixture(autouse=True)
+    def _setup_calculator(self, calculator):
+        self.calculator = calculator
+
+    def _run_time(self, system, n):
+        td = self.calculator.TimeDriver()
+        start = time.perf_counter()
+        td.drive(system, t=1e-12 * n, n=n)
+        return time.perf_counter() - start
+
+    def _stage_and_fixed_time(self, system):
+        short = self._run_time(system, 1)
+        long = self._run_time(system, self.stages)
+        stage = (long - short) / (self.stages - 1)
+        return stage, short - stage
+
+    @pytest.mark.parametrize("bc", ["", "x", "xy", "xyz"])
+    def test_asymptotic_radius(self, bc, record_property):
+        name = "demag_cost"
+
+        Ms = 1e6
+
+        for k in self.factors:
+            p2 = (10e-9 * k, 5e-9 * k, 1e-9)
+            mesh = df.Mesh(p1=(0, 0, 0), p2=p2, n=(10 * k, 5 * k, 1), bc=bc)
+            x, _, _ = mt.textures.coordinates(mesh)
+            phase = 2 * np.pi * x / p2[0]
+            m_init = np.stack(
+                [np.cos(phase), np.sin(phase), np.full_like(phase, 0.5)], axis=-1
+            )
+
+            system = mm.System(name=name)
+            system.dynamics = mm.Precession(gamma0=mm.consts.gamma0) + mm.Damping(
+                alpha=0.5
+            )
+            system.m = df.Field(mesh, nvdim=3, value=m_init, norm=Ms)
+            # Calculators update the array of system.m in place.
+            m0 = system.m.array.copy()
+            system.energy = mm.Demag(asymptotic_radius=-1)
+            try:
+                reference = self.calculator.compute(
+                    system.energy.demag.effective_field, system
+                )
+            except ValueError:
+                self.calculator.delete(system)
+                pytest.skip(f"Demag with {bc=} is not supported by the calculator.")
+            max_norm = mt.assertions.max_error(reference, 0)
+
+            system.energy = mm.Zeeman(H=(0, 0, 0))
+            _, baseline = self._stage_and_fixed_time(system)
+
+            errors = []
+            for radius in self.radii:
+                # Time driver runs change the magnetisation.
+                system.m = df.Field(mesh, nvdim=3, value=m0.copy())
+                system.energy = mm.Demag(asymptotic_radius=radius)
+                field = self.calculator.compute(
+                    system.energy.demag.effective_field, system
+                )
+                errors.append(mt.assertions.max_error(field, reference) / max_norm)
+
+                stage, fixed = self._stage_and_fixed_time(system)
+                record_property(
+                    f"cells={mesh.n.prod()}, asymptotic_radius={radius}",
+                    {
+                        "relative_error": float(f"{errors[-1]:.3g}"),
+                        "setup_s": round(fixed - baseline, 4),
+                        "stage_s": round(stage, 4),
+                    },
+                )
+
+            self.calculator.delete(system)
+
+            # The asymptotic approximation must become more accurate with
+            # increasing radius and must not spoil the field.
+            assert errors[-1] <= errors[0]
+            assert max(errors) < 1e-2
@@ -3,6 +3,8 @@ import micromagneticmodel as mm
 import numpy as np
 import pytest
 
+import micromagnetictests as mt
+
 
 class TestDynamics:
     @pytest.fixture(autouse=True)
@@ -27,7 +29,7 @@ class TestDynamics:
         gamma0 = 2.211e5
         Ms = 1e6
 
-        mesh = df.Mesh(region=self.region, n=self.n)
+        mesh = mt.cache.mesh(region=self.region, n=self.n)
 
         system = mm.System(name=name)
         system.energy = mm.Zeeman(H=H)
@@ -51,7 +53,7 @@ class TestDynamics:
         alpha = {"r1": 0, "r2": 1}
         Ms = 1e6
 
-        mesh = df.Mesh(region=self.region, n=self.n, subregions=self.subregions)
+        mesh = mt.cache.mesh(region=self.region, n=self.n, subregions=self.subregions)
 
         system = mm.System(name=name)
         system.energy = mm.Zeeman(H=H)
@@ -74,7 +76,7 @@ class TestDynamics:
     def test_field_field(self):
         name = "dynamics_field_field"
 
-        mesh = df.Mesh(region=self.region, n=self.n)
+        mesh = mt.cache.mesh(region=self.region, n=self.n)
 
         def alpha_fun(pos):
             x, y, z = pos
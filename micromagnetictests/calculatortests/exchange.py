@@ -3,6 +3,8 @@ import micromagneticmodel as mm
 import numpy as np
 import pytest
 
+import micromagnetictests as mt
+
 
 class TestExchange:
     @pytest.fixture(autouse=True)
@@ -35,7 +37,7 @@ class TestExchange:
         system = mm.System(name=name)
         system.energy = mm.Exchange(A=A)
 
-        mesh = df.Mesh(region=self.region, n=self.n)
+        mesh = mt.cache.mesh(region=self.region, n=self.n)
         system.m = df.Field(mesh, nvdim=3, value=self.m_init, norm=Ms)
 
         md = self.calculator.MinDriver()
@@ -54,7 +56,7 @@ class TestExchange:
         system = mm.System(name=name)
         system.energy = mm.Exchange(A=A)
 
-        mesh = df.Mesh(region=self.region, n=self.n, subregions=self.subregions)
+        mesh = mt.cache.mesh(region=self.region, n=self.n, subregions=self.subregions)
         system.m = df.Field(mesh, nvdim=3, value=self.m_init, norm=Ms)
 
         md = self.calculator.MinDriver()
@@ -88,7 +90,7 @@ class TestExchange:
             else:
                 return 1e-12
 
-        mesh = df.Mesh(region=self.region, n=self.n)
+        mesh = mt.cache.mesh(region=self.region, n=self.n)
         A = df.Field(mesh, nvdim=1, value=A_fun)
         Ms = 1e6
 
@@ -1,8 +1,12 @@
+import time
+
 import discretisedfield as df
 import micromagneticmodel as mm
 import numpy as np
 import pytest
 
+import micromagnetictests as mt
+
 
 @pytest.fixture
 def Ms():
@@ -21,7 +25,7 @@ def system(Ms):
     p2 = (5e-9, 5e-9, 5e-9)
     n = (5, 5, 5)
     region = df.Region(p1=p1, p2=p2)
-    mesh = df.Mesh(region=region, n=n)
+    mesh = mt.cache.mesh(region=region, n=n)
     system.m = df.Field(mesh, nvdim=3, value=(0, 1, 0), norm=Ms)
     return system
 
@@ -31,8 +35,7 @@ def test_simple_hysteresis_loop(calculator, system, Ms):
     hd = calculator.HysteresisDriver()
     hd.drive(system, Hmin=(0, 0, -1e6), Hmax=(0, 0, 1e6), n=3)
 
-    value = system.m(system.m.mesh.region.center)
-    assert np.linalg.norm(np.subtract(value, (0, 0, Ms))) < 1e-3
+    mt.assertions.assert_fields_close(system.m, (0, 0, Ms), atol=1e-3, rtol=0)
 
     assert len(system.table.data.index) == 5
 
@@ -52,8 +55,7 @@ def test_stepped_hysteresis_loop(calculator, system, Ms):
         ],
     )
 
-    value = system.m(system.m.mesh.region.center)
-    assert np.linalg.norm(np.subtract(value, (0, 0, Ms))) < 1e-3
+    mt.assertions.assert_fields_close(system.m, (0, 0, Ms), atol=1e-3, rtol=0)
 
     assert len(system.table.data.index) == 7
 
@@ -69,3 +71,86 @@ def test_hysteresis_check_for_energy(calculator):
 
     with pytest.raises(RuntimeError, match="System's energy is not defined"):
         hd.drive(system, Hmin=(0, 0, -1e6), Hmax=(0, 0, 1e6), n=3)
+
+
+@pytest.mark.mm_benchmark
+def test_hysteresis_throughput(calculator, record_property):
+    """Overhead per field step of a long hysteresis loop on a 1e5-cell film.
+
+    The film has a strong perpendicular anisotropy so that the magnetisation is
+    bistable at small fields. After saturation along +z the field stays small and
+    positive for 2000 steps: the magnetisation only remains along +z if every step
+    starts from the result of the previous one. Because every step converges almost
+    immediately, the time per step is dominated by the overhead of the step itself.
+
+    """
+    Ms = 1e6
+
+    mesh = df.Mesh(p1=(0, 0, 0), p2=(200e-9, 200e-9, 10e-9), n=(100, 100, 10))
+
+    system = mm.System(name="hysteresisdriver_throughput")
+    system.energy = (
+        mm.Exchange(A=1e-11)
+        + mm.UniaxialAnisotropy(K=1e6, u=(0, 0, 1))
+        + mm.Demag()
+        + mm.Zeeman(H=(0, 0, 0))
+    )
+    system.m = df.Field(mesh, nvdim=3, value=(0.01, 0, -1), norm=Ms)
+    # Calculators update the array of system.m in place.
+    m0 = system.m.array.copy()
+
+    Hsat = (1e3, 0, 2e6)
+    Hlow = (1e3, 0, 1e4)
+    Hhigh = (1e3, 0, 2e5)
+    saturation = [[(1e3, 0, 0), Hsat, 2], [Hsat, Hlow, 2]]
+    cycles, n = 10, 101
+    Hsteps = saturation + [[Hlow, Hhigh, n], [Hhigh, Hlow, n]] * cycles
+    # consecutive segments share their end points
+    steps = sum(s[-1] for s in Hsteps) - len(Hsteps) + 1
+
+    # Setup of the demagnetisation tensor is the most expensive part of a single
+    # field step and should not be repeated in every step. It is measured as the
+    # difference of two computations, which is too noisy to compare with the time
+    # per step in an assertion, so both are only recorded.
+    start = time.perf_counter()
+    calculator.compute(system.energy.zeeman.energy, system)
+    baseline = time.perf_counter() - start
+    start = time.perf_counter()
+    calculator.compute(system.energy.demag.energy, system)
+    demag_setup = time.perf_counter() - start - baseline
+
+    hd = calculator.HysteresisDriver()
+
+    start = time.perf_counter()
+    hd.drive(system, Hsteps=saturation)
+    fixed = time.perf_counter() - start
+
+    system.m = df.Field(mesh, nvdim=3, value=m0)
+    with mt.benchmark.TableMonitor(system) as monitor:
+        start = time.perf_counter()
+        hd.drive(system, Hsteps=Hsteps)
+        total = time.perf_counter() - start
+
+    step = (total - fixed) / (steps - 3)
+    record_property("steps", steps)
+    record_property("demag_setup_s", round(demag_setup, 4))
+    record_property("fixed_s", round(fixed, 4))
+    record_property("step_s", round(step, 6))
+
+    assert len(system.table.data.index) == steps
+    mz = system.table.data["mz"].values
+    assert mz[0] < 0  # bistable: no switching without saturation
+    assert np.all(mz[1:] > 0.9)
+    mt.assertions.assert_orientations_close(system.m, (0, 0, 1), max_angle=0.2)
+
+    # The time per step must not grow along the loop. The table is polled, so
+    # several rows can share a time stamp; only averages are compared.
+    if len(monitor.times) == steps:
+        intervals = np.diff(monitor.times[3:])
+        early = intervals[: len(intervals) // 5].mean()
+        late = intervals[-len(intervals) // 5 :].mean()
+        record_property("early_step_s", round(early, 6))
+        record_property("late_step_s", round(late, 6))
+        assert late < 1.5 * early + 2 * monitor.interval
+
+    calculator.delete(system)
@@ -1,8 +1,11 @@
+import time
+
 import discretisedfield as df
 import micromagneticmodel as mm
-import numpy as np
 import pytest
 
+import micromagnetictests as mt
+
 
 class TestMesh:
     @pytest.fixture(autouse=True)
@@ -36,8 +39,7 @@ class TestMesh:
         md = self.calculator.MinDriver()
         md.drive(system)
 
-        value = system.m(mesh.region.center)
-        assert np.linalg.norm(np.subtract(value, (0, 0, Ms))) < 1e-3
+        mt.assertions.assert_fields_close(system.m, (0, 0, Ms), atol=1e-3, rtol=0)
 
         self.calculator.delete(system)
 
@@ -56,8 +58,7 @@ class TestMesh:
         md = self.calculator.MinDriver()
         md.drive(system)
 
-        value = system.m(mesh.region.center)
-        assert np.linalg.norm(np.subtract(value, (0, 0, Ms))) < 1e-3
+        mt.assertions.assert_fields_close(system.m, (0, 0, Ms), atol=1e-3, rtol=0)
 
         self.calculator.delete(system)
 
@@ -76,8 +77,7 @@ class TestMesh:
         md = self.calculator.MinDriver()
         md.drive(system)
 
-        value = system.m(mesh.region.center)
-        assert np.linalg.norm(np.subtract(value, (0, 0, Ms))) < 1e-3
+        mt.assertions.assert_fields_close(system.m, (0, 0, Ms), atol=1e-3, rtol=0)
 
         self.calculator.delete(system)
 
@@ -98,7 +98,76 @@ class TestMesh:
         md = self.calculator.MinDriver()
         md.drive(system)
 
-        value = system.m(mesh.region.center)
-        assert np.linalg.norm(np.subtract(value, (0, 0, Ms))) < 1e-3
+        mt.assertions.assert_fields_close(system.m, (0, 0, Ms), atol=1e-3, rtol=0)
 
         self.calculator.delete(system)
+
+
+@pytest.mark.mm_benchmark
+class TestMeshScaling:
+    """Runtime of the ``TestMesh`` problems for increasing number of cells.
+
+    The problem is purely local (Zeeman energy only), so the runtime must not grow
+    faster than linearly with the number of cells.
+
+    """
+
+    # The mesh has (14, 10, 8) * k cells, i.e. 1.1e3 up to 1.0e7 cells.
+    factors = [1, 2, 5, 10, 21]
+    max_exponent = 1.2
+
+    @pytest.fixture(autouse=True)
+    def _setup_calculator(self, calculator):
+        self.calculator = calculator
+
+    def setup_method(self):
+        p1 = (-7e-9, -5e-9, -4e-9)
+        p2 = (7e-9, 5e-9, 4e-9)
+        self.region = df.Region(p1=p1, p2=p2)
+        self.subregions = {
+            "r1": df.Region(p1=(-7e-9, -5e-9, -4e-9), p2=(7e-9, 0, 4e-9)),
+            "r2": df.Region(p1=(-7e-9, 0, -4e-9), p2=(7e-9, 2e-9, 4e-9)),
+            "r3": df.Region(p1=(-7e-9, 2e-9, -4e-9), p2=(7e-9, 5e-9, 4e-9)),
+        }
+
+    @pytest.mark.parametrize("bc", ["", "xyz"])
+    @pytest.mark.parametrize("multi", [False, True])
+    def test_scaling(self, bc, multi, record_property):
+        Ms = 1e6
+        H = (0, 0, 5e6)
+
+        cells = []
+        times = []
+        for k in self.factors:
+            label = f"{'multi' if multi else 'single'}_{'pbc' if bc else 'nopbc'}"
+            name = f"mesh_scaling_{label}_{k}"
+            mesh = df.Mesh(
+                region=self.region,
+                n=(14 * k, 10 * k, 8 * k),
+                bc=bc,
+                subregions=self.subregions if multi else None,
+            )
+
+            system = mm.System(name=name)
+            system.energy = mm.Zeeman(H=H)
+            system.m = df.Field(mesh, nvdim=3, value=(1, 0, 0), norm=Ms)
+
+            md = self.calculator.MinDriver()
+            start = time.perf_counter()
+            md.drive(system)
+            times.append(time.perf_counter() - start)
+            cells.append(int(mesh.n.prod()))
+
+            mt.assertions.assert_fields_close(system.m, (0, 0, Ms), atol=1e-3, rtol=0)
+
+            self.calculator.delete(system)
+
+        # Fixed costs, such as starting the calculator, dominate for small meshes.
+        # Therefore, only the three largest meshes are used for the fit.
+        exponent, _ = mt.benchmark.fit_power_law(cells[-3:], times[-3:])
+
+        record_property("cells", cells)
+        record_property("time_s", [round(t, 3) for t in times])
+        record_property("exponent", round(exponent, 3))
+
+        assert exponent < self.max_exponent
@@ -1,7 +1,13 @@
 import os
+import time
+import tracemalloc
 
 import discretisedfield as df
 import micromagneticmodel as mm
+import numpy as np
+import pytest
+
+import micromagnetictests as mt
 
 
 def test_multiple_drives(calculator):
@@ -70,3 +76,71 @@ def test_multiple_drives_compute(calculator):
     assert len(os.listdir(name)) == 2
 
     calculator.delete(system)
+
+
+@pytest.mark.mm_benchmark
+def test_soak(calculator, record_property):
+    """Resource usage over thousands of drives of the same system in one process.
+
+    Python heap, open file descriptors, child processes and latency are measured
+    after every cycle of ``MinDriver``, ``TimeDriver`` and ``compute``. None of them
+    may grow over the run. The system directory is deleted every ``block`` cycles,
+    as a long-running service would do.
+
+    """
+    name = "multiple_drives_soak"
+    cycles = 1000
+    block = 100
+    warmup = 50
+
+    mesh = df.Mesh(p1=(0, 0, 0), p2=(5e-9, 5e-9, 5e-9), n=(2, 2, 2))
+
+    system = mm.System(name=name)
+    system.energy = mm.Exchange(A=1e-12) + mm.Zeeman(H=(0, 0, 1e6))
+    system.dynamics = mm.Precession(gamma0=mm.consts.gamma0) + mm.Damping(alpha=1)
+
+    md = calculator.MinDriver()
+    td = calculator.TimeDriver()
+
+    heap, fds, children, latency = [], [], [], []
+    # Tracing started by others, e.g. ``python -X tracemalloc``, is left running.
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    try:
+        for cycle in range(cycles):
+            start = time.perf_counter()
+            system.m = df.Field(mesh, nvdim=3, value=(0, 0.1, 1), norm=1e6)
+            md.drive(system)
+            system.energy.zeeman.H = (1e6, 0, 0)
+            td.drive(system, t=25e-12, n=5)
+            calculator.compute(system.energy.energy, system)
+            system.energy.zeeman.H = (0, 0, 1e6)
+            latency.append(time.perf_counter() - start)
+
+            if (cycle + 1) % block == 0:
+                calculator.delete(system)
+
+            heap.append(tracemalloc.get_traced_memory()[0])
+            fds.append(mt.benchmark.open_file_descriptors() or 0)
+            children.append(len(mt.benchmark.child_processes()))
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+        calculator.delete(system, silent=True)
+
+    latency = np.array(latency)
+    results = {
+        "heap_B": mt.benchmark.growth(heap[warmup:]),
+        "fds": mt.benchmark.growth(fds[warmup:]),
+        "children": mt.benchmark.growth(children[warmup:]),
+        "latency_s": mt.benchmark.growth(latency[warmup:]),
+    }
+    for key, value in results.items():
+        record_property(f"growth {key}", round(value, 6))
+    record_property("median_latency_s", round(float(np.median(latency)), 4))
+
+    assert results["heap_B"] < 5e6
+    assert results["fds"] < 1
+    assert results["children"] < 1
+    assert results["latency_s"] < 0.5 * np.median(latency[warmup:])
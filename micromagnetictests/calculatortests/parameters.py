@@ -0,0 +1,164 @@
+import shutil
+
+import discretisedfield as df
+import micromagneticmodel as mm
+import numpy as np
+import pytest
+
+import micromagnetictests as mt
+
+
+@pytest.mark.mm_benchmark
+class TestFieldParameterCost:
+    """Cost of writing field-valued material parameters on a 1e7-cell mesh.
+
+    For each set of parameters the input files are written into ``drive-0`` and
+    ``drive-1``, as for two consecutive drives of the same system. The first write
+    measures the serialisation cost; the times are the medians of several repeats
+    without memory tracing, and the memory is measured in a separate write. The
+    parameters do not change between the two drives, so they must not be
+    serialised again: the files written for ``drive-1`` must refer to the files of
+    ``drive-0`` (links to the same file) or to files outside the drive directory,
+    so that ``drive-1`` contains little more than the magnetisation.
+
+    """
+
+    repeats = 3
+
+    @pytest.fixture(autouse=True)
+    def _setup_calculator(self, calculator):
+        self.calculator = calculator
+
+    def setup_method(self):
+        p1 = (0, 0, 0)
+        p2 = (250e-9, 200e-9, 200e-9)
+        n = (250, 200, 200)
+        self.mesh = df.Mesh(p1=p1, p2=p2, n=n)
+
+    def _scalar(self, value):
+        return df.Field(self.mesh, nvdim=1, value=value)
+
+    def _vector(self, value):
+        return df.Field(self.mesh, nvdim=3, value=value)
+
+    def _cases(self):
+        yield (
+            "uniaxial",
+            {
+                "energy": mm.UniaxialAnisotropy(
+                    K=self._scalar(1e5), u=self._vector((0, 0, 1))
+                )
+            },
+        )
+        yield (
+            "cubic",
+            {
+                "energy": mm.CubicAnisotropy(
+                    K=self._scalar(1e4),
+                    u1=self._vector((1, 0, 0)),
+                    u2=self._vector((0, 1, 0)),
+                )
+            },
+        )
+        yield (
+            "dynamics",
+            {
+                "dynamics": mm.Precession(gamma0=self._scalar(mm.consts.gamma0))
+                + mm.Damping(alpha=self._scalar(0.1))
+            },
+        )
+        yield (
+            "slonczewski",
+            {
+                "dynamics": mm.Precession(gamma0=mm.consts.gamma0)
+                + mm.Damping(alpha=0.1)
+                + mm.Slonczewski(
+                    J=self._scalar(1e12), mp=self._vector((1, 0, 0)), P=0.4, Lambda=2
+                )
+            },
+        )
+
+    def test_serialisation(self, tmp_path, record_property):
+        name = "field_parameter_cost"
+
+        for case, terms in self._cases():
+            system = mm.System(name=name)
+            system.energy = terms.get("energy", mm.Zeeman(H=(0, 0, 1e5)))
+            system.dynamics = terms.get(
+                "dynamics", mm.Precession(gamma0=mm.consts.gamma0) + mm.Damping(alpha=1)
+            )
+            system.m = df.Field(self.mesh, nvdim=3, value=(0, 0.1, 1), norm=1e6)
+
+            arrays = [
+                value.array
+                for term in [*system.energy, *system.dynamics]
+                for value in vars(term).values()
+                if isinstance(value, df.Field)
+            ]
+            parameter_size = sum(array.nbytes for array in arrays)
+
+            memory = mt.benchmark.dry_run(
+                self.calculator.TimeDriver(),
+                system,
+                tmp_path / case / "memory",
+                t=1e-12,
+                n=1,
+            )
+            shutil.rmtree(tmp_path / case / "memory")
+
+            firsts, seconds, written = [], [], []
+            for repeat in range(self.repeats):
+                system_dir = tmp_path / case / f"repeat-{repeat}" / name
+                for drive_number, results in enumerate([firsts, seconds]):
+                    td = self.calculator.TimeDriver()
+                    results.append(
+                        mt.benchmark.dry_run(
+                            td,
+                            system,
+                            system_dir / f"drive-{drive_number}",
+                            trace_memory=False,
+                            t=1e-12,
+                            n=1,
+                        )
+                    )
+                written.append(
+                    self._new_bytes(system_dir / "drive-1", system_dir / "drive-0")
+                )
+                shutil.rmtree(system_dir)
+
+            first_s = np.median([result["time_s"] for result in firsts])
+            second_s = np.median([result["time_s"] for result in seconds])
+            record_property(
+                case,
+                {
+                    "parameters_B": parameter_size,
+                    "first_s": round(float(first_s), 3),
+                    "second_s": round(float(second_s), 3),
+                    "peak_memory_B": memory["peak_memory_B"],
+                    "input_size_B": firsts[0]["input_size_B"],
+                    "second_written_B": max(written),
+                },
+            )
+
+            # Serialisation may need a temporary copy of the arrays, but no more.
+            assert memory["peak_memory_B"] < 2 * (
+                parameter_size + system.m.array.nbytes
+            )
+            # Unchanged parameters must be reused and not written again.
+            assert max(written) < firsts[0]["input_size_B"] - 0.5 * parameter_size
+
+    @staticmethod
+    def _new_bytes(dirname, previous):
+        """Size of the files in ``dirname`` which are not files of ``previous``."""
+        existing = {
+            (stat.st_dev, stat.st_ino)
+            for stat in (path.stat() for path in previous.rglob("*") if path.is_file())
+        }
+        size = 0
+        for path in dirname.rglob("*"):
+            if path.is_symlink() or not path.is_file():
+                continue
+            stat = path.stat()
+            if (stat.st_dev, stat.st_ino) not in existing:
+                size += stat.st_size
+        return size
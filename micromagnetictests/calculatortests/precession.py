@@ -3,6 +3,8 @@ import micromagneticmodel as mm
 import numpy as np
 import pytest
 
+import micromagnetictests as mt
+
 
 class TestPrecession:
     @pytest.fixture(autouse=True)
@@ -26,7 +28,7 @@ class TestPrecession:
         gamma0 = 0
         Ms = 1e6
 
-        mesh = df.Mesh(region=self.region, n=self.n)
+        mesh = mt.cache.mesh(region=self.region, n=self.n)
 
         system = mm.System(name=name)
         system.energy = mm.Zeeman(H=H)
@@ -49,7 +51,7 @@ class TestPrecession:
         gamma0 = {"r1": 0, "r2": 2.211e5}
         Ms = 1e6
 
-        mesh = df.Mesh(region=self.region, n=self.n, subregions=self.subregions)
+        mesh = mt.cache.mesh(region=self.region, n=self.n, subregions=self.subregions)
 
         system = mm.System(name=name)
         system.energy = mm.Zeeman(H=H)
@@ -72,7 +74,7 @@ class TestPrecession:
     def test_field(self):
         name = "precession_field"
 
-        mesh = df.Mesh(region=self.region, n=self.n)
+        mesh = mt.cache.mesh(region=self.region, n=self.n)
 
         def value_fun(pos):
             x, y, z = pos
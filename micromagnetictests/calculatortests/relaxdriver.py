@@ -3,6 +3,8 @@ import micromagneticmodel as mm
 import numpy as np
 import pytest
 
+import micromagnetictests as mt
+
 
 def test_relaxdriver(calculator):
     p1 = (0, 0, 0)
@@ -12,7 +14,7 @@ def test_relaxdriver(calculator):
     A = 1e-12
     H = (0, 0, 1e6)
     region = df.Region(p1=p1, p2=p2)
-    mesh = df.Mesh(region=region, n=n)
+    mesh = mt.cache.mesh(region=region, n=n)
 
     system = mm.System(name="relaxdriver")
     system.energy = mm.Exchange(A=A) + mm.Zeeman(H=H)
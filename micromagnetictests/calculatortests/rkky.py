@@ -3,6 +3,8 @@ import micromagneticmodel as mm
 import numpy as np
 import pytest
 
+import micromagnetictests as mt
+
 
 class TestRKKY:
     @pytest.fixture(autouse=True)
@@ -20,12 +22,9 @@ class TestRKKY:
             "r3": df.Region(p1=(-5e-9, 1e-9, -3e-9), p2=(5e-9, 5e-9, 3e-9)),
         }
 
-    def m_init(self, pos):
-        x, y, z = pos
-        if y <= 0:
-            return (0, 0.2, 1)
-        else:
-            return (0, -0.5, -1)
+    def m_init(self, mesh):
+        _, y, _ = mt.textures.coordinates(mesh)
+        return mt.textures.two_region(y <= 0, (0, 0.2, 1), (0, -0.5, -1))
 
     def test_scalar(self):
         name = "rkky_scalar"
@@ -38,7 +37,7 @@ class TestRKKY:
         system.energy = mm.RKKY(sigma=sigma, sigma2=sigma2, subregions=["r1", "r3"])
 
         mesh = df.Mesh(region=self.region, n=self.n, subregions=self.subregions)
-        system.m = df.Field(mesh, nvdim=3, value=self.m_init, norm=Ms)
+        system.m = df.Field(mesh, nvdim=3, value=self.m_init(mesh), norm=Ms)
 
         md = self.calculator.MinDriver()
         md.drive(system)
@@ -51,7 +50,7 @@ class TestRKKY:
         system.energy.rkky.sigma = 1e4
         system.energy.rkky.sigma2 = 0
 
-        system.m = df.Field(mesh, nvdim=3, value=self.m_init, norm=Ms)
+        system.m = df.Field(mesh, nvdim=3, value=self.m_init(mesh), norm=Ms)
 
         md.drive(system)
 
@@ -61,3 +60,44 @@ class TestRKKY:
         assert abs(np.dot(m1, m2) - 1) < 1e-3
 
         self.calculator.delete(system)
+
+    def test_reference(self):
+        name = "rkky_reference"
+
+        # Laterally extended stack with layers along z.
+        p1 = (0, 0, 0)
+        p2 = (200e-9, 200e-9, 7e-9)
+        cell = (2e-9, 2e-9, 1e-9)
+        subregions = {
+            "bottom": df.Region(p1=(0, 0, 0), p2=(200e-9, 200e-9, 3e-9)),
+            "spacer": df.Region(p1=(0, 0, 3e-9), p2=(200e-9, 200e-9, 4e-9)),
+            "top": df.Region(p1=(0, 0, 4e-9), p2=(200e-9, 200e-9, 7e-9)),
+        }
+        mesh = df.Mesh(p1=p1, p2=p2, cell=cell, subregions=subregions)
+
+        # Non-collinear magnetisation so that the coupling varies across the layers.
+        x, y, z = np.meshgrid(*mesh.cells, indexing="ij")
+        k = 2 * np.pi / 100e-9
+        m_value = np.stack(
+            [np.cos(k * x), np.sin(k * y), np.where(z > 3e-9, -1, 1)], axis=-1
+        )
+        Ms = 1e6
+
+        system = mm.System(name=name)
+        system.m = df.Field(mesh, nvdim=3, value=m_value, norm=Ms)
+
+        for sigma, sigma2 in [(-1e-4, 0), (1e-4, -5e-5)]:
+            system.energy = mm.RKKY(
+                sigma=sigma, sigma2=sigma2, subregions=["bottom", "top"]
+            )
+            term = system.energy.rkky
+
+            energy = self.calculator.compute(term.energy, system)
+            expected = mt.reference.energy(term, system.m)
+            assert abs(energy - expected) < 1e-6 * abs(expected)
+
+            Heff = self.calculator.compute(term.effective_field, system)
+            expected = mt.reference.effective_field(term, system.m)
+            mt.assertions.assert_fields_close(Heff, expected, rtol=1e-6)
+
+        self.calculator.delete(system)
@@ -1,8 +1,12 @@
 import sys
+import time
 
+import micromagneticdata as mdata
 import micromagneticmodel as mm
 import pytest
 
+import micromagnetictests as mt
+
 
 @pytest.mark.skipif(
     sys.platform == "win32",
@@ -27,3 +31,79 @@ def test_schedule(calculator, tmp_path):
             n=50,
         )
         assert len(list(tmp_path.glob("**/job.sh"))) == 1
+
+
+@pytest.mark.skipif(
+    sys.platform == "win32", reason="The local scheduler runs job scripts with bash."
+)
+def test_schedule_local(calculator, tmp_path):
+    system = mm.examples.macrospin()
+
+    td = calculator.TimeDriver()
+    with mt.scheduler.LocalScheduler(tmp_path / "spool", workers=2) as scheduler:
+        for _ in range(3):
+            td.schedule(
+                system,
+                scheduler.cmd,
+                "#!/bin/bash",
+                dirname=str(tmp_path),
+                t=0.2e-9,
+                n=50,
+            )
+        scheduler.wait(timeout=600)
+
+    status = scheduler.status()
+    assert len(status) == 3
+    assert all(job["status"] == "done" for job in status.values()), status
+
+    # Scheduled results must be identical to the results of a direct drive.
+    reference = mm.examples.macrospin()
+    td.drive(reference, dirname=str(tmp_path / "direct"), t=0.2e-9, n=50)
+
+    data = mdata.Data(name=system.name, dirname=str(tmp_path))
+    assert data.n == 3
+    for drive in data:
+        assert len(drive.table.data.index) == 50
+        mt.assertions.assert_fields_close(drive[-1], reference.m, rtol=1e-6)
+
+
+@pytest.mark.mm_benchmark
+@pytest.mark.skipif(
+    sys.platform == "win32", reason="The local scheduler runs job scripts with bash."
+)
+def test_schedule_throughput(calculator, tmp_path, record_property):
+    """Submission and completion throughput of hundreds of queued jobs."""
+    jobs = 200
+    system = mm.examples.macrospin()
+
+    td = calculator.TimeDriver()
+    with mt.scheduler.LocalScheduler(tmp_path / "spool", workers=8) as scheduler:
+        start = time.perf_counter()
+        for _ in range(jobs):
+            td.schedule(
+                system,
+                scheduler.cmd,
+                "#!/bin/bash",
+                dirname=str(tmp_path),
+                verbose=0,
+                t=1e-11,
+                n=1,
+            )
+        submission = time.perf_counter() - start
+        scheduler.wait(timeout=3600)
+        total = time.perf_counter() - start
+
+    status = scheduler.status()
+    record_property("submissions_per_s", round(jobs / submission, 2))
+    record_property("jobs_per_hour", round(jobs / total * 3600))
+    record_property(
+        "max_queue_s",
+        round(max(job["started"] - job["submitted"] for job in status.values()), 3),
+    )
+
+    assert len(status) == jobs
+    assert all(job["status"] == "done" for job in status.values())
+
+    data = mdata.Data(name=system.name, dirname=str(tmp_path))
+    assert data.n == jobs
+    assert all(len(drive.table.data.index) == 1 for drive in data)
@@ -0,0 +1,156 @@
+import statistics
+import time
+
+import discretisedfield as df
+import micromagneticmodel as mm
+import numpy as np
+import pytest
+
+import micromagnetictests as mt
+
+
+@pytest.mark.mm_spec("calculator.session()")
+class TestSession:
+    """Specification of persistent solver sessions.
+
+    No calculator provides sessions yet. These tests specify a future API: a
+    calculator supports sessions if it provides ``session()``, a context manager
+    within which all drives and computes reuse one running solver instead of
+    launching a new solver process for every call. The tests are skipped for
+    calculators without session support, and they are marked with ``mm_spec`` so
+    that ``micromagnetictests.get_tests`` does not count them as coverage.
+
+    """
+
+    @pytest.fixture(autouse=True)
+    def _setup_calculator(self, calculator):
+        if not hasattr(calculator, "session"):
+            pytest.skip("Specification of calculator.session(), which is not provided.")
+        self.calculator = calculator
+
+    def setup_method(self):
+        p1 = (0, 0, 0)
+        p2 = (10e-9, 6e-9, 4e-9)
+        cell = (2e-9, 2e-9, 2e-9)
+        self.mesh = df.Mesh(p1=p1, p2=p2, cell=cell)
+
+    def _system(self, name, H=(0, 0, 1e6)):
+        system = mm.System(name=name)
+        system.energy = (
+            mm.Exchange(A=1e-12)
+            + mm.Demag()
+            + mm.UniaxialAnisotropy(K=1e4, u=(0, 1, 0))
+            + mm.Zeeman(H=H)
+        )
+        system.dynamics = mm.Precession(gamma0=mm.consts.gamma0) + mm.Damping(alpha=0.5)
+        system.m = df.Field(self.mesh, nvdim=3, value=(0.3, 0.2, 1), norm=8e5)
+        return system
+
+    def _run(self, system):
+        """Sequence of drives and computes starting from the initial state."""
+        results = {}
+        td = self.calculator.TimeDriver()
+        td.drive(system, t=20e-12, n=5)
+        # Calculators update the array of system.m in place, so it is copied.
+        results["time_m"] = df.Field(self.mesh, nvdim=3, value=system.m.array.copy())
+        results["time_table"] = system.table.data
+        results["energy"] = self.calculator.compute(system.energy.energy, system)
+        results["effective_field"] = self.calculator.compute(
+            system.energy.effective_field, system
+        )
+        md = self.calculator.MinDriver()
+        md.drive(system)
+        results["min_m"] = df.Field(self.mesh, nvdim=3, value=system.m.array.copy())
+        return results
+
+    def _assert_identical(self, results, reference):
+        assert results.keys() == reference.keys()
+        for key, value in results.items():
+            if isinstance(value, df.Field):
+                mt.assertions.assert_fields_close(value, reference[key], rtol=1e-12)
+            elif key.endswith("table"):
+                columns = value.select_dtypes("number").columns
+                assert np.allclose(
+                    value[columns], reference[key][columns], rtol=1e-12, atol=0
+                )
+            else:
+                assert value == pytest.approx(reference[key], rel=1e-12)
+
+    def test_identical_results(self):
+        fresh = self._system("session_fresh")
+        reference = self._run(fresh)
+
+        session = self._system("session_reused")
+        with self.calculator.session():
+            # The second run uses the already running solver.
+            first = self._run(session)
+            session.m = df.Field(self.mesh, nvdim=3, value=(0.3, 0.2, 1), norm=8e5)
+            second = self._run(session)
+
+        self._assert_identical(first, reference)
+        self._assert_identical(second, reference)
+
+        self.calculator.delete(fresh)
+        self.calculator.delete(session)
+
+    def test_changed_state(self):
+        system = self._system("session_changed_state", H=(0, 0, 1e7))
+        md = self.calculator.MinDriver()
+        with self.calculator.session():
+            md.drive(system)
+            mt.assertions.assert_orientations_close(system.m, (0, 0, 1), max_angle=0.1)
+            energy_z = self.calculator.compute(system.energy.zeeman.energy, system)
+
+            # Changes of the system between calls must reach the running solver.
+            system.energy.zeeman.H = (1e7, 0, 0)
+            energy_x = self.calculator.compute(system.energy.zeeman.energy, system)
+            md.drive(system)
+            mt.assertions.assert_orientations_close(system.m, (1, 0, 0), max_angle=0.1)
+
+        # Reorientation of m does not change the Zeeman energy before the drive.
+        assert energy_x == pytest.approx(0, abs=1e-3 * abs(energy_z))
+
+        self.calculator.delete(system)
+
+    def test_different_systems(self):
+        systems = [
+            self._system("session_system_a", H=(0, 0, 1e7)),
+            self._system("session_system_b", H=(1e7, 0, 0)),
+        ]
+        md = self.calculator.MinDriver()
+        with self.calculator.session():
+            # Alternating between systems must not leak state between them.
+            for _ in range(2):
+                for system in systems:
+                    md.drive(system)
+
+        mt.assertions.assert_orientations_close(systems[0].m, (0, 0, 1), max_angle=0.1)
+        mt.assertions.assert_orientations_close(systems[1].m, (1, 0, 0), max_angle=0.1)
+
+        for system in systems:
+            self.calculator.delete(system)
+
+    @pytest.mark.mm_benchmark
+    def test_latency(self, record_property):
+        system = self._system("session_latency")
+        repeats = 10
+
+        def latency():
+            times = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                self.calculator.compute(system.energy.energy, system)
+                times.append(time.perf_counter() - start)
+            return statistics.median(times)
+
+        fresh = latency()
+        with self.calculator.session():
+            self.calculator.compute(system.energy.energy, system)  # solver start
+            reused = latency()
+
+        record_property("fresh_s", round(fresh, 4))
+        record_property("session_s", round(reused, 4))
+
+        assert reused < 0.5 * fresh
+
+        self.calculator.delete(system)
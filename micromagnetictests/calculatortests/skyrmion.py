@@ -1,6 +1,8 @@
 import discretisedfield as df
 import micromagneticmodel as mm
 
+import micromagnetictests as mt
+
 
 def test_skyrmion(calculator):
     name = "skyrmion"
@@ -26,21 +28,13 @@ def test_skyrmion(calculator):
         + mm.Zeeman(H=H)
     )
 
-    def Ms_fun(pos):
-        x, y, z = pos
-        if (x**2 + y**2) ** 0.5 < 50e-9:
-            return Ms
-        else:
-            return 0
-
-    def m_init(pos):
-        x, y, z = pos
-        if (x**2 + y**2) ** 0.5 < 10e-9:
-            return (0, 0.1, -1)
-        else:
-            return (0, 0.1, 1)
-
-    system.m = df.Field(mesh, nvdim=3, value=m_init, norm=Ms_fun)
+    x, y, _ = mt.textures.coordinates(mesh)
+    Ms_array = Ms * mt.textures.disk(x, y, radius=50e-9)
+    m_init = mt.textures.two_region(
+        mt.textures.disk(x, y, radius=10e-9), (0, 0.1, -1), (0, 0.1, 1)
+    )
+
+    system.m = df.Field(mesh, nvdim=3, value=m_init, norm=Ms_array)
 
     md = calculator.MinDriver()
     md.drive(system)
@@ -3,6 +3,8 @@ import micromagneticmodel as mm
 import numpy as np
 import pytest
 
+import micromagnetictests as mt
+
 
 class TestSlonczewski:
     @pytest.fixture(autouse=True)
@@ -264,3 +266,62 @@ class TestSlonczewski:
         # Check if it runs.
 
         self.calculator.delete(system)
+
+    def test_reference_dmdt(self):
+        name = "slonczewski_reference_dmdt"
+
+        H = (0, 0, 1e6)
+        Ms = 1e6
+        alpha = 0.1
+
+        mesh = df.Mesh(region=self.region, n=self.n, subregions=self.subregions)
+
+        system = mm.System(name=name)
+        system.energy = mm.Zeeman(H=H)
+        m_initial = df.Field(mesh, nvdim=3, value=(0, 0.1, 1), norm=Ms)
+        system.m = m_initial
+        Heff = self.calculator.compute(system.energy.effective_field, system)
+
+        def time_dep(t):
+            return np.cos(t * 1e10) / 2
+
+        td = self.calculator.TimeDriver()
+
+        # one short step approximates dm/dt at t=0
+        dt = 1e-14
+        for slonczewski in [
+            mm.Slonczewski(J=1e13, mp=(1, 0, 0), P=0.4, Lambda=2, eps_prime=0.5),
+            mm.Slonczewski(
+                J={"r1": 1e13, "r2": 5e12},
+                mp={"r1": (1, 0, 0), "r2": (0, 1, 0)},
+                P={"r1": 0.4, "r2": 0.35},
+                Lambda={"r1": 2, "r2": 1.5},
+                eps_prime={"r1": 0, "r2": 1},
+            ),
+            mm.Slonczewski(
+                J=df.Field(mesh, nvdim=1, value=1e13),
+                mp=df.Field(mesh, nvdim=3, value=(1, 0, 0)),
+                P=df.Field(mesh, nvdim=1, value=0.5),
+                Lambda=df.Field(mesh, nvdim=1, value=2),
+                eps_prime=df.Field(mesh, nvdim=1, value=1),
+            ),
+            mm.Slonczewski(
+                J=1e13, mp=(1, 0, 0), P=0.4, Lambda=2, dt=1e-13, func=time_dep
+            ),
+        ]:
+            system.m = df.Field(mesh, nvdim=3, value=m_initial.array)
+            system.dynamics = (
+                mm.Precession(gamma0=mm.consts.gamma0)
+                + mm.Damping(alpha=alpha)
+                + slonczewski
+            )
+            expected = mt.reference.dmdt(system.dynamics, m_initial, Heff)
+            torque = mt.reference.dmdt(slonczewski, m_initial, Heff, alpha=alpha)
+
+            td.drive(system, t=dt, n=1)
+
+            dmdt = (system.m.orientation.array - m_initial.orientation.array) / dt
+            error = mt.assertions.max_error(expected, dmdt)
+            assert error < 0.05 * mt.assertions.max_error(torque, 0)
+
+        self.calculator.delete(system)
@@ -0,0 +1,84 @@
+import concurrent.futures
+import contextlib
+import importlib
+import multiprocessing
+import os
+import statistics
+import time
+
+import micromagneticmodel as mm
+import pytest
+
+import micromagnetictests as mt
+
+
+def _startup_latency(calculator_name, kind, dirname, repeats):
+    """Fixed cost of trivial runs in a fresh interpreter.
+
+    The first run is the cold start. It includes importing the calculator and
+    finding the runner. The following ``repeats`` runs are warm starts.
+
+    """
+    os.chdir(dirname)
+
+    start = time.perf_counter()
+    calculator = importlib.import_module(calculator_name)
+    import_time = time.perf_counter() - start
+
+    system = mm.examples.macrospin()
+    driver_classes = {type(calculator.MinDriver()), type(calculator.TimeDriver())}
+
+    runs = []
+    for _ in range(repeats + 1):
+        timing = {}
+        start = time.perf_counter()
+        if hasattr(calculator, "runner"):
+            _ = calculator.runner.runner  # the runner is searched on first access
+        timing["runner_s"] = time.perf_counter() - start
+
+        with contextlib.ExitStack() as stack:
+            timers = [
+                stack.enter_context(mt.benchmark.PhaseTimer(cls))
+                for cls in driver_classes
+            ]
+            start = time.perf_counter()
+            if kind == "MinDriver":
+                calculator.MinDriver().drive(system)
+            elif kind == "TimeDriver":
+                calculator.TimeDriver().drive(system, t=25e-12, n=1)
+            else:
+                calculator.compute(system.energy.energy, system)
+            timing["total_s"] = time.perf_counter() - start
+
+        for phase in mt.benchmark.PhaseTimer.phases:
+            timing[f"{phase}_s"] = sum(timer.times[phase] for timer in timers)
+        timing["other_s"] = timing["total_s"] - sum(
+            timing[f"{phase}_s"] for phase in mt.benchmark.PhaseTimer.phases
+        )
+        runs.append(timing)
+
+    cold = dict(runs[0], import_s=import_time)
+    warm = {key: statistics.median(run[key] for run in runs[1:]) for key in runs[0]}
+    return {"cold": cold, "warm": warm}
+
+
+@pytest.mark.mm_benchmark
+@pytest.mark.parametrize("kind", ["MinDriver", "TimeDriver", "compute"])
+def test_startup_latency(calculator, kind, tmp_path, record_property):
+    """Breakdown of the fixed cost of trivial runs for cold and warm starts."""
+    context = multiprocessing.get_context("spawn")
+    with concurrent.futures.ProcessPoolExecutor(1, context) as executor:
+        future = executor.submit(
+            _startup_latency, calculator.__name__, kind, tmp_path, 5
+        )
+        result = future.result()
+
+    for start, timing in result.items():
+        record_property(start, {key: round(value, 4) for key, value in timing.items()})
+
+    cold, warm = result["cold"], result["warm"]
+    assert warm["total_s"] <= cold["total_s"]
+    assert warm["runner_s"] <= cold["runner_s"]
+    # Everything except the calculator call is overhead of the Python side.
+    assert warm["call_s"] > 0
+    assert warm["other_s"] >= 0
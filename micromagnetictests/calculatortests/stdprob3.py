@@ -3,30 +3,26 @@ import micromagneticmodel as mm
 import numpy as np
 from scipy.optimize import bisect  # This is why scipy is a dependency.
 
+import micromagnetictests as mt
+
 
 def test_stdprob3(calculator):
     name = "stdprob3"
 
     # Function for initiaising the flower state.
-    def m_init_flower(pos):
-        _, y, z = pos[0] / 1e-9, pos[1] / 1e-9, pos[2] / 1e-9
-        mx = 0
-        my = 2 * z - 1
-        mz = -2 * y + 1
-        norm_squared = mx**2 + my**2 + mz**2
-        if norm_squared <= 0.05:
-            return (1, 0, 0)
-        else:
-            return (mx, my, mz)
-
-    # Function for initialising the vortex state.
-    def m_init_vortex(pos):
-        x, _, _ = pos[0] / 1e-9, pos[1] / 1e-9, pos[2] / 1e-9
-        mx = 0
-        my = np.sin(np.pi / 2 * (x - 0.5))
-        mz = np.cos(np.pi / 2 * (x - 0.5))
-
-        return (mx, my, mz)
+    def m_init_flower(mesh):
+        x, y, z = mt.textures.coordinates(mesh)
+        size = mesh.region.edges[0] / 2
+        return mt.textures.flower(x, y, z, center=mesh.region.center, size=size)
+
+    # Function for initialising the vortex state with its core along x,
+    # perpendicular to the anisotropy axis.
+    def m_init_vortex(mesh):
+        _, y, z = mt.textures.coordinates(mesh)
+        core_radius = 0.1 * mesh.region.edges[0]
+        center = mesh.region.center[1:]
+        m = mt.textures.vortex(y, z, center=center, core_radius=core_radius)
+        return m[..., [2, 0, 1]]
 
     def minimise_system_energy(L, m_init):
         N = 16  # discretisation in one nvdimension
@@ -48,7 +44,7 @@ def test_stdprob3(calculator):
 
         system = mm.System(name=name)
         system.energy = mm.Exchange(A=A) + mm.UniaxialAnisotropy(K=K, u=u) + mm.Demag()
-        system.m = df.Field(mesh, nvdim=3, value=m_init, norm=Ms)
+        system.m = df.Field(mesh, nvdim=3, value=m_init(mesh), norm=Ms)
 
         if hasattr(calculator, "RelaxDriver"):
             system.dynamics = mm.Damping(alpha=0.5)
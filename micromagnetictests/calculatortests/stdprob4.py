@@ -1,6 +1,8 @@
 import discretisedfield as df
 import micromagneticmodel as mm
 
+import micromagnetictests as mt
+
 
 def test_stdprob4(calculator):
     name = "stdprob4"
@@ -30,8 +32,12 @@ def test_stdprob4(calculator):
     H = (-24.6e-3 / mm.consts.mu0, 4.3e-3 / mm.consts.mu0, 0)
     system.energy += mm.Zeeman(H=H)
 
+    # The extrema of my can only grow during the drive. Their bounds are checked
+    # while the drive runs to stop diverging calculators early.
     td = calculator.TimeDriver()
-    td.drive(system, t=1e-9, n=200)
+    envelopes = [mt.monitor.Envelope("my", lower=-0.5, upper=0.8)]
+    with mt.monitor.EnvelopeMonitor(system, envelopes):
+        td.drive(system, t=1e-9, n=200)
 
     t = system.table.data["t"].values
     my = system.table.data["my"].values
@@ -0,0 +1,88 @@
+import discretisedfield as df
+import micromagneticmodel as mm
+import pytest
+
+import micromagnetictests as mt
+
+
+@pytest.mark.mm_benchmark
+class TestSubregionScaling:
+    """Cost of dict-valued parameters for an increasing number of subregions.
+
+    The mesh is a chain of grains along x with a fixed number of cells. Saturation
+    magnetisation and anisotropy are defined per grain, exchange is defined within
+    every grain and between every pair of grains. The number of exchange entries
+    grows quadratically with the number of grains, so the cost of writing the input
+    files and of the calculator setup must grow at most linearly with the number of
+    entries.
+
+    """
+
+    # 3000 is divisible by all counts.
+    counts = [10, 30, 100, 300, 1000]
+    cells = 3000
+    max_exponent = 1.2
+
+    @pytest.fixture(autouse=True)
+    def _setup_calculator(self, calculator):
+        self.calculator = calculator
+
+    def test_scaling(self, record_property):
+        name = "subregion_scaling"
+
+        entries = []
+        write_times = []
+        setup_times = []
+        for count in self.counts:
+            width = self.cells // count * 1e-9
+            subregions = {
+                f"r{i}": df.Region(
+                    p1=(i * width, 0, 0), p2=((i + 1) * width, 1e-9, 1e-9)
+                )
+                for i in range(count)
+            }
+            mesh = df.Mesh(
+                p1=(0, 0, 0),
+                p2=(self.cells * 1e-9, 1e-9, 1e-9),
+                n=(self.cells, 1, 1),
+                subregions=subregions,
+            )
+
+            A = {f"r{i}": 1e-11 for i in range(count)}
+            A.update(
+                {f"r{i}:r{j}": 5e-12 for i in range(count) for j in range(i + 1, count)}
+            )
+            K = {f"r{i}": 1e5 + 10 * i for i in range(count)}
+            Ms = {f"r{i}": (0, 0, 1e6 - 100 * i) for i in range(count)}
+
+            system = mm.System(name=name)
+            system.energy = mm.Exchange(A=A) + mm.UniaxialAnisotropy(K=K, u=(0, 0, 1))
+            # The initial state is the energy minimum, so the drive only consists of
+            # writing the input files and setting up the calculator.
+            system.m = df.Field(mesh, nvdim=3, value=Ms)
+            expected = df.Field(mesh, nvdim=3, value=Ms)
+
+            md = self.calculator.MinDriver()
+            with mt.benchmark.PhaseTimer(md) as timer:
+                md.drive(system)
+
+            mt.assertions.assert_fields_close(system.m, expected, rtol=1e-6)
+
+            entries.append(len(A))
+            write_times.append(timer.times["write_input_files"])
+            setup_times.append(timer.times["call"])
+
+            self.calculator.delete(system)
+
+        write_exponent, _ = mt.benchmark.fit_power_law(entries[-3:], write_times[-3:])
+        setup_exponent, _ = mt.benchmark.fit_power_law(entries[-3:], setup_times[-3:])
+
+        record_property("subregions", self.counts)
+        record_property("entries", entries)
+        record_property("write_input_files_s", [round(t, 4) for t in write_times])
+        record_property("call_s", [round(t, 4) for t in setup_times])
+        record_property("write_exponent", round(write_exponent, 3))
+        record_property("setup_exponent", round(setup_exponent, 3))
+
+        assert write_exponent < self.max_exponent
+        assert setup_exponent < self.max_exponent
@@ -1,11 +1,42 @@
+import concurrent.futures
 import glob
+import importlib
+import multiprocessing
 import os
+import time
 
 import discretisedfield as df
 import micromagneticmodel as mm
 import numpy as np
 import pytest
 
+import micromagnetictests as mt
+
+
+def _thermal_realisation(calculator_name, evolver_name, seed, dirname):
+    """Run one thermal realisation in a separate process."""
+    calculator = importlib.import_module(calculator_name)
+
+    mesh = df.Mesh(p1=(0, 0, 0), p2=(5e-9, 5e-9, 5e-9), n=(2, 2, 2))
+    system = mm.System(name="timedriver_thermal_ensemble")
+    system.energy = mm.Exchange(A=1e-12) + mm.Zeeman(H=(0, 0, 1e5))
+    system.dynamics = mm.Precession(gamma0=mm.consts.gamma0) + mm.Damping(alpha=1)
+    system.m = df.Field(mesh, nvdim=3, value=(0, 0, 1), norm=1e6)
+    system.T = 100
+
+    evolver_kwargs = {"uniform_seed": seed}
+    if evolver_name == "UHH_ThetaEvolver":
+        evolver_kwargs["fixed_timestep"] = 2e-13
+    evolver = getattr(calculator, evolver_name)(**evolver_kwargs)
+    td = calculator.TimeDriver(evolver=evolver)
+
+    start = time.perf_counter()
+    with mt.benchmark.PhaseTimer(td) as timer:
+        td.drive(system, dirname=dirname, t=2e-11, n=1)
+    total = time.perf_counter() - start
+
+    return total, total - timer.times["call"], float(system.m.orientation.mean()[2])
+
 
 class TestTimeDriver:
     @pytest.fixture(autouse=True)
@@ -19,12 +50,11 @@ class TestTimeDriver:
         self.Ms = 1e6
         A = 1e-12
         H = (0, 0, 1e6)
-        region = df.Region(p1=p1, p2=p2)
-        self.mesh = df.Mesh(region=region, n=n)
+        self.mesh = mt.cache.mesh(p1=p1, p2=p2, n=n)
         self.energy = mm.Exchange(A=A) + mm.Zeeman(H=H)
         self.precession = mm.Precession(gamma0=mm.consts.gamma0)
         self.damping = mm.Damping(alpha=1)
-        self.m = df.Field(self.mesh, nvdim=3, value=(0, 0.1, 1), norm=self.Ms)
+        self.m = mt.cache.field(self.mesh, nvdim=3, value=(0, 0.1, 1), norm=self.Ms)
 
     def test_noevolver_nodriver(self):
         name = "timedriver_noevolver_nodriver"
@@ -112,6 +142,140 @@ class TestTimeDriver:
 
         self.calculator.delete(system)
 
+    @pytest.mark.mm_benchmark
+    @pytest.mark.parametrize("evolver", ["UHH_ThetaEvolver", "Xf_ThermHeunEvolver"])
+    def test_thermal_ensemble(self, evolver, tmp_path, record_property):
+        """Throughput of an ensemble of independent thermal realisations.
+
+        Every realisation has its own seed and directory and runs in its own
+        process. The standard error of the ensemble-averaged magnetisation must
+        decrease with the number of realisations.
+
+        """
+        realisations = 128
+        workers = os.cpu_count()
+
+        context = multiprocessing.get_context("spawn")
+        start = time.perf_counter()
+        with concurrent.futures.ProcessPoolExecutor(workers, context) as executor:
+            futures = [
+                executor.submit(
+                    _thermal_realisation,
+                    self.calculator.__name__,
+                    evolver,
+                    seed,
+                    tmp_path / f"seed-{seed}",
+                )
+                for seed in range(1, realisations + 1)
+            ]
+            results = [future.result() for future in futures]
+        wall = time.perf_counter() - start
+
+        totals, overheads, mz = np.array(results).T
+        record_property("workers", workers)
+        record_property("realisations_per_hour", round(realisations / wall * 3600))
+        record_property("run_s", round(totals.mean(), 4))
+        record_property("overhead_per_run_s", round(overheads.mean(), 4))
+        record_property("mean_mz", round(mz.mean(), 6))
+
+        # Realisations with different seeds must differ.
+        assert mz.std() > 0
+        assert np.all(mz > 0.5)
+
+        def standard_error(values):
+            return values.std(ddof=1) / np.sqrt(len(values))
+
+        assert standard_error(mz) < 0.8 * standard_error(mz[: realisations // 4])
+
+    @pytest.mark.mm_benchmark
+    def test_evolver_cost(self, record_property):
+        """Cost and accuracy of the evolvers on standard problem 4 dynamics.
+
+        The trajectory of every evolver is compared with a reference computed with
+        a small maximum time step. The number of steps and energy evaluations are
+        read from the table, if the calculator writes them.
+
+        The tables of OOMMF and other calculators have no column of rejected steps.
+        They are estimated from the energy evaluations beyond those of the
+        accepted steps: every attempted step of a method takes ``stages`` new
+        evaluations (the first stage of the Dormand-Prince ``rkf54`` methods is the
+        last stage of the previous step). The estimate is not recorded for the
+        default evolver, whose method depends on the calculator.
+
+        """
+        name = "timedriver_evolver_cost"
+        t, n = 0.5e-9, 100
+
+        mesh = df.Mesh(p1=(0, 0, 0), p2=(500e-9, 125e-9, 3e-9), cell=(5e-9, 5e-9, 3e-9))
+        system = mm.System(name=name)
+        system.energy = mm.Exchange(A=1.3e-11) + mm.Demag()
+        system.dynamics = mm.Precession(gamma0=2.211e5) + mm.Damping(alpha=0.02)
+        system.m = df.Field(mesh, nvdim=3, value=(1, 0.25, 0.1), norm=8e5)
+
+        md = self.calculator.MinDriver()
+        md.drive(system)
+        # Calculators update the array of system.m in place, so the relaxed state is
+        # copied and every run starts from a new field.
+        m0 = system.m.array.copy()
+        system.energy += mm.Zeeman(
+            H=(-24.6e-3 / mm.consts.mu0, 4.3e-3 / mm.consts.mu0, 0)
+        )
+
+        def run(evolver):
+            system.m = df.Field(mesh, nvdim=3, value=m0.copy())
+            td = self.calculator.TimeDriver(evolver=evolver)
+            with mt.benchmark.PhaseTimer(td) as timer:
+                td.drive(system, t=t, n=n)
+            data = system.table.data
+            result = {
+                "call_s": timer.times["call"],
+                "trajectory": data[["mx", "my", "mz"]].to_numpy(),
+                "m": df.Field(mesh, nvdim=3, value=system.m.array.copy()),
+            }
+            for column in ["iteration", "E_calc_count"]:
+                if column in data:
+                    result[column] = int(data[column].iloc[-1])
+            return result
+
+        reference = run(self.calculator.RungeKuttaEvolver(max_timestep=2e-14))
+
+        # New energy evaluations per attempted step.
+        stages = {"rk2": 2, "rk2heun": 2, "rk4": 4, "rkf54": 6, "rkf54m": 6}
+        stages.update(rkf54s=6, euler=1, euler_start_dm=1)
+
+        evolvers = {"default": None}
+        for method in ["rk2", "rk2heun", "rk4", "rkf54", "rkf54m", "rkf54s"]:
+            evolvers[method] = self.calculator.RungeKuttaEvolver(method=method)
+        evolvers["euler"] = self.calculator.EulerEvolver()
+        evolvers["euler_start_dm"] = self.calculator.EulerEvolver(start_dm=0.02)
+
+        for label, evolver in evolvers.items():
+            result = run(evolver)
+            trajectory_error = np.max(
+                np.linalg.norm(result["trajectory"] - reference["trajectory"], axis=1)
+            )
+            final_angle = mt.assertions.angle_error(result["m"], reference["m"]).max()
+            rejected = None
+            if label in stages and {"iteration", "E_calc_count"} <= result.keys():
+                attempted = result["E_calc_count"] / stages[label]
+                rejected = max(0, round(attempted) - result["iteration"])
+            record_property(
+                label,
+                {
+                    "call_s": round(result["call_s"], 3),
+                    "steps": result.get("iteration"),
+                    "rejected_steps_estimate": rejected,
+                    "energy_evaluations": result.get("E_calc_count"),
+                    "trajectory_error": round(float(trajectory_error), 6),
+                    "final_max_angle": round(float(final_angle), 6),
+                },
+            )
+
+            assert trajectory_error < 0.05
+            assert final_angle < 0.2
+
+        self.calculator.delete(system)
+
     def test_noevolver_nodriver_finite_temperature(self):
         name = "timedriver_therm_heun_evolver_nodriver"
 
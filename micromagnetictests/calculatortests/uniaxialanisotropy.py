@@ -3,6 +3,8 @@ import micromagneticmodel as mm
 import numpy as np
 import pytest
 
+import micromagnetictests as mt
+
 
 class TestUniaxialAnisotropy:
     @pytest.fixture(autouse=True)
@@ -29,8 +31,8 @@ class TestUniaxialAnisotropy:
         system = mm.System(name=name)
         system.energy = mm.UniaxialAnisotropy(K=K, u=u)
 
-        mesh = df.Mesh(region=self.region, cell=self.cell)
-        system.m = df.Field(mesh, nvdim=3, value=(0, 0.3, 1), norm=Ms)
+        mesh = mt.cache.mesh(region=self.region, cell=self.cell)
+        system.m = mt.cache.field(mesh, nvdim=3, value=(0, 0.3, 1), norm=Ms)
 
         md = self.calculator.MinDriver()
         md.drive(system)
@@ -50,7 +52,7 @@ class TestUniaxialAnisotropy:
             else:
                 return 1e5
 
-        mesh = df.Mesh(region=self.region, cell=self.cell)
+        mesh = mt.cache.mesh(region=self.region, cell=self.cell)
 
         K = df.Field(mesh, nvdim=1, value=value_fun)
         u = (0, 0, 1)
@@ -58,7 +60,7 @@ class TestUniaxialAnisotropy:
 
         system = mm.System(name=name)
         system.energy = mm.UniaxialAnisotropy(K=K, u=u)
-        system.m = df.Field(mesh, nvdim=3, value=(0, 0.3, 1), norm=Ms)
+        system.m = mt.cache.field(mesh, nvdim=3, value=(0, 0.3, 1), norm=Ms)
 
         md = self.calculator.MinDriver()
         md.drive(system)
@@ -81,7 +83,7 @@ class TestUniaxialAnisotropy:
             else:
                 return (0, 1, 0)
 
-        mesh = df.Mesh(region=self.region, cell=self.cell)
+        mesh = mt.cache.mesh(region=self.region, cell=self.cell)
 
         K = 1e5
         u = df.Field(mesh, nvdim=3, value=value_fun)
@@ -89,7 +91,7 @@ class TestUniaxialAnisotropy:
 
         system = mm.System(name=name)
         system.energy = mm.UniaxialAnisotropy(K=K, u=u)
-        system.m = df.Field(mesh, nvdim=3, value=(1, 1, 0), norm=Ms)
+        system.m = mt.cache.field(mesh, nvdim=3, value=(1, 1, 0), norm=Ms)
 
         md = self.calculator.MinDriver()
         md.drive(system)
@@ -119,7 +121,7 @@ class TestUniaxialAnisotropy:
             else:
                 return (0, 1, 0)
 
-        mesh = df.Mesh(region=self.region, cell=self.cell)
+        mesh = mt.cache.mesh(region=self.region, cell=self.cell)
 
         K = df.Field(mesh, nvdim=1, value=K_fun)
         u = df.Field(mesh, nvdim=3, value=u_fun)
@@ -127,7 +129,7 @@ class TestUniaxialAnisotropy:
 
         system = mm.System(name=name)
         system.energy = mm.UniaxialAnisotropy(K=K, u=u)
-        system.m = df.Field(mesh, nvdim=3, value=(1, 1, 0), norm=Ms)
+        system.m = mt.cache.field(mesh, nvdim=3, value=(1, 1, 0), norm=Ms)
 
         md = self.calculator.MinDriver()
         md.drive(system)
@@ -146,14 +148,16 @@ class TestUniaxialAnisotropy:
     def test_dict_vector(self):
         name = "uniaxialanisotropy_dict_vector"
 
-        mesh = df.Mesh(region=self.region, cell=self.cell, subregions=self.subregions)
+        mesh = mt.cache.mesh(
+            region=self.region, cell=self.cell, subregions=self.subregions
+        )
         K = {"r1": 0, "r2": 1e5}
         u = (0, 0, 1)
         Ms = 1e6
 
         system = mm.System(name=name)
         system.energy = mm.UniaxialAnisotropy(K=K, u=u)
-        system.m = df.Field(mesh, nvdim=3, value=(0, 0.3, 1), norm=Ms)
+        system.m = mt.cache.field(mesh, nvdim=3, value=(0, 0.3, 1), norm=Ms)
 
         md = self.calculator.MinDriver()
         md.drive(system)
@@ -183,7 +187,7 @@ class TestUniaxialAnisotropy:
             else:
                 return (0, 1, 0)
 
-        mesh = df.Mesh(region=self.region, cell=self.cell)
+        mesh = mt.cache.mesh(region=self.region, cell=self.cell)
 
         K = df.Field(mesh, nvdim=1, value=K_fun)
         u = df.Field(mesh, nvdim=3, value=u_fun)
@@ -191,7 +195,7 @@ class TestUniaxialAnisotropy:
 
         system = mm.System(name=name)
         system.energy = mm.UniaxialAnisotropy(K=K, u=u)
-        system.m = df.Field(mesh, nvdim=3, value=(1, 1, 0), norm=Ms)
+        system.m = mt.cache.field(mesh, nvdim=3, value=(1, 1, 0), norm=Ms)
 
         md = self.calculator.MinDriver()
         md.drive(system)
@@ -218,8 +222,8 @@ class TestUniaxialAnisotropy:
         system = mm.System(name=name)
         system.energy = mm.UniaxialAnisotropy(K1=K1, K2=K2, u=u)
 
-        mesh = df.Mesh(region=self.region, cell=self.cell)
-        system.m = df.Field(mesh, nvdim=3, value=(0, 0.3, 1), norm=Ms)
+        mesh = mt.cache.mesh(region=self.region, cell=self.cell)
+        system.m = mt.cache.field(mesh, nvdim=3, value=(0, 0.3, 1), norm=Ms)
 
         md = self.calculator.MinDriver()
         md.drive(system)
@@ -1,10 +1,13 @@
 import math
+import time
 
 import discretisedfield as df
 import micromagneticmodel as mm
 import numpy as np
 import pytest
 
+import micromagnetictests as mt
+
 
 class TestZeeman:
     @pytest.fixture(autouse=True)
@@ -32,8 +35,8 @@ class TestZeeman:
         # time-independent
         system.energy = mm.Zeeman(H=H)
 
-        mesh = df.Mesh(region=self.region, cell=self.cell)
-        system.m = df.Field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
+        mesh = mt.cache.mesh(region=self.region, cell=self.cell)
+        system.m = mt.cache.field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
 
         md = self.calculator.MinDriver()
         md.drive(system)
@@ -52,8 +55,8 @@ class TestZeeman:
         # time-independent
         system.energy = mm.Zeeman(H=H)
 
-        mesh = df.Mesh(region=self.region, cell=self.cell)
-        system.m = df.Field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
+        mesh = mt.cache.mesh(region=self.region, cell=self.cell)
+        system.m = mt.cache.field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
 
         md = self.calculator.MinDriver()
         md.drive(system)
@@ -66,8 +69,8 @@ class TestZeeman:
         # with empty system dynamics, error will be raised due to
         # check system dynamics.
         system.dynamics = mm.Damping(alpha=1)
-        mesh = df.Mesh(region=self.region, cell=self.cell)
-        system.m = df.Field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
+        mesh = mt.cache.mesh(region=self.region, cell=self.cell)
+        system.m = mt.cache.field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
 
         td = self.calculator.TimeDriver()
         td.drive(system, t=0.1e-9, n=20)
@@ -75,8 +78,8 @@ class TestZeeman:
         # time-dependent - sinc
         system.energy = mm.Zeeman(H=H, func="sinc", f=1e9, t0=0)
 
-        mesh = df.Mesh(region=self.region, cell=self.cell)
-        system.m = df.Field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
+        mesh = mt.cache.mesh(region=self.region, cell=self.cell)
+        system.m = mt.cache.field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
 
         td = self.calculator.TimeDriver()
         td.drive(system, t=0.1e-9, n=20)
@@ -94,8 +97,8 @@ class TestZeeman:
 
         system.energy = mm.Zeeman(H=H, func=t_func, dt=1e-13)
 
-        mesh = df.Mesh(region=self.region, cell=self.cell)
-        system.m = df.Field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
+        mesh = mt.cache.mesh(region=self.region, cell=self.cell)
+        system.m = mt.cache.field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
 
         td = self.calculator.TimeDriver()
         td.drive(system, t=0.1e-9, n=20)
@@ -157,14 +160,92 @@ class TestZeeman:
 
         system.energy = mm.Zeeman(H=H, tcl_strings=tcl_strings)
 
-        mesh = df.Mesh(region=self.region, cell=self.cell)
-        system.m = df.Field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
+        mesh = mt.cache.mesh(region=self.region, cell=self.cell)
+        system.m = mt.cache.field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
 
         td = self.calculator.TimeDriver()
         td.drive(system, t=0.1e-9, n=20)
 
         self.calculator.delete(system)
 
+    @pytest.mark.mm_benchmark
+    def test_time_function_cost(self, tmp_path, record_property):
+        """Cost of sampling Python time functions over long time windows.
+
+        The same ramp is defined once with scalar Python operations and once with
+        NumPy operations that also accept an array of times. Both must be
+        serialised identically and the cost must grow linearly with the number of
+        samples.
+
+        Calculators may evaluate the function once per time step, so the benefit of
+        the vectorised ramp is measured directly by evaluating it on an array of
+        all sample times and comparing with a loop over the scalar ramp.
+
+        """
+        name = "zeeman_time_function_cost"
+
+        H = (0, 0, 1e6)
+        Ms = 1e6
+        dt = 1e-13
+
+        def ramp(t):
+            if t < 1e-10:
+                return 1
+            elif t < 5e-10:
+                return (5e-10 - t) / 4e-10
+            else:
+                return 0
+
+        def ramp_vectorised(t):
+            return np.clip((5e-10 - np.asarray(t)) / 4e-10, 0, 1)
+
+        system = mm.System(name=name)
+        system.dynamics = mm.Damping(alpha=1)
+        mesh = mt.cache.mesh(region=self.region, cell=self.cell)
+        system.m = mt.cache.field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
+
+        # 1e4 to 1e7 samples
+        windows = [1e-9, 1e-8, 1e-7, 1e-6]
+        for func in [ramp, ramp_vectorised]:
+            samples = []
+            results = []
+            for t in windows:
+                system.energy = mm.Zeeman(H=H, func=func, dt=dt)
+                td = self.calculator.TimeDriver()
+                dirname = tmp_path / f"{func.__name__}-{t}"
+                results.append(mt.benchmark.dry_run(td, system, dirname, t=t, n=10))
+                samples.append(round(t / dt) + 1)
+
+            for key in ["time_s", "peak_memory_B"]:
+                values = [result[key] for result in results]
+                exponent, _ = mt.benchmark.fit_power_law(samples[-3:], values[-3:])
+                record_property(f"{func.__name__} {key}", values)
+                record_property(f"{func.__name__} {key} exponent", round(exponent, 3))
+                assert exponent < 1.2
+
+            sizes = [result["input_size_B"] for result in results]
+            record_property(f"{func.__name__} input_size_B", sizes)
+            if func is ramp:
+                expected_sizes = sizes
+            else:
+                assert sizes == expected_sizes
+
+        # 1e6 samples
+        ts = np.arange(round(windows[-2] / dt) + 1) * dt
+        start = time.perf_counter()
+        looped = [ramp(t) for t in ts]
+        loop_s = time.perf_counter() - start
+        vectorised_s = []
+        for _ in range(3):
+            start = time.perf_counter()
+            vectorised = ramp_vectorised(ts)
+            vectorised_s.append(time.perf_counter() - start)
+        record_property("ramp loop_s", round(loop_s, 4))
+        record_property("ramp_vectorised array_s", round(min(vectorised_s), 4))
+
+        assert np.allclose(vectorised, looped, rtol=0, atol=1e-12)
+        assert min(vectorised_s) < loop_s / 10
+
     def test_dict(self):
         name = "zeeman_dict"
 
@@ -174,8 +255,10 @@ class TestZeeman:
         system = mm.System(name=name)
         system.energy = mm.Zeeman(H=H)
 
-        mesh = df.Mesh(region=self.region, cell=self.cell, subregions=self.subregions)
-        system.m = df.Field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
+        mesh = mt.cache.mesh(
+            region=self.region, cell=self.cell, subregions=self.subregions
+        )
+        system.m = mt.cache.field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
 
         md = self.calculator.MinDriver()
         md.drive(system)
@@ -196,8 +279,10 @@ class TestZeeman:
         # check system dynamics.
         system.dynamics = mm.Damping(alpha=1)
 
-        mesh = df.Mesh(region=self.region, cell=self.cell, subregions=self.subregions)
-        system.m = df.Field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
+        mesh = mt.cache.mesh(
+            region=self.region, cell=self.cell, subregions=self.subregions
+        )
+        system.m = mt.cache.field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
 
         md = self.calculator.MinDriver()
         md.drive(system)
@@ -209,8 +294,10 @@ class TestZeeman:
         # time-dependent - sin
         system.energy = mm.Zeeman(H=H, func="sin", f=1e9, t0=1e-12)
 
-        mesh = df.Mesh(region=self.region, cell=self.cell, subregions=self.subregions)
-        system.m = df.Field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
+        mesh = mt.cache.mesh(
+            region=self.region, cell=self.cell, subregions=self.subregions
+        )
+        system.m = mt.cache.field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
 
         td = self.calculator.TimeDriver()
         td.drive(system, t=0.1e-9, n=20)
@@ -218,8 +305,10 @@ class TestZeeman:
         # time-dependent - sinc
         system.energy = mm.Zeeman(H=H, func="sinc", f=1e9, t0=0)
 
-        mesh = df.Mesh(region=self.region, cell=self.cell, subregions=self.subregions)
-        system.m = df.Field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
+        mesh = mt.cache.mesh(
+            region=self.region, cell=self.cell, subregions=self.subregions
+        )
+        system.m = mt.cache.field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
 
         td = self.calculator.TimeDriver()
         td.drive(system, t=0.1e-9, n=20)
@@ -235,8 +324,10 @@ class TestZeeman:
 
         system.energy = mm.Zeeman(H=H, func=t_func, dt=1e-13)
 
-        mesh = df.Mesh(region=self.region, cell=self.cell, subregions=self.subregions)
-        system.m = df.Field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
+        mesh = mt.cache.mesh(
+            region=self.region, cell=self.cell, subregions=self.subregions
+        )
+        system.m = mt.cache.field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
 
         td = self.calculator.TimeDriver()
         td.drive(system, t=0.1e-9, n=20)
@@ -253,14 +344,14 @@ class TestZeeman:
             else:
                 return (0, 0, 1e6)
 
-        mesh = df.Mesh(region=self.region, cell=self.cell)
+        mesh = mt.cache.mesh(region=self.region, cell=self.cell)
 
         H = df.Field(mesh, nvdim=3, value=value_fun)
         Ms = 1e6
 
         system = mm.System(name=name)
         system.energy = mm.Zeeman(H=H)
-        system.m = df.Field(mesh, nvdim=3, value=(0, 1, 0), norm=Ms)
+        system.m = mt.cache.field(mesh, nvdim=3, value=(0, 1, 0), norm=Ms)
 
         md = self.calculator.MinDriver()
         md.drive(system)
@@ -281,14 +372,14 @@ class TestZeeman:
             else:
                 return (0, 0, 1e6)
 
-        mesh = df.Mesh(region=self.region, cell=self.cell)
+        mesh = mt.cache.mesh(region=self.region, cell=self.cell)
 
         H = df.Field(mesh, nvdim=3, value=value_fun)
         Ms = 1e6
 
         system = mm.System(name=name)
         system.energy = mm.Zeeman(H=H)
-        system.m = df.Field(mesh, nvdim=3, value=(0, 1, 0), norm=Ms)
+        system.m = mt.cache.field(mesh, nvdim=3, value=(0, 1, 0), norm=Ms)
 
         md = self.calculator.MinDriver()
         md.drive(system)
@@ -305,8 +396,8 @@ class TestZeeman:
         # check system dynamics.
         system.dynamics = mm.Damping(alpha=1)
 
-        mesh = df.Mesh(region=self.region, cell=self.cell)
-        system.m = df.Field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
+        mesh = mt.cache.mesh(region=self.region, cell=self.cell)
+        system.m = mt.cache.field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
 
         td = self.calculator.TimeDriver()
         td.drive(system, t=0.1e-9, n=20)
@@ -314,8 +405,8 @@ class TestZeeman:
         # time-dependent - sinc
         system.energy = mm.Zeeman(H=H, func="sinc", f=1e9, t0=0)
 
-        mesh = df.Mesh(region=self.region, cell=self.cell)
-        system.m = df.Field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
+        mesh = mt.cache.mesh(region=self.region, cell=self.cell)
+        system.m = mt.cache.field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
 
         td = self.calculator.TimeDriver()
         td.drive(system, t=0.1e-9, n=20)
@@ -337,8 +428,8 @@ class TestZeeman:
 
         system.energy = mm.Zeeman(H=H, func=t_func, dt=1e-13)
 
-        mesh = df.Mesh(region=self.region, cell=self.cell)
-        system.m = df.Field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
+        mesh = mt.cache.mesh(region=self.region, cell=self.cell)
+        system.m = mt.cache.field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
 
         td = self.calculator.TimeDriver()
         td.drive(system, t=0.1e-9, n=20)
@@ -366,8 +457,8 @@ class TestZeeman:
 
         system.energy = mm.Zeeman(H=H, tcl_strings=tcl_strings)
 
-        mesh = df.Mesh(region=self.region, cell=self.cell)
-        system.m = df.Field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
+        mesh = mt.cache.mesh(region=self.region, cell=self.cell)
+        system.m = mt.cache.field(mesh, nvdim=3, value=(1, 1, 1), norm=Ms)
 
         td = self.calculator.TimeDriver()
         td.drive(system, t=0.1e-9, n=20)
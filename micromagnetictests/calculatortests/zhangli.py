@@ -5,6 +5,8 @@ import micromagneticdata as mdata
 import micromagneticmodel as mm
 import pytest
 
+import micromagnetictests as mt
+
 
 class TestZhangLi:
     """
@@ -34,14 +36,11 @@ class TestZhangLi:
         K = 0.5e6
         anisotropy_axis = (0, 0, 1)
 
-        def init_m(p):
-            if p[0] < 70e-9:
-                return (0.1, 0.1, -1)
-            return (0.1, 0.1, 1)
-
         system = mm.System(name="strip_x")
         system.energy = mm.Exchange(A=A) + mm.UniaxialAnisotropy(K=K, u=anisotropy_axis)
         mesh = df.Mesh(p1=p1, p2=p2, cell=cell, subregions=subregions)
+        x, _, _ = mt.textures.coordinates(mesh)
+        init_m = mt.textures.two_region(x < 70e-9, (0.1, 0.1, -1), (0.1, 0.1, 1))
         system.m = df.Field(mesh, nvdim=3, value=init_m, norm=Ms)
 
         md = self.calculator.MinDriver()
@@ -274,12 +273,9 @@ class TestZhangLi:
         p2 = (20e-9, 200e-9, 5e-9)
         cell = (5e-9, 5e-9, 5e-9)
 
-        def init_m(p):
-            if p[1] < 70e-9:
-                return (0.1, 0.1, -1)
-            return (0.1, 0.1, 1)
-
         mesh = df.Mesh(p1=p1, p2=p2, cell=cell)
+        _, y, _ = mt.textures.coordinates(mesh)
+        init_m = mt.textures.two_region(y < 70e-9, (0.1, 0.1, -1), (0.1, 0.1, 1))
         Ms = 5.8e5
         system.m = df.Field(mesh, nvdim=3, value=init_m, norm=Ms)
 
@@ -304,3 +300,40 @@ class TestZhangLi:
         assert system.m.orientation.z.sel(y=(140e-9, 200e-9)).mean() > 0.95
 
         self.calculator.delete(system)
+
+    def test_reference_dmdt(self):
+        """
+        Compare dm/dt at t=0 in all cells with the reference implementation.
+        """
+        td = self.calculator.TimeDriver()
+
+        system = self.system
+        m_initial = df.Field(system.m.mesh, nvdim=3, value=system.m.array)
+        Heff = self.calculator.compute(system.energy.effective_field, system)
+
+        f = 2 * math.pi / 0.6e-9
+
+        def time_dep(t):
+            return 0.5 * math.cos(f * t)
+
+        # one short step approximates dm/dt at t=0
+        dt = 1e-14
+        for zhangli in [
+            mm.ZhangLi(u=self.u, beta=self.beta),
+            mm.ZhangLi(u={"r1": (self.u, 0, 0), "r2": (0, 0, 0)}, beta=self.beta),
+            mm.ZhangLi(u=self.u, beta=self.beta, func=time_dep, dt=1e-13),
+        ]:
+            system.m = df.Field(m_initial.mesh, nvdim=3, value=m_initial.array)
+            system.dynamics = (
+                mm.Precession(gamma0=mm.consts.gamma0) + mm.Damping(alpha=0.3) + zhangli
+            )
+            expected = mt.reference.dmdt(system.dynamics, m_initial, Heff)
+            torque = mt.reference.dmdt(zhangli, m_initial, Heff, alpha=0.3)
+
+            td.drive(system, t=dt, n=1)
+
+            dmdt = (system.m.orientation.array - m_initial.orientation.array) / dt
+            error = mt.assertions.max_error(expected, dmdt)
+            assert error < 0.05 * mt.assertions.max_error(torque, 0)
+
+        self.calculator.delete(system)
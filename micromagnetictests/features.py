@@ -0,0 +1,257 @@
+"""Matrix of the features exercised by tests and their cost.
+
+Every drive exercises a combination of energy and dynamics terms, the kinds of
+their parameters, and a driver. Computations with a ``compute`` wrapped by
+``micromagnetictests.hooks.hooked_compute`` exercise the computed energy terms
+with the driver ``compute``. Within a ``FeatureMatrix`` context, the
+combinations of all drives are recorded for the test which is currently running,
+together with the wall time of the tests. The report lists for every combination
+of term, parameter kind, and driver the tests which exercise it and their total
+time, and the combinations which are not exercised by any test but can exist:
+observed terms with the kinds of parameters they have been observed with, and
+observed drivers (time drivers only for dynamics terms). It is used to find
+expensive duplicate coverage and cheap gaps.
+
+The matrix is written with the ``--mm-feature-matrix=FILE`` option of the pytest
+plugin.
+
+"""
+
+import json
+
+import discretisedfield as df
+import micromagneticmodel as mm
+
+from micromagnetictests.hooks import DriveHook
+
+#: Kinds of term parameters in the order of the report.
+KINDS = ("default", "constant", "dict", "field", "func", "tcl_strings", "wave")
+
+# Attributes of terms which do not hold material parameters.
+_SETTINGS = ("name", "subregions", "func", "dt", "tcl_strings", "wave", "f", "t0")
+
+
+def kinds(term):
+    """Kinds of the parameters of a term.
+
+    Parameters are ``'constant'`` (numbers or vectors), ``'dict'`` (values per
+    subregion), or ``'field'`` (``discretisedfield.Field``). Time dependences are
+    ``'func'`` (Python function), ``'tcl_strings'`` (OOMMF Tcl script), or
+    ``'wave'`` (built-in sine or sinc wave, passed as ``wave`` or as the name in
+    ``func``). Terms without parameters, e.g. ``Demag()``, are ``'default'``.
+
+    Parameters
+    ----------
+    term : micromagneticmodel.abstract.Term
+
+        Energy or dynamics term.
+
+    Returns
+    -------
+    set
+
+        Kinds of the parameters.
+
+    Examples
+    --------
+    1. Kinds of a Zeeman term.
+
+    >>> import micromagneticmodel as mm
+    >>> import micromagnetictests as mt
+    ...
+    >>> sorted(mt.features.kinds(mm.Zeeman(H={"r1": (0, 0, 1), "r2": (0, 0, 2)})))
+    ['dict']
+    >>> sorted(mt.features.kinds(mm.Zeeman(H=(0, 0, 1), func="sinc", f=1e9, t0=0)))
+    ['constant', 'wave']
+    >>> sorted(mt.features.kinds(mm.Demag()))
+    ['default']
+
+    """
+    result = set()
+    for name, value in vars(term).items():
+        if name.startswith("_") or name in _SETTINGS:
+            continue
+        if isinstance(value, df.Field):
+            result.add("field")
+        elif isinstance(value, dict):
+            result.add("dict")
+        else:
+            result.add("constant")
+    func = vars(term).get("func")
+    if isinstance(func, str):
+        result.add("wave")
+    elif func is not None:
+        result.add("func")
+    for kind in ["tcl_strings", "wave"]:
+        if vars(term).get(kind):
+            result.add(kind)
+    return result or {"default"}
+
+
+def features(driver, system):
+    """Combinations of term, parameter kind, and driver exercised by a drive.
+
+    Dynamics terms are only included for time drives, because other drivers do
+    not solve the equation of motion.
+
+    Parameters
+    ----------
+    driver : micromagneticmodel.Driver
+
+        Driver.
+
+    system : micromagneticmodel.System
+
+        Driven system.
+
+    Returns
+    -------
+    set
+
+        Tuples ``(term, kind, driver)`` of class names and parameter kinds.
+
+    Examples
+    --------
+    1. Features of a minimisation.
+
+    >>> import micromagneticmodel as mm
+    >>> import micromagnetictests as mt
+    ...
+    >>> class MinDriver:
+    ...     _x = "iteration"
+    >>> system = mm.System(name="features")
+    >>> system.energy = mm.Exchange(A=1e-12) + mm.Demag()
+    >>> system.dynamics = mm.Damping(alpha=0.1)
+    >>> sorted(mt.features.features(MinDriver(), system))
+    [('Demag', 'default', 'MinDriver'), ('Exchange', 'constant', 'MinDriver')]
+
+    """
+    terms = list(system.energy)
+    if getattr(driver, "_x", None) == "t":
+        terms.extend(system.dynamics)
+    name = type(driver).__name__
+    return {(type(term).__name__, kind, name) for term in terms for kind in kinds(term)}
+
+
+class FeatureMatrix(DriveHook):
+    """Record the features exercised by tests.
+
+    Used as a context manager, it intercepts all drives and hooked computations
+    (see ``micromagnetictests.hooks``) and records their features for the test in
+    ``nodeid``. The wall time of tests is stored in ``durations`` by the caller.
+
+    Examples
+    --------
+    1. Recording the features of a test.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> with mt.features.FeatureMatrix() as matrix:
+    ...     matrix.nodeid = "test_zeeman.py::test_scalar"
+    ...     # md.drive(system)
+    >>> matrix.tests
+    {}
+
+    """
+
+    def __init__(self):
+        self.nodeid = None
+        self.tests = {}
+        self.durations = {}
+        self._dynamics_terms = set()
+        self._time_drivers = set()
+
+    def _drive(self, call, driver, system, **kwargs):
+        self._dynamics_terms.update(type(term).__name__ for term in system.dynamics)
+        if getattr(driver, "_x", None) == "t":
+            self._time_drivers.add(type(driver).__name__)
+        for feature in features(driver, system):
+            self.tests.setdefault(feature, set()).add(self.nodeid)
+        return call()
+
+    def _compute(self, call, compute, func, system, **kwargs):
+        term = getattr(func, "__self__", None)
+        terms = list(term) if isinstance(term, mm.Energy) else [term]
+        for term in terms:
+            if isinstance(term, mm.EnergyTerm):
+                for kind in kinds(term):
+                    feature = (type(term).__name__, kind, "compute")
+                    self.tests.setdefault(feature, set()).add(self.nodeid)
+        return call()
+
+    def gaps(self):
+        """Combinations of observed terms, kinds, and drivers which are not tested.
+
+        Every term is only combined with the kinds of parameters it has been
+        observed with, and dynamics terms only with time drivers.
+
+        Returns
+        -------
+        list
+
+            Sorted tuples ``(term, kind, driver)``.
+
+        """
+        term_kinds = {}
+        for term, kind, _ in self.tests:
+            term_kinds.setdefault(term, set()).add(kind)
+        drivers = {driver for _, _, driver in self.tests}
+        return sorted(
+            (term, kind, driver)
+            for term, kinds in term_kinds.items()
+            for kind in kinds
+            for driver in drivers
+            if (term, kind, driver) not in self.tests
+            and (term not in self._dynamics_terms or driver in self._time_drivers)
+        )
+
+    def report(self):
+        """Text report of the matrix.
+
+        Returns
+        -------
+        str
+
+            Table of all exercised combinations with the number of tests, their
+            total wall time, and their node IDs, followed by the list of gaps.
+
+        """
+        lines = [f"{'term':<24}{'kind':<14}{'driver':<20}{'tests':>6}{'time (s)':>10}"]
+        for (term, kind, driver), nodeids in sorted(
+            self.tests.items(), key=lambda item: (item[0][0], KINDS.index(item[0][1]))
+        ):
+            time = sum(self.durations.get(nodeid, 0.0) for nodeid in nodeids)
+            lines.append(
+                f"{term:<24}{kind:<14}{driver:<20}{len(nodeids):>6}{time:>10.2f}"
+            )
+            lines.extend(f"    {nodeid}" for nodeid in sorted(nodeids))
+
+        lines.append("")
+        lines.append("not exercised:")
+        lines.extend(
+            f"    {term:<24}{kind:<14}{driver}" for term, kind, driver in self.gaps()
+        )
+        return "\n".join(lines)
+
+    def save(self, path):
+        """Write the matrix as JSON.
+
+        Parameters
+        ----------
+        path : pathlib.Path, str
+
+            Output file.
+
+        """
+        matrix = [
+            {
+                "term": term,
+                "kind": kind,
+                "driver": driver,
+                "tests": sorted(nodeids),
+                "time_s": sum(self.durations.get(nodeid, 0.0) for nodeid in nodeids),
+            }
+            for (term, kind, driver), nodeids in sorted(self.tests.items())
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"matrix": matrix, "durations": self.durations}, f, indent=1)
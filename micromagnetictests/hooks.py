@@ -0,0 +1,224 @@
+"""Hooks into the drives and computations of calculators.
+
+The result cache, the time budget, the profiler, and the feature matrix of the
+pytest plugin all intercept ``micromagneticmodel.ExternalDriver.drive``. Instead of
+replacing the method one after another, they derive from ``DriveHook``.
+``drive`` is replaced once while at least one hook is active, and every drive
+passes through the active hooks in the order in which they were entered.
+
+``compute`` of calculators does not call ``drive``; calculators either call the
+private ``_call`` of an internal driver or evaluate the energy in Python. It is
+therefore wrapped separately with ``hooked_compute``. The pytest plugin does so
+for the ``compute`` of the ``calculator`` fixture of every test.
+
+The arguments of a drive or computation are bound to the signature of the original
+function, so hooks receive the same keyword arguments (including default values)
+whether they were passed by position or by keyword. The original function itself
+is called with the arguments as they were passed.
+
+"""
+
+import functools
+import inspect
+import threading
+
+import micromagneticmodel as mm
+
+# Active hooks, in the order in which they were entered.
+_hooks = []
+_original = None
+_lock = threading.Lock()
+
+
+def _options(signature, args, kwargs):
+    """System and all other arguments apart from the first one."""
+    arguments = signature.bind(*args, **kwargs)
+    arguments.apply_defaults()
+    parameters = list(signature.parameters.values())
+    options = {}
+    for parameter in parameters[2:]:
+        value = arguments.arguments[parameter.name]
+        if parameter.kind == inspect.Parameter.VAR_KEYWORD:
+            options.update(value)
+        elif parameter.kind != inspect.Parameter.VAR_POSITIONAL:
+            options[parameter.name] = value
+    return arguments.arguments[parameters[1].name], options
+
+
+def _hooked(original, intercept):
+    """Wrap ``original`` so that its calls pass through the active hooks.
+
+    ``intercept(hook, call, first, system, options)`` passes one call to a hook,
+    where ``first`` is the first argument of ``original``.
+
+    """
+    signature = inspect.signature(original)
+
+    @functools.wraps(original)
+    def wrapper(*args, **kwargs):
+        try:
+            system, options = _options(signature, args, kwargs)
+        except TypeError:  # the original function reports invalid arguments
+            return original(*args, **kwargs)
+        hooks = list(_hooks)
+
+        def call(index=0):
+            if index == len(hooks):
+                return original(*args, **kwargs)
+            next_call = functools.partial(call, index + 1)
+            return intercept(hooks[index], next_call, args[0], system, options)
+
+        return call()
+
+    return wrapper
+
+
+def hooked_compute(compute):
+    """Wrap the ``compute`` function of a calculator with the active hooks.
+
+    Parameters
+    ----------
+    compute : callable
+
+        ``compute`` of a calculator, e.g. ``oommfc.compute``.
+
+    Returns
+    -------
+    callable
+
+        Function with the same signature, whose calls pass through the hooks that
+        are active when it is called. Without active hooks, ``compute`` is called
+        directly.
+
+    Examples
+    --------
+    1. Wrapping ``compute``.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> compute = mt.hooks.hooked_compute(mt.numpyc.compute)
+    >>> compute.__wrapped__ is mt.numpyc.compute
+    True
+
+    """
+
+    def intercept(hook, call, func, system, options):
+        return hook._compute(call, compute, func, system, **options)
+
+    return _hooked(compute, intercept)
+
+
+def _intercept_drive(hook, call, driver, system, options):
+    return hook._drive(call, driver, system, **options)
+
+
+class DriveHook:
+    """Base class of context managers which intercept drives and computations.
+
+    Within the context, every call of ``micromagneticmodel.ExternalDriver.drive``
+    is passed to ``_drive``, and every call of a ``compute`` wrapped with
+    ``hooked_compute`` is passed to ``_compute``. Subclasses override them. Hooks
+    can be nested; the hook entered first is the outermost.
+
+    Examples
+    --------
+    1. Counting drives.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> class Counter(mt.hooks.DriveHook):
+    ...     drives = 0
+    ...
+    ...     def _drive(self, call, driver, system, **kwargs):
+    ...         self.drives += 1
+    ...         return call()
+    ...
+    >>> with Counter() as counter:
+    ...     pass  # md.drive(system)
+    >>> counter.drives
+    0
+
+    """
+
+    def _drive(self, call, driver, system, **kwargs):
+        """Intercept a drive.
+
+        Parameters
+        ----------
+        call : callable
+
+            Function without arguments which runs the drive (through the inner
+            hooks) with the arguments passed by the caller, and returns its result.
+
+        driver : micromagneticmodel.ExternalDriver
+
+            Driver.
+
+        system : micromagneticmodel.System
+
+            System to be driven.
+
+        kwargs : dict
+
+            All other arguments of ``drive``, including default values.
+
+        Returns
+        -------
+        object
+
+            Result of the drive.
+
+        """
+        return call()
+
+    def _compute(self, call, compute, func, system, **kwargs):
+        """Intercept a computation.
+
+        Parameters
+        ----------
+        call : callable
+
+            Function without arguments which runs the computation (through the
+            inner hooks) with the arguments passed by the caller, and returns its
+            result.
+
+        compute : callable
+
+            ``compute`` function of the calculator.
+
+        func : callable
+
+            Computed property of an energy term or container, e.g.
+            ``system.energy.density``.
+
+        system : micromagneticmodel.System
+
+            System.
+
+        kwargs : dict
+
+            All other arguments of ``compute``, including default values.
+
+        Returns
+        -------
+        object
+
+            Computed value.
+
+        """
+        return call()
+
+    def __enter__(self):
+        global _original
+        with _lock:
+            if not _hooks:
+                _original = mm.ExternalDriver.drive
+                mm.ExternalDriver.drive = _hooked(_original, _intercept_drive)
+            _hooks.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        with _lock:
+            _hooks.remove(self)
+            if not _hooks:
+                mm.ExternalDriver.drive = _original
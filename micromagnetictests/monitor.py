@@ -0,0 +1,461 @@
+"""Supervision of running drives.
+
+Long dynamics tests only check their results after the drive has finished. The
+monitors in this module read the table of a drive while the calculator is still
+running and stop the calculator as soon as the result of the test is known, so
+that broken calculators fail in a fraction of the full run time. Budgets stop
+calculators which take much longer than expected, e.g. because they hang.
+
+"""
+
+import contextlib
+import functools
+import json
+import os
+import pathlib
+import signal
+import subprocess
+import threading
+import time
+
+import numpy as np
+import ubermagtable.util
+
+from micromagnetictests.benchmark import TableMonitor, child_processes
+from micromagnetictests.hooks import DriveHook
+
+
+def _alive(pid):
+    """Check whether a process exists and is not a zombie."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except (OSError, IndexError):
+        try:
+            os.kill(pid, 0)
+        except OSError:
+            return False
+        return True
+
+
+def terminate(pids, timeout=1.0):
+    """Terminate processes.
+
+    All processes are first asked to terminate with ``SIGTERM``. Processes which
+    are still running after ``timeout`` seconds are killed with ``SIGKILL``.
+
+    Parameters
+    ----------
+    pids : list
+
+        Process IDs, e.g. obtained from
+        ``micromagnetictests.benchmark.child_processes``.
+
+    timeout : numbers.Real, optional
+
+        Time in seconds the processes are given to terminate. Defaults to ``1``.
+
+    Examples
+    --------
+    1. Terminating all descendants of the current process.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> mt.monitor.terminate(mt.benchmark.child_processes())
+
+    """
+    for sig in [signal.SIGTERM, getattr(signal, "SIGKILL", signal.SIGTERM)]:
+        for pid in pids:
+            with contextlib.suppress(OSError):  # process finished in the meantime
+                os.kill(pid, sig)
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            pids = [pid for pid in pids if _alive(pid)]
+            if not pids:
+                return
+            time.sleep(0.01)
+
+
+class ProcessTracker:
+    """Processes started by the current thread.
+
+    Used as a context manager, it records every ``subprocess.Popen`` created by the
+    thread which entered the context, i.e. the solver processes started by drives.
+    Processes started by other threads or before the context was entered are not
+    recorded, so that ``terminate`` only stops the calculator of the current drive.
+
+    Calculators which run inside the Python process (without a subprocess) cannot
+    be stopped; ``terminate`` returns an empty list for them.
+
+    Examples
+    --------
+    1. Recording the processes of a drive.
+
+    >>> import subprocess
+    >>> import sys
+    >>> import micromagnetictests as mt
+    ...
+    >>> with mt.monitor.ProcessTracker() as tracker:
+    ...     _ = subprocess.run([sys.executable, "-c", "pass"], check=True)
+    >>> len(tracker.processes)
+    1
+    >>> tracker.terminate()
+    []
+
+    """
+
+    def __init__(self):
+        self.processes = []
+        self._thread = None
+        self._original = None
+
+    def terminate(self, timeout=1.0):
+        """Terminate the recorded processes which are still running.
+
+        Descendants of the recorded processes are terminated as well where the
+        process table is available (see
+        ``micromagnetictests.benchmark.child_processes``).
+
+        Parameters
+        ----------
+        timeout : numbers.Real, optional
+
+            Time in seconds the processes are given to terminate. Defaults to
+            ``1``.
+
+        Returns
+        -------
+        list
+
+            Process IDs of the terminated processes.
+
+        """
+        pids = []
+        for process in list(self.processes):
+            # ``poll`` would reap the process concurrently with the thread waiting
+            # for it.
+            if process.returncode is None and _alive(process.pid):
+                # Descendants are listed before their parent is terminated and
+                # they are reparented.
+                pids.extend([process.pid, *child_processes(process.pid)])
+        terminate(pids, timeout=timeout)
+        return pids
+
+    def __enter__(self):
+        self._thread = threading.get_ident()
+        self._original = original = subprocess.Popen.__init__
+
+        @functools.wraps(original)
+        def __init__(process, *args, **kwargs):
+            original(process, *args, **kwargs)
+            if threading.get_ident() == self._thread:
+                self.processes.append(process)
+
+        subprocess.Popen.__init__ = __init__
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        subprocess.Popen.__init__ = self._original
+
+
+class Envelope:
+    """Band of allowed values of a table column.
+
+    A value of ``column`` lies inside the envelope if it is strictly between
+    ``lower`` and ``upper``. Only rows in which ``x`` is between ``start`` and
+    ``stop`` are checked. Values which are not numbers (NaN) are always outside.
+
+    Parameters
+    ----------
+    column : str
+
+        Name of the column, e.g. ``'my'``.
+
+    lower, upper : numbers.Real, optional
+
+        Bounds of the band. Default to ``-inf`` and ``inf``.
+
+    start, stop : numbers.Real, optional
+
+        Range of ``x`` in which the band is checked. Default to ``-inf`` and
+        ``inf``.
+
+    x : str, optional
+
+        Name of the independent variable. Defaults to ``'t'``.
+
+    Examples
+    --------
+    1. Checking rows of a table.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> envelope = mt.monitor.Envelope("my", lower=-0.5, upper=0.8)
+    >>> envelope.violation({"t": 1e-10, "my": 0.3}) is None
+    True
+    >>> envelope.violation({"t": 1e-10, "my": 0.9})
+    'my=0.9 at t=1e-10 is outside (-0.5, 0.8).'
+
+    """
+
+    def __init__(
+        self, column, lower=-np.inf, upper=np.inf, start=-np.inf, stop=np.inf, x="t"
+    ):
+        self.column = column
+        self.lower = lower
+        self.upper = upper
+        self.start = start
+        self.stop = stop
+        self.x = x
+
+    def violation(self, row):
+        """Description of the violation of the envelope by a table row.
+
+        Parameters
+        ----------
+        row : dict
+
+            Values of the row with column names as keys. Rows without
+            ``column`` or ``x`` are ignored.
+
+        Returns
+        -------
+        str
+
+            Description of the violation or ``None`` if the row lies inside the
+            envelope.
+
+        """
+        if self.column not in row or self.x not in row:
+            return None
+        if not self.start <= row[self.x] <= self.stop:
+            return None
+        value = row[self.column]
+        if self.lower < value < self.upper:
+            return None
+        return (
+            f"{self.column}={value:.4g} at {self.x}={row[self.x]:.4g} is outside "
+            f"({self.lower}, {self.upper})."
+        )
+
+
+class EnvelopeMonitor(TableMonitor):
+    """Stop a drive as soon as its table leaves an envelope.
+
+    The table files of new drives of ``system`` are read in a background thread
+    while the calculator runs. Every new row is checked against ``envelopes``. At
+    the first violation the solver processes started inside the context (see
+    ``micromagnetictests.monitor.ProcessTracker``) are terminated and an
+    ``AssertionError`` describing the violation is raised when the context is left.
+    Calculators running inside the Python process cannot be stopped; for them the
+    error is raised after the drive has finished.
+
+    OOMMF ``.odt`` and mumax3 ``table.txt`` files are supported. Column names are
+    the short names used in ``system.table``.
+
+    Parameters
+    ----------
+    system : micromagneticmodel.System
+
+        System that is driven.
+
+    envelopes : list
+
+        List of ``micromagnetictests.monitor.Envelope`` objects.
+
+    dirname : str, optional
+
+        Directory passed to ``drive``. Defaults to ``'.'``.
+
+    interval : numbers.Real, optional
+
+        Polling interval in seconds. Defaults to ``0.01``.
+
+    Examples
+    --------
+    1. Monitoring a drive of standard problem 4.
+
+    >>> import micromagneticmodel as mm
+    >>> import micromagnetictests as mt
+    ...
+    >>> system = mm.System(name="stdprob4")
+    >>> envelopes = [mt.monitor.Envelope("my", lower=-0.5, upper=0.8)]
+    >>> with mt.monitor.EnvelopeMonitor(system, envelopes) as monitor:
+    ...     pass  # td.drive(system, t=1e-9, n=200)
+    >>> monitor.violation is None
+    True
+
+    """
+
+    def __init__(self, system, envelopes, dirname=".", interval=0.01):
+        super().__init__(system, dirname=dirname, interval=interval)
+        self.envelopes = envelopes
+        self.violation = None
+        self._columns = {}
+        self._processes = ProcessTracker()
+
+    def _line(self, path, line, now):
+        if self.violation is not None:
+            return
+        if line.startswith(b"#"):
+            # The header of mumax3 tables is the first line; OOMMF tables contain
+            # a line starting with ``# Columns:``.
+            if b"Columns:" in line or path.name == "table.txt":
+                self._columns[path] = ubermagtable.util.columns(path)
+            return
+        super()._line(path, line, now)
+
+        columns = self._columns.get(path)
+        if columns is None:
+            return
+        try:
+            row = dict(zip(columns, map(float, line.split())))
+        except ValueError:
+            return
+        for envelope in self.envelopes:
+            violation = envelope.violation(row)
+            if violation is not None:
+                self.violation = violation
+                self._processes.terminate()
+                return
+
+    def __enter__(self):
+        self._processes.__enter__()
+        return super().__enter__()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        super().__exit__(exc_type, exc_value, traceback)
+        self._processes.__exit__(exc_type, exc_value, traceback)
+        if self.violation is not None:
+            raise AssertionError(
+                f"Drive stopped early: {self.violation}"
+            ) from exc_value
+
+
+class Budget(DriveHook):
+    """Wall-clock budget of drives.
+
+    Used as a context manager, it intercepts all drives and hooked computations
+    (see ``micromagnetictests.hooks``) and stops the calculator if one takes longer
+    than its budget of ``offset + rate * cells * steps`` seconds. The number of
+    steps is the number of stages ``n`` of time drives, the total number of field
+    steps of hysteresis drives, and one for all other drives and computations.
+
+    When the budget is exceeded, the solver processes started by the drive (see
+    ``micromagnetictests.monitor.ProcessTracker``) are terminated and a
+    ``TimeoutError`` is raised. The drive or compute directory is kept and a
+    ``budget.json`` file with the budget, the elapsed time, and the error reported
+    by the calculator is written into it. Calculators running inside the Python
+    process cannot be stopped; for them the ``TimeoutError`` is raised after the
+    drive has finished.
+
+    Parameters
+    ----------
+    rate : numbers.Real
+
+        Time in seconds per cell and step.
+
+    offset : numbers.Real, optional
+
+        Time in seconds, which covers the startup of the calculator and drives
+        with few cells. Defaults to ``10``.
+
+    Examples
+    --------
+    1. Limiting the time of drives.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> with mt.monitor.Budget(rate=1e-5) as budget:
+    ...     pass  # td.drive(system, t=1e-9, n=200)
+    >>> budget.seconds(100, n=200)
+    10.2
+
+    """
+
+    def __init__(self, rate, offset=10.0):
+        self.rate = rate
+        self.offset = offset
+
+    def seconds(self, cells, **kwargs):
+        """Budget of a drive.
+
+        Parameters
+        ----------
+        cells : int
+
+            Number of discretisation cells.
+
+        kwargs : dict
+
+            Keyword arguments of ``drive``.
+
+        Returns
+        -------
+        float
+
+            Budget in seconds.
+
+        """
+        if "Hsteps" in kwargs:
+            steps = sum(step[-1] for step in kwargs["Hsteps"])
+        else:
+            steps = kwargs.get("n", 1)
+        return self.offset + self.rate * cells * steps
+
+    def _drive(self, call, driver, system, **kwargs):
+        return self._run(call, system, "drive", **kwargs)
+
+    def _compute(self, call, compute, func, system, **kwargs):
+        return self._run(call, system, "compute", **kwargs)
+
+    def _run(self, call, system, mode, **kwargs):
+        cells = int(np.prod(system.m.mesh.n))
+        seconds = self.seconds(cells, **kwargs)
+        expired = threading.Event()
+        processes = ProcessTracker()
+
+        def expire():
+            expired.set()
+            processes.terminate()
+
+        timer = threading.Timer(seconds, expire)
+        start = time.perf_counter()
+        timer.start()
+        try:
+            with processes:
+                result = call()
+        except Exception as e:
+            if expired.is_set():
+                # The failed run is not counted in ``drive_number`` or
+                # ``compute_number``.
+                workingdir = self._workingdir(system, mode, 0, **kwargs)
+                self._timeout(workingdir, mode, seconds, start, cells, e)
+            raise
+        finally:
+            timer.cancel()
+        if expired.is_set():
+            workingdir = self._workingdir(system, mode, -1, **kwargs)
+            self._timeout(workingdir, mode, seconds, start, cells, None)
+        return result
+
+    @staticmethod
+    def _workingdir(system, mode, offset, dirname=".", **kwargs):
+        number = getattr(system, f"{mode}_number") + offset
+        return pathlib.Path(dirname, system.name, f"{mode}-{number}")
+
+    def _timeout(self, workingdir, mode, seconds, start, cells, error):
+        info = {
+            "budget_s": seconds,
+            "elapsed_s": time.perf_counter() - start,
+            "cells": cells,
+            "rate": self.rate,
+            "offset": self.offset,
+            "error": None if error is None else repr(error),
+        }
+        with open(workingdir / "budget.json", "w", encoding="utf-8") as f:
+            json.dump(info, f)
+        raise TimeoutError(
+            f"{mode.capitalize()} exceeded its budget of {seconds:.3g} s ({cells}"
+            f" cells); partial results are kept in {workingdir}."
+        ) from error
@@ -0,0 +1,84 @@
+"""Reference calculator written in NumPy.
+
+``numpyc`` implements the calculator interface used by ``calculatortests`` --
+``MinDriver``, ``TimeDriver``, ``HysteresisDriver``, ``RelaxDriver``,
+``compute``, ``delete``, and the evolvers of ``oommfc`` -- without an external
+micromagnetic code. Drives create the same directories, ``info.json`` files,
+``.odt`` tables and ``.omf`` files as ``oommfc``, so that the results are read
+with ``micromagneticdata``. The local energy terms are vectorised NumPy
+expressions and the demagnetisation field is a convolution with the Newell
+tensor computed by FFT.
+
+It is a small and slow reference for testing the test suite itself and for
+cross-checking calculators on small meshes. It does not write OOMMF ``.mif``
+files, does not support ``MagnetoElastic`` or Tcl strings, and ignores the
+``method`` of ``CGEvolver``, ``n_threads``, and ``runner``.
+
+The calculator tests which cannot pass with ``numpyc`` or which take minutes
+with it are listed in ``UNSUPPORTED_TESTS``; the pytest plugin skips them, so
+that the remaining calculator tests run in about a minute.
+
+Examples
+--------
+1. Running the calculator tests against ``numpyc``.
+
+>>> import micromagnetictests as mt
+...
+>>> # pytest --pyargs micromagnetictests.calculatortests with a ``calculator``
+>>> # fixture returning ``mt.numpyc``
+
+"""
+
+from micromagnetictests.numpyc import model as model
+from micromagnetictests.numpyc.compute import compute as compute
+from micromagnetictests.numpyc.delete import delete as delete
+from micromagnetictests.numpyc.drivers import Driver as Driver
+from micromagnetictests.numpyc.drivers import HysteresisDriver as HysteresisDriver
+from micromagnetictests.numpyc.drivers import MinDriver as MinDriver
+from micromagnetictests.numpyc.drivers import RelaxDriver as RelaxDriver
+from micromagnetictests.numpyc.drivers import TimeDriver as TimeDriver
+from micromagnetictests.numpyc.evolvers import CGEvolver as CGEvolver
+from micromagnetictests.numpyc.evolvers import EulerEvolver as EulerEvolver
+from micromagnetictests.numpyc.evolvers import RungeKuttaEvolver as RungeKuttaEvolver
+from micromagnetictests.numpyc.evolvers import SpinTEvolver as SpinTEvolver
+from micromagnetictests.numpyc.evolvers import SpinXferEvolver as SpinXferEvolver
+from micromagnetictests.numpyc.evolvers import UHH_ThetaEvolver as UHH_ThetaEvolver
+from micromagnetictests.numpyc.evolvers import (
+    Xf_ThermHeunEvolver as Xf_ThermHeunEvolver,
+)
+from micromagnetictests.numpyc.evolvers import (
+    Xf_ThermSpinXferEvolver as Xf_ThermSpinXferEvolver,
+)
+
+_MUMAX3 = (
+    "Expects the errors of mumax3, which the test recognises by the presence of"
+    " RelaxDriver."
+)
+_TCL = "Tcl strings are not supported by numpyc."
+_SLOW = "Too slow with numpyc."
+
+#: Calculator tests skipped with ``numpyc`` and the reasons. The keys are the
+#: qualified names of the tests relative to ``micromagnetictests.calculatortests``.
+UNSUPPORTED_TESTS = {
+    "dmi.TestDMI.test_scalar": _MUMAX3,
+    "dmi.TestDMI.test_dict": _MUMAX3,
+    "dmi.TestDMI.test_crystalclass_init": _MUMAX3,
+    "mindriver.TestMinDriver.test_output_files": "numpyc does not write .mif files.",
+    "timedriver.TestTimeDriver.test_output_files": "numpyc does not write .mif files.",
+    "schedule.test_schedule": "Needs the oommf executable.",
+    "slonczewski.TestSlonczewski.test_single_values": _TCL,
+    "slonczewski.TestSlonczewski.test_single_values_finite_temperature": _TCL,
+    "slonczewski.TestSlonczewski.test_dict_values": _TCL,
+    "slonczewski.TestSlonczewski.test_field_values": _TCL,
+    "zeeman.TestZeeman.test_time_vector": _TCL,
+    "zeeman.TestZeeman.test_time_field": _TCL,
+    "zhangli.TestZhangLi.test_time_tcl_scalar_u": _TCL,
+    "stdprob3.test_stdprob3": _SLOW,
+    "stdprob4.test_stdprob4": _SLOW,
+    "stdprob5.test_stdprob5": _SLOW,
+    "demag.TestDemag.test_demag_3_pbc": _SLOW,
+    "dmi.TestDMI.test_crystalclass": _SLOW,
+    "schedule.test_schedule_local": _SLOW,
+    "zhangli.TestZhangLi.test_field_scalar_u": _SLOW,
+    "zhangli.TestZhangLi.test_field_vector_u": _SLOW,
+}
@@ -0,0 +1,13 @@
+"""Run a drive scheduled with ``numpyc``.
+
+The only argument is the pickle file written by ``Driver.schedule``, which holds
+the driver, the system, and the keyword arguments of the drive.
+
+"""
+
+import pickle
+import sys
+
+with open(sys.argv[1], "rb") as f:
+    driver, system, kwargs = pickle.load(f)
+driver._run(system, **kwargs)
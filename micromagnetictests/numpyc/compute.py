@@ -0,0 +1,128 @@
+"""Evaluation of energies, energy densities, and effective fields."""
+
+import os
+import time
+
+import discretisedfield as df
+import micromagneticmodel as mm
+import ubermagutil as uu
+
+from micromagnetictests.numpyc import drivers, model, output
+
+
+def compute(
+    func,
+    system,
+    /,
+    dirname=".",
+    append=True,
+    n_threads=None,
+    runner=None,
+    ovf_format="bin8",
+    verbose=1,
+):
+    """Computes a particular value of an energy term or energy container
+    (``energy``, ``density``, or ``effective_field``).
+
+    Time-dependent terms are evaluated at ``t=0``. The magnetisation and the
+    result are written to a new compute directory (``<name>/compute-<number>``)
+    in the formats written by OOMMF.
+
+    Parameters
+    ----------
+    func : callable
+
+        A property of an energy term or an energy container.
+
+    system : micromagneticmodel.System
+
+        Micromagnetic system for which the property is calculated.
+
+    dirname : str, optional
+
+        Name of a base directory in which the results are stored. If not
+        specified the current working directory is used.
+
+    append : bool, optional
+
+        If ``True`` and the system directory already exists, drive or
+        compute directories will be appended. Defaults to ``True``.
+
+    n_threads, runner : optional
+
+        Accepted for compatibility with other calculators and ignored.
+
+    ovf_format : str
+
+        Format of the written fields. Can be one of ``'bin8'``, ``'bin4'``, or
+        ``'txt'``. Defaults to ``'bin8'``.
+
+    verbose : int, optional
+
+        If ``verbose=0``, no output is printed. Defaults to ``1``.
+
+    Returns
+    -------
+    numbers.Real, discretisedfield.Field
+
+        Resulting value.
+
+    Raises
+    ------
+    ValueError
+
+        If ``func`` is not ``energy``, ``density``, or ``effective_field``.
+
+    Examples
+    --------
+    1. Computing values of energy terms.
+
+    >>> import micromagneticmodel as mm
+    >>> import micromagnetictests as mt
+    ...
+    >>> system = mm.examples.macrospin()
+    >>> mt.numpyc.compute(system.energy.zeeman.energy, system, verbose=0)
+    -8.8...e-22
+    >>> mt.numpyc.compute(system.energy.effective_field, system, verbose=0)
+    Field(...)
+    >>> mt.numpyc.delete(system)
+
+    """
+    if func.__name__ not in ("energy", "density", "effective_field"):
+        msg = f"Computing the value of {func} is not supported."
+        raise ValueError(msg)
+    output.check_ovf_format(ovf_format)
+
+    start = time.perf_counter()
+    if verbose >= 1:
+        print("Running numpyc (compute)...", end="", flush=True)
+    term = func.__self__
+    terms = list(term) if isinstance(term, mm.Energy) else [term]
+    compiled = model.Model(system, terms=terms)
+    m = compiled.m0
+    mesh = system.m.mesh
+
+    workingdir = drivers.TimeDriver._setup_working_directory(
+        system=system, dirname=dirname, mode="compute", append=append
+    )
+    with uu.changedir(workingdir):
+        system.m.to_file("m0.omf", representation=ovf_format)
+        if func.__name__ == "energy":
+            result = compiled.energy(m)
+            out = output.Output(system.name, "TimeDriver", "", compiled)
+            out.row(m, 0, {}, {})
+            out.close()
+        elif func.__name__ == "density":
+            value = sum(term.density(m) for term in compiled.terms)
+            result = df.Field(mesh, nvdim=1, value=value)
+            # discretisedfield does not write the .oef extension of OOMMF.
+            result.to_file(f"{system.name}.ovf", representation=ovf_format)
+            os.replace(f"{system.name}.ovf", f"{system.name}.oef")
+        else:
+            result = df.Field(mesh, nvdim=3, value=compiled.field(m))
+            result.to_file(f"{system.name}.ohf", representation=ovf_format)
+
+    system.compute_number += 1
+    if verbose >= 1:
+        print(f" ({time.perf_counter() - start:.1f} s)")
+    return result
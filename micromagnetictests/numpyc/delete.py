@@ -0,0 +1,55 @@
+"""Deletion of the files of a system."""
+
+import os
+import shutil
+
+
+def delete(system, silent=False):
+    """Deletes micromagnetic system files.
+
+    This is a convenience function for deleting all of the data associated with
+    a system object. More precisely, the directory with name the same as
+    ``system.name`` is deleted. If ``silent=True`` is passed, no error is
+    raised if the directory does not exist.
+
+    Parameters
+    ----------
+    system : micromagneticmodel.System
+
+        System whose files are deleted.
+
+    silent : bool, optional
+
+        If ``True``, no error is raised if the directory does not exist.
+
+    Raises
+    ------
+    FileNotFoundError
+
+        If the directory with ``system.name`` does not exist and
+        ``silent=False``.
+
+    Examples
+    --------
+    1. Delete system files.
+
+    >>> import os
+    >>> import micromagneticmodel as mm
+    >>> import micromagnetictests as mt
+    ...
+    >>> system = mm.examples.macrospin()
+    >>> td = mt.numpyc.TimeDriver()
+    >>> td.drive(system, t=1e-12, n=5, verbose=0)
+    >>> os.path.exists(system.name)
+    True
+    >>> mt.numpyc.delete(system)  # deletes directory
+    >>> os.path.exists(system.name)
+    False
+
+    """
+    if os.path.exists(system.name):
+        shutil.rmtree(system.name)
+        system.drive_number = 0
+    elif not silent:
+        msg = f"Directory {system.name} does not exist."
+        raise FileNotFoundError(msg)
@@ -0,0 +1,676 @@
+"""Drivers.
+
+Drives are solved with NumPy in the Python process which calls ``drive``. The
+drive directory contains ``info.json``, the initial magnetisation ``m0.omf``, the
+table ``<name>.odt``, and magnetisation files ``<name>-*.omf`` named as by OOMMF,
+so that the results are read by ``micromagneticdata``.
+
+"""
+
+import abc
+import inspect
+import pathlib
+import pickle
+import shlex
+import sys
+import time
+
+import discretisedfield as df
+import micromagneticmodel as mm
+import numpy as np
+import ubermagtable as ut
+
+from micromagnetictests.numpyc import evolvers, model, output, solver
+
+#: Time step in s of thermal evolvers which do not define it.
+THERMAL_TIMESTEP = 1e-14
+
+#: Default of ``stopping_mxHxm`` in A/m. It is lower than the ``0.1`` A/m of
+#: OOMMF, because steepest descent approaches the minimum from one side and
+#: stops with a remaining error of the order of the torque.
+STOPPING_MXHXM = 1e-4
+
+#: Relative decrease of the energy in ``RELAX_WINDOW`` steps of ``RelaxDriver``
+#: below which the relaxation is completed with the minimiser.
+RELAX_ENERGY_CHANGE = 1e-3
+
+#: Number of steps of ``RelaxDriver`` between checks of the energy.
+RELAX_WINDOW = 10
+
+#: Default of ``stage_iteration_limit``.
+ITERATION_LIMIT = 100000
+
+_EVOLVE = {
+    evolvers.CGEvolver: "Oxs_CGEvolve",
+    evolvers.RungeKuttaEvolver: "Oxs_RungeKuttaEvolve",
+    evolvers.EulerEvolver: "Oxs_EulerEvolve",
+    evolvers.SpinTEvolver: "Anv_SpinTEvolve",
+    evolvers.SpinXferEvolver: "Oxs_SpinXferEvolve",
+    evolvers.UHH_ThetaEvolver: "UHH_ThetaEvolve",
+    evolvers.Xf_ThermHeunEvolver: "Xf_ThermHeunEvolve",
+    evolvers.Xf_ThermSpinXferEvolver: "Xf_ThermSpinXferEvolve",
+}
+
+_THERMAL = (evolvers.UHH_ThetaEvolver, evolvers.Xf_ThermHeunEvolver)
+
+_DYNAMICS = (
+    evolvers.RungeKuttaEvolver,
+    evolvers.EulerEvolver,
+    evolvers.UHH_ThetaEvolver,
+    evolvers.Xf_ThermHeunEvolver,
+)
+
+_RUNGE_KUTTA = {
+    "min_timestep": "min_timestep",
+    "max_timestep": "max_timestep",
+    "start_dm": "start_dm",
+    "start_dt": "start_dt",
+    "absolute_step_error": "absolute_step_error",
+    "relative_step_error": "relative_step_error",
+    "max_step_headroom": "step_headroom",
+    "step_headroom": "step_headroom",
+}
+
+
+def _runge_kutta(rhs, evolver):
+    """Runge-Kutta integrator configured with the attributes of ``evolver``."""
+    options = {
+        option: vars(evolver)[name]
+        for name, option in _RUNGE_KUTTA.items()
+        if name in vars(evolver)
+    }
+    if isinstance(evolver, evolvers.EulerEvolver):
+        method = "euler"
+        options.setdefault("relative_step_error", None)
+    else:
+        method = vars(evolver).get("method", "rkf54s")
+    if method not in solver.TABLEAUX:
+        raise ValueError(f"Runge-Kutta method {method=} is not supported.")
+    return solver.RungeKutta(rhs, solver.TABLEAUX[method], **options)
+
+
+def _temperature(system, evolver):
+    return vars(evolver).get("temperature", system.T)
+
+
+def _field(mesh, nvdim, array, vdims, unit, valid):
+    return df.Field(mesh, nvdim=nvdim, value=array, vdims=vdims, unit=unit, valid=valid)
+
+
+def _container(cls, terms):
+    return sum(terms, cls())
+
+
+def _system(name, T, energy, dynamics, m):
+    return mm.System(name=name, energy=energy, dynamics=dynamics, m=m, T=T)
+
+
+class _Pickler(pickle.Pickler):
+    """Pickler of scheduled drives.
+
+    Fields, energy and dynamics containers, and systems cannot be unpickled
+    directly, because their ``__getattr__`` is called before their state is
+    restored. They are rebuilt from their parts instead.
+
+    """
+
+    def reducer_override(self, obj):
+        if isinstance(obj, df.Field):
+            return _field, (
+                obj.mesh,
+                obj.nvdim,
+                obj.array,
+                obj.vdims,
+                obj.unit,
+                obj.valid,
+            )
+        if isinstance(obj, (mm.Energy, mm.Dynamics)):
+            return _container, (type(obj), list(obj))
+        if isinstance(obj, mm.System):
+            return _system, (obj.name, obj.T, obj.energy, obj.dynamics, obj.m)
+        return NotImplemented
+
+
+class Driver(mm.ExternalDriver):
+    """Driver base class."""
+
+    #: Classes of evolvers which can be used; the first one is the default.
+    _evolvers = ()
+
+    #: Name of the OOMMF driver used for output files.
+    _oxs = None
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        if hasattr(self, "evolver"):
+            self.autoselect_evolver = False
+        else:
+            self.autoselect_evolver = True
+
+    @abc.abstractmethod
+    def _checkargs(self, kwargs):
+        """Check drive keyword arguments.
+
+        This method can also update keyword arguments where required. Changes must
+        happen in-place, i.e. `kwargs` must be modified directly.
+        """
+
+    @abc.abstractmethod
+    def _solve(self, system, compiled, evolver, out, **kwargs):
+        """Solve the drive and write the table and magnetisation files."""
+
+    def drive_kwargs_setup(self, drive_kwargs):
+        """Additional keyword arguments allowed for drive.
+
+        This function tests additional keyword arguments that have been passed to the
+        ``drive`` method (it is not intended for direct use). A drive in numpyc can
+        accept the following additional keyword arguments.
+
+        Parameters
+        ----------
+        fixed_subregions : list, optional
+
+            List of strings, where each string is the name of the subregion in
+            the mesh whose spins should remain fixed while the system is being
+            driven. Defaults to ``None``.
+
+        output_step : bool, optional
+
+            If ``True``, output is saved at each step. Default to ``False``.
+
+        n_threads : int, optional
+
+            Accepted for compatibility with other calculators and ignored.
+
+        """
+        self._checkargs(drive_kwargs)
+        drive_kwargs.setdefault("fixed_subregions", None)
+        drive_kwargs.setdefault("output_step", False)
+        drive_kwargs.setdefault("n_threads", None)
+
+    def schedule_kwargs_setup(self, schedule_kwargs):
+        """Additional keyword arguments allowed for schedule.
+
+        The scheduled job runs ``python -m micromagnetictests.numpyc`` with the
+        Python interpreter of the scheduling process.
+
+        Parameters
+        ----------
+        fixed_subregions : list, optional
+
+            List of strings, where each string is the name of the subregion in
+            the mesh whose spins should remain fixed while the system is being
+            driven. Defaults to ``None``.
+
+        output_step : bool, optional
+
+            If ``True``, output is saved at each step. Default to ``False``.
+
+        """
+        self._checkargs(schedule_kwargs)
+        schedule_kwargs.setdefault("fixed_subregions", None)
+        schedule_kwargs.setdefault("output_step", False)
+
+    def _evolver(self, system):
+        evolver = self._evolvers[0]() if self.autoselect_evolver else self.evolver
+        if not isinstance(evolver, self._evolvers):
+            raise TypeError(
+                f"Cannot use {evolver.__class__.__name__} with"
+                f" {self.__class__.__name__}."
+            )
+        return evolver
+
+    def _model(self, system, fixed_subregions):
+        return model.Model(system, fixed_subregions=fixed_subregions)
+
+    def _stages(self, **kwargs):
+        return 1
+
+    def _write_input_files(self, system, ovf_format="bin8", **kwargs):
+        output.check_ovf_format(ovf_format)
+        self._evolver(system)
+        system.m.to_file("m0.omf", representation=ovf_format)
+        self._kwargs = {"ovf_format": ovf_format, **kwargs}
+
+    def _run(
+        self,
+        system,
+        ovf_format="bin8",
+        fixed_subregions=None,
+        output_step=False,
+        n_threads=None,
+        **kwargs,
+    ):
+        evolver = self._evolver(system)
+        compiled = self._model(system, fixed_subregions)
+        out = output.Output(
+            system.name,
+            self._oxs,
+            _EVOLVE[type(evolver)],
+            compiled,
+            ovf_format=ovf_format,
+            stages=self._stages(**kwargs),
+        )
+        # Keyword arguments which are not used by the driver are ignored as in oommfc.
+        parameters = inspect.signature(self._solve).parameters
+        kwargs = {key: value for key, value in kwargs.items() if key in parameters}
+        try:
+            self._solve(
+                system, compiled, evolver, out, output_step=output_step, **kwargs
+            )
+        finally:
+            out.close()
+
+    def _call(self, system, runner=None, verbose=1, **kwargs):
+        start = time.perf_counter()
+        if verbose >= 1:
+            print(f"Running numpyc ({self.__class__.__name__})...", end="", flush=True)
+        self._run(system, **self._kwargs)
+        if verbose >= 1:
+            print(f" ({time.perf_counter() - start:.1f} s)")
+
+    def _schedule_commands(self, system, runner):
+        with open(f"{system.name}.pkl", "wb") as f:
+            _Pickler(f).dump((self, system, self._kwargs))
+        return [
+            f"{shlex.quote(sys.executable)} -m micromagnetictests.numpyc"
+            f" {shlex.quote(system.name)}.pkl"
+        ]
+
+    def _read_data(self, system):
+        omffiles = pathlib.Path(".").glob(f"{system.name}-*.omf")
+        lastomffile = sorted(omffiles)[-1]
+        # pass Field.array instead of Field to keep component labels and subregions
+        system.m.array = df.Field.from_file(str(lastomffile)).array
+
+        system.table = ut.Table.fromfile(f"{system.name}.odt", x=self._x)
+
+
+class TimeDriver(Driver):
+    """Time driver.
+
+    The equation of motion is integrated with the Runge-Kutta (default) or Euler
+    evolvers. At finite temperature, a thermal evolver must be used. A stage ends
+    early if the largest ``dm/dt`` in degrees per nanosecond is below
+    ``stopping_dm_dt``.
+
+    Examples
+    --------
+    1. Driving a macrospin.
+
+    >>> import micromagneticmodel as mm
+    >>> import micromagnetictests as mt
+    ...
+    >>> system = mm.examples.macrospin()
+    >>> td = mt.numpyc.TimeDriver()
+    >>> td.drive(system, t=1e-12, n=5, verbose=0)
+    >>> len(system.table.data)
+    5
+    >>> mt.numpyc.delete(system)
+
+    """
+
+    _allowed_attributes = ["evolver", "stopping_dm_dt"]
+    _evolvers = _DYNAMICS
+    _oxs = "TimeDriver"
+
+    def _checkargs(self, kwargs):
+        t, n = kwargs["t"], kwargs["n"]
+        if t <= 0:
+            msg = f"Cannot drive with {t=}."
+            raise ValueError(msg)
+        if not isinstance(n, int):
+            msg = f"Cannot drive with {type(n)=}."
+            raise ValueError(msg)
+        if n <= 0:
+            msg = f"Cannot drive with {n=}."
+            raise ValueError(msg)
+
+    def _check_system(self, system):
+        """Checks the system has dynamics in it"""
+        if len(system.dynamics) == 0:
+            raise RuntimeError("System's dynamics is not defined")
+        if len(system.energy) == 0:
+            raise RuntimeError("System's energy is not defined")
+
+    @property
+    def _x(self):
+        return "t"
+
+    def _evolver(self, system):
+        evolver = super()._evolver(system)
+        T = _temperature(system, evolver)
+        if T > 0 and not isinstance(evolver, _THERMAL):
+            raise RuntimeError(
+                f"Cannot drive at {T=} K with {evolver.__class__.__name__};"
+                " use a thermal evolver."
+            )
+        return evolver
+
+    def _stages(self, n, **kwargs):
+        return n
+
+    def _integrator(self, system, compiled, evolver):
+        T = _temperature(system, evolver)
+        if isinstance(evolver, _THERMAL) and T > 0:
+            dt = vars(evolver).get(
+                "fixed_timestep", vars(evolver).get("max_timestep", THERMAL_TIMESTEP)
+            )
+            seed = vars(evolver).get("uniform_seed")
+            return solver.StochasticHeun(compiled, T, dt, seed=seed)
+        return _runge_kutta(compiled.dmdt, evolver)
+
+    def _solve(self, system, compiled, evolver, out, t, n, output_step=False):
+        integrator = self._integrator(system, compiled, evolver)
+        stopping_dm_dt = vars(self).get("stopping_dm_dt")
+        T = _temperature(system, evolver)
+
+        def write(m, time, stage, iteration, stage_iteration):
+            evolver_columns = {
+                ("Energy calc count", ""): integrator.evaluations,
+                ("Max dm/dt", "deg/ns"): np.degrees(integrator.max_dmdt) * 1e-9,
+            }
+            if isinstance(evolver, _THERMAL):
+                evolver_columns[("Temperature", "K")] = T
+            driver_columns = {
+                ("Iteration", ""): iteration,
+                ("Stage iteration", ""): stage_iteration,
+                ("Stage", ""): stage,
+                ("Last time step", "s"): integrator.last_dt,
+                ("Simulation time", "s"): time,
+            }
+            out.row(m, time, evolver_columns, driver_columns)
+            out.omf(m, stage, iteration)
+
+        m, time, iteration = compiled.m0, 0.0, 0
+        for stage in range(n):
+            end = (stage + 1) * t / n
+            stage_iteration = 0
+            while end - time > 1e-9 * t / n:
+                m, time = integrator.step(m, time, end)
+                iteration += 1
+                stage_iteration += 1
+                if output_step:
+                    write(m, time, stage, iteration, stage_iteration)
+                if (
+                    stopping_dm_dt is not None
+                    and np.degrees(integrator.max_dmdt) * 1e-9 < stopping_dm_dt
+                ):
+                    break
+            if not output_step or stage_iteration == 0:
+                write(m, time, stage, iteration, stage_iteration)
+
+
+class MinDriver(Driver):
+    """Energy minimisation driver.
+
+    The energy is minimised by steepest descent with Barzilai-Borwein step lengths
+    until the largest torque ``|m x H x m|`` is below ``stopping_mxHxm`` in A/m.
+    Values above the default ``1e-4`` are lowered to it, because steepest descent
+    does not reach the minimum as closely as the line searches of OOMMF.
+
+    Examples
+    --------
+    1. Minimising the energy of a macrospin.
+
+    >>> import discretisedfield as df
+    >>> import micromagneticmodel as mm
+    >>> import numpy as np
+    >>> import micromagnetictests as mt
+    ...
+    >>> system = mm.examples.macrospin()
+    >>> system.m = df.Field(system.m.mesh, nvdim=3, value=(1, 0, 0), norm=8e5)
+    >>> md = mt.numpyc.MinDriver()
+    >>> md.drive(system, verbose=0)
+    >>> np.allclose(system.m.orientation.mean(), (0, 0, 1))
+    True
+    >>> mt.numpyc.delete(system)
+
+    """
+
+    _allowed_attributes = ["evolver", "stopping_mxHxm", "stage_iteration_limit"]
+    _evolvers = (evolvers.CGEvolver,)
+    _oxs = "MinDriver"
+
+    def _checkargs(self, kwargs):
+        pass  # no kwargs should be checked
+
+    def _check_system(self, system):
+        """Checks the system has energy in it"""
+        if len(system.energy) == 0:
+            raise RuntimeError("System's energy is not defined")
+
+    @property
+    def _x(self):
+        return "iteration"
+
+    def _minimiser(self, compiled):
+        return solver.Minimiser(
+            compiled,
+            stopping_mxHxm=min(
+                vars(self).get("stopping_mxHxm", STOPPING_MXHXM), STOPPING_MXHXM
+            ),
+            iteration_limit=vars(self).get("stage_iteration_limit", ITERATION_LIMIT),
+        )
+
+    @staticmethod
+    def _stage(minimiser, out, m, stage, iteration, output_step):
+        """Minimise the energy in a stage and return ``m`` and the iteration."""
+
+        def write(m, stage_iteration):
+            evolver_columns = {
+                ("Max mxHxm", "A/m"): minimiser.mxHxm,
+                ("Energy calc count", ""): minimiser.evaluations,
+            }
+            driver_columns = {
+                ("Iteration", ""): iteration + stage_iteration,
+                ("Stage iteration", ""): stage_iteration,
+                ("Stage", ""): stage,
+            }
+            out.row(m, 0, evolver_columns, driver_columns)
+            out.omf(m, stage, iteration + stage_iteration)
+
+        m, stage_iterations = minimiser.run(m, callback=write if output_step else None)
+        if not output_step or stage_iterations == 0:
+            write(m, stage_iterations)
+        return m, iteration + stage_iterations
+
+    def _solve(self, system, compiled, evolver, out, output_step=False):
+        minimiser = self._minimiser(compiled)
+        self._stage(minimiser, out, compiled.m0, 0, 0, output_step)
+
+
+class HysteresisDriver(MinDriver):
+    """Hysteresis driver.
+
+    The energy is minimised for every value of an additional uniform applied
+    field. The field steps are defined either with ``Hmin``, ``Hmax``, and ``n``
+    (from ``Hmin`` to ``Hmax`` and back) or with ``Hsteps``, a list of
+    ``[Hstart, Hend, n]`` segments. The first field of every segment after the
+    first one is skipped, because it is the last field of the previous segment.
+
+    Examples
+    --------
+    1. Hysteresis loop of a macrospin.
+
+    >>> import micromagneticmodel as mm
+    >>> import micromagnetictests as mt
+    ...
+    >>> system = mm.examples.macrospin()
+    >>> hd = mt.numpyc.HysteresisDriver()
+    >>> hd.drive(system, Hmin=(0, 0, -1e6), Hmax=(0, 0, 1e6), n=3, verbose=0)
+    >>> len(system.table.data)
+    5
+    >>> mt.numpyc.delete(system)
+
+    """
+
+    def _checkargs(self, kwargs):
+        if any(item in kwargs for item in ["Hmin", "Hmax", "n"]) and "Hsteps" in kwargs:
+            msg = "Cannot define both (Hmin, Hmax, n) and Hsteps."
+            raise ValueError(msg)
+
+        if all(item in kwargs for item in ["Hmin", "Hmax", "n"]):
+            kwargs["Hsteps"] = [
+                [kwargs["Hmin"], kwargs["Hmax"], kwargs["n"]],
+                [kwargs["Hmax"], kwargs["Hmin"], kwargs["n"]],
+            ]
+            for key in ["Hmin", "Hmax", "n"]:
+                kwargs.pop(key)
+
+        if "Hsteps" not in kwargs:
+            msg = (
+                "Cannot drive without a full definition of (Hmin, Hmax, n) xor Hsteps."
+            )
+            raise ValueError(msg)
+        for step in kwargs["Hsteps"]:
+            if len(step) != 3:
+                msg = "Each list item in Hsteps must have 3 entries: Hstart, Hend, n."
+                raise ValueError(msg)
+            self._checkvalues(*step)
+
+    @staticmethod
+    def _checkvalues(Hmin, Hmax, n):
+        for item in [Hmin, Hmax]:
+            if not isinstance(item, (list, tuple, np.ndarray)):
+                msg = "Hmin and Hmax must have array_like values."
+                raise ValueError(msg)
+            if len(item) != 3:
+                msg = "Hmin and Hmax must have length 3."
+                raise ValueError(msg)
+        if not isinstance(n, int):
+            msg = f"Cannot drive with {type(n)=}."
+            raise ValueError(msg)
+        if n - 1 <= 0:
+            msg = f"Cannot drive with {n=}."
+            raise ValueError(msg)
+
+    @property
+    def _x(self):
+        return "B_hysteresis"
+
+    @staticmethod
+    def _fields(Hsteps):
+        fields = []
+        for Hstart, Hend, n in Hsteps:
+            points = list(np.linspace(Hstart, Hend, n))
+            fields.extend(points[1:] if fields else points)
+        return fields
+
+    def _stages(self, Hsteps, **kwargs):
+        return len(self._fields(Hsteps))
+
+    def _model(self, system, fixed_subregions):
+        compiled = super()._model(system, fixed_subregions)
+        compiled.terms.append(model.Hysteresis(compiled))
+        return compiled
+
+    def _solve(self, system, compiled, evolver, out, Hsteps, output_step=False):
+        hysteresis = compiled.terms[-1]
+        minimiser = self._minimiser(compiled)
+        m, iteration = compiled.m0, 0
+        for stage, H in enumerate(self._fields(Hsteps)):
+            hysteresis.H[...] = H
+            m, iteration = self._stage(minimiser, out, m, stage, iteration, output_step)
+
+
+class RelaxDriver(Driver):
+    """Relaxation driver.
+
+    The magnetisation is relaxed by integrating the equation of motion without
+    precession, ``dm/dt = -gamma0 m x (m x H)``, with the Runge-Kutta (default) or
+    Euler evolvers. Close to equilibrium, the time step is limited by the stiffness
+    of the exchange interaction rather than by the accuracy. Therefore, once the
+    energy decreases by less than ``RELAX_ENERGY_CHANGE`` within ``RELAX_WINDOW``
+    steps, the relaxation is completed with the minimiser of ``MinDriver``, which
+    follows the same path, until the largest torque ``|m x H x m|`` is below
+    ``stopping_mxHxm`` in A/m (defaults to ``1e-4``).
+
+    Examples
+    --------
+    1. Relaxing a macrospin.
+
+    >>> import micromagneticmodel as mm
+    >>> import micromagnetictests as mt
+    ...
+    >>> system = mm.examples.macrospin()
+    >>> rd = mt.numpyc.RelaxDriver()
+    >>> rd.drive(system, verbose=0)
+    >>> system.table.x
+    't'
+    >>> mt.numpyc.delete(system)
+
+    """
+
+    _allowed_attributes = ["evolver", "stopping_mxHxm", "stage_iteration_limit"]
+    _evolvers = (evolvers.RungeKuttaEvolver, evolvers.EulerEvolver)
+    _oxs = "TimeDriver"
+
+    def _checkargs(self, kwargs):
+        pass  # no kwargs should be checked
+
+    def _check_system(self, system):
+        """Checks the system has energy in it"""
+        if len(system.energy) == 0:
+            raise RuntimeError("System's energy is not defined")
+
+    @property
+    def _x(self):
+        return "t"
+
+    def _solve(self, system, compiled, evolver, out, output_step=False):
+        gamma0 = mm.consts.gamma0
+
+        def rhs(m, t):
+            return gamma0 * solver.torque(m, compiled.field(m, t), compiled.free)
+
+        def write(m, time, iteration, evaluations, max_dmdt):
+            evolver_columns = {
+                ("Energy calc count", ""): evaluations,
+                ("Max dm/dt", "deg/ns"): np.degrees(max_dmdt) * 1e-9,
+            }
+            driver_columns = {
+                ("Iteration", ""): iteration,
+                ("Stage iteration", ""): iteration,
+                ("Stage", ""): 0,
+                ("Last time step", "s"): integrator.last_dt,
+                ("Simulation time", "s"): time,
+            }
+            out.row(m, time, evolver_columns, driver_columns)
+            out.omf(m, 0, iteration)
+
+        integrator = _runge_kutta(rhs, evolver)
+        stopping = vars(self).get("stopping_mxHxm", STOPPING_MXHXM)
+        limit = vars(self).get("stage_iteration_limit", ITERATION_LIMIT)
+        m, time, iteration = compiled.m0, 0.0, 0
+        energy = compiled.energy(m)
+        while iteration < limit:
+            # The largest derivative is evaluated at the start of the step.
+            m_next, time_next = integrator.step(m, time, np.inf)
+            if integrator.max_dmdt <= gamma0 * stopping:
+                break
+            m, time = m_next, time_next
+            iteration += 1
+            if output_step:
+                write(m, time, iteration, integrator.evaluations, integrator.max_dmdt)
+            if iteration % RELAX_WINDOW == 0:
+                previous, energy = energy, compiled.energy(m)
+                if previous - energy <= RELAX_ENERGY_CHANGE * abs(previous):
+                    break
+
+        minimiser = solver.Minimiser(
+            compiled, stopping_mxHxm=stopping, iteration_limit=limit - iteration
+        )
+
+        def step(m, stage_iteration):
+            write(
+                m,
+                time,
+                iteration + stage_iteration,
+                integrator.evaluations + minimiser.evaluations,
+                gamma0 * minimiser.mxHxm,
+            )
+
+        m, iterations = minimiser.run(m, time, callback=step if output_step else None)
+        if not output_step or iteration + iterations == 0:
+            step(m, iterations)
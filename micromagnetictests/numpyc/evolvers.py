@@ -0,0 +1,162 @@
+"""Evolvers.
+
+The evolvers have the names of the ``oommfc`` evolvers, so that tests can select
+them in the same way, but only accept the attributes which are used by the NumPy
+solvers.
+
+"""
+
+import micromagneticmodel as mm
+
+
+class CGEvolver(mm.Evolver):
+    """Evolver of ``MinDriver`` and ``HysteresisDriver``.
+
+    The energy is minimised by steepest descent with Barzilai-Borwein step
+    lengths. ``method`` is accepted for compatibility with ``oommfc`` and
+    ignored.
+
+    Examples
+    --------
+    1. Defining evolver with a keyword argument.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> evolver = mt.numpyc.CGEvolver(method="Polak-Ribiere")
+
+    """
+
+    _allowed_attributes = ["method"]
+
+
+class RungeKuttaEvolver(mm.Evolver):
+    """Adaptive Runge-Kutta evolver.
+
+    ``method`` is one of ``'rk2'``, ``'rk2heun'``, ``'rk4'``, ``'rkf54'``,
+    ``'rkf54m'``, or ``'rkf54s'`` (default). All ``'rkf54'`` methods use the
+    Dormand-Prince pair. Step errors and ``start_dm`` are in degrees.
+
+    Examples
+    --------
+    1. Defining evolver with keyword arguments.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> evolver = mt.numpyc.RungeKuttaEvolver(method="rk4", max_timestep=1e-13)
+
+    """
+
+    _allowed_attributes = [
+        "method",
+        "min_timestep",
+        "max_timestep",
+        "start_dm",
+        "start_dt",
+        "absolute_step_error",
+        "relative_step_error",
+        "max_step_headroom",
+    ]
+
+
+class EulerEvolver(mm.Evolver):
+    """Euler evolver with a step size control by comparison with Heun's method.
+
+    Examples
+    --------
+    1. Defining evolver with a keyword argument.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> evolver = mt.numpyc.EulerEvolver(start_dm=0.02)
+
+    """
+
+    _allowed_attributes = [
+        "min_timestep",
+        "max_timestep",
+        "start_dm",
+        "absolute_step_error",
+        "relative_step_error",
+        "step_headroom",
+    ]
+
+
+class SpinTEvolver(RungeKuttaEvolver):
+    """Runge-Kutta evolver of systems with ``ZhangLi`` dynamics.
+
+    Examples
+    --------
+    1. Defining evolver with a keyword argument.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> evolver = mt.numpyc.SpinTEvolver(method="rk4")
+
+    """
+
+
+class SpinXferEvolver(RungeKuttaEvolver):
+    """Runge-Kutta evolver of systems with ``Slonczewski`` dynamics.
+
+    Examples
+    --------
+    1. Defining evolver with a keyword argument.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> evolver = mt.numpyc.SpinXferEvolver(method="rk4")
+
+    """
+
+
+class UHH_ThetaEvolver(mm.Evolver):
+    """Stochastic Heun evolver with a fixed time step.
+
+    The temperature is ``temperature`` or, if not defined, ``system.T``. The
+    time step is ``fixed_timestep`` or ``1e-14`` s.
+
+    Examples
+    --------
+    1. Defining evolver with keyword arguments.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> evolver = mt.numpyc.UHH_ThetaEvolver(fixed_timestep=2e-13, temperature=60)
+
+    """
+
+    _allowed_attributes = ["fixed_timestep", "temperature", "uniform_seed"]
+
+
+class Xf_ThermHeunEvolver(mm.Evolver):
+    """Stochastic Heun evolver with a fixed time step.
+
+    The temperature is ``temperature`` or, if not defined, ``system.T``. The
+    time step is ``max_timestep`` or ``1e-14`` s. At zero temperature, the
+    adaptive Runge-Kutta method is used.
+
+    Examples
+    --------
+    1. Defining evolver with keyword arguments.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> evolver = mt.numpyc.Xf_ThermHeunEvolver(uniform_seed=1)
+
+    """
+
+    _allowed_attributes = ["max_timestep", "temperature", "uniform_seed"]
+
+
+class Xf_ThermSpinXferEvolver(Xf_ThermHeunEvolver):
+    """Stochastic Heun evolver of systems with spin-transfer torque.
+
+    Examples
+    --------
+    1. Defining evolver with keyword arguments.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> evolver = mt.numpyc.Xf_ThermSpinXferEvolver(uniform_seed=1)
+
+    """
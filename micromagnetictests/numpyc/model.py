@@ -0,0 +1,653 @@
+"""Vectorised evaluation of energy and dynamics terms.
+
+A ``Model`` is built once per drive. Parameters of all terms are converted to
+arrays when the model is built, so that the effective field and the time
+derivative of the magnetisation can be evaluated cheaply for every step of the
+solver. Terms without a vectorised implementation are evaluated with
+``micromagnetictests.reference``.
+
+"""
+
+import functools
+import itertools
+
+import discretisedfield as df
+import micromagneticmodel as mm
+import numpy as np
+
+from micromagnetictests import reference
+
+#: Number of periodic images of the sample added to the demagnetisation tensor on
+#: each side in every direction with periodic boundary conditions.
+PBC_IMAGES = 10
+
+#: Default radius in units of the cube root of the cell volume beyond which the
+#: demagnetisation tensor is approximated by the dipole tensor.
+ASYMPTOTIC_RADIUS = 32
+
+_mu0 = mm.consts.mu0
+
+
+def _parameter(value, mesh, nvdim):
+    """Per-cell array of a scalar, vector, dict, or field-valued parameter."""
+    return df.Field(mesh, nvdim=nvdim, value=value).array
+
+
+def _unit(value, mesh):
+    """Per-cell array of unit vectors of a vector-valued parameter."""
+    array = _parameter(value, mesh, nvdim=3)
+    return array / np.linalg.norm(array, axis=-1, keepdims=True)
+
+
+def _index(axis, item):
+    index = [slice(None)] * 3
+    index[axis] = item
+    return tuple(index)
+
+
+def _pairs(array, axis, periodic):
+    """Values of all pairs of neighbouring cells ``(i, i + 1)`` along ``axis``."""
+    if periodic:
+        return array, np.roll(array, -1, axis=axis)
+    return array[_index(axis, slice(None, -1))], array[_index(axis, slice(1, None))]
+
+
+def _scatter(first, second, axis, periodic, shape):
+    """Sum of the contributions of all pairs to their first and second cells."""
+    out = np.zeros(shape)
+    if periodic:
+        out += first
+        out += np.roll(second, 1, axis=axis)
+    else:
+        out[_index(axis, slice(None, -1))] += first
+        out[_index(axis, slice(1, None))] += second
+    return out
+
+
+def _time_factor(term, t):
+    """Time-dependent pre-factor (number or 3x3 matrix) of a term at time ``t``."""
+    func = vars(term).get("func", vars(term).get("wave"))
+    if vars(term).get("tcl_strings") is not None:
+        raise NotImplementedError(
+            "Time dependence defined with tcl_strings cannot be evaluated in Python."
+        )
+    if func is None:
+        return 1
+    if func in ("sin", "sinc"):
+        phase = 2 * term.f * (t - term.t0)
+        return np.sin(np.pi * phase) if func == "sin" else np.sinc(phase)
+    value = np.asarray(func(t), dtype=float)
+    return value.reshape(3, 3) if value.size == 9 else value
+
+
+class Term:
+    """Vectorised energy term.
+
+    Parameters
+    ----------
+    term : micromagneticmodel.EnergyTerm
+
+        Energy term.
+
+    model : micromagnetictests.numpyc.model.Model
+
+        Model the term belongs to.
+
+    """
+
+    #: Name of the OOMMF class used for the columns of the table.
+    oxs = None
+
+    def __init__(self, term, model):
+        self.term = term
+        self.name = term.name
+        self.model = model
+
+    def field(self, m, t=0):
+        """Effective field in A/m for an array ``m`` of unit vectors."""
+        raise NotImplementedError
+
+    def density(self, m, t=0):
+        """Energy density in J/m**3 for an array ``m`` of unit vectors.
+
+        The default applies to terms which are bilinear in the magnetisation.
+
+        """
+        H = self.field(m, t)
+        return -0.5 * _mu0 * self.model.Ms * np.sum(m * H, axis=-1, keepdims=True)
+
+    def columns(self, t=0):
+        """Additional table columns as a dictionary ``{(name, unit): value}``."""
+        return {}
+
+
+class Zeeman(Term):
+    oxs = "FixedZeeman"
+
+    def __init__(self, term, model):
+        super().__init__(term, model)
+        self.H = _parameter(term.H, model.mesh, nvdim=3)
+        self.dynamic = any(
+            vars(term).get(key) is not None for key in ["func", "wave", "tcl_strings"]
+        )
+        if self.dynamic:
+            self.oxs = "ScriptUZeeman"
+            _time_factor(term, 0)  # fail early for tcl_strings
+
+    def field(self, m, t=0):
+        factor = _time_factor(self.term, t) if self.dynamic else 1
+        if np.ndim(factor) == 2:
+            return self.H @ factor.T
+        return factor * self.H
+
+    def density(self, m, t=0):
+        H = self.field(m, t)
+        return -_mu0 * self.model.Ms * np.sum(m * H, axis=-1, keepdims=True)
+
+    def columns(self, t=0):
+        if not self.dynamic:
+            return {}
+        B = 1e3 * _mu0 * self.field(None, t).reshape(-1, 3).mean(axis=0)
+        return {
+            (f"Oxs_{self.oxs}:{self.name}:B", "mT"): np.linalg.norm(B),
+            (f"Oxs_{self.oxs}:{self.name}:Bx", "mT"): B[0],
+            (f"Oxs_{self.oxs}:{self.name}:By", "mT"): B[1],
+            (f"Oxs_{self.oxs}:{self.name}:Bz", "mT"): B[2],
+        }
+
+
+class Hysteresis(Zeeman):
+    """Applied field of hysteresis drives, which is changed between stages."""
+
+    oxs = "UZeeman"
+
+    def __init__(self, model):
+        super().__init__(mm.Zeeman(H=(0, 0, 0), name="hysteresis"), model)
+        self.dynamic = False
+
+    def columns(self, t=0):
+        B = 1e3 * _mu0 * self.H.reshape(-1, 3)[0]
+        return {
+            (f"Oxs_{self.oxs}:{self.name}:B", "mT"): np.linalg.norm(B),
+            (f"Oxs_{self.oxs}:{self.name}:Bx", "mT"): B[0],
+            (f"Oxs_{self.oxs}:{self.name}:By", "mT"): B[1],
+            (f"Oxs_{self.oxs}:{self.name}:Bz", "mT"): B[2],
+        }
+
+
+class Exchange(Term):
+    """Exchange between nearest neighbours.
+
+    The coupling of two cells is the harmonic mean of their exchange constants.
+    Dictionaries can define the coupling between subregions with keys
+    ``'r1:r2'``.
+
+    """
+
+    oxs = "UniformExchange"
+
+    def __init__(self, term, model):
+        super().__init__(term, model)
+        mesh = model.mesh
+        A = term.A
+        couplings = {}
+        if isinstance(A, dict):
+            couplings = {
+                tuple(key.split(":")): value for key, value in A.items() if ":" in key
+            }
+            A = {key: value for key, value in A.items() if ":" not in key}
+        A = _parameter(A, mesh, nvdim=1)
+
+        self.pairs = []
+        for axis, periodic in model.axes:
+            first, second = _pairs(A, axis, periodic)
+            value = np.divide(
+                2 * first * second,
+                first + second,
+                out=np.zeros_like(first),
+                where=first + second != 0,
+            )
+            for (r1, r2), coupling in couplings.items():
+                label1, label2 = _pairs(model.labels(), axis, periodic)
+                mask = ((label1 == r1) & (label2 == r2)) | (
+                    (label1 == r2) & (label2 == r1)
+                )
+                value[mask] = coupling
+            value = value * np.logical_and(*_pairs(model.magnetic, axis, periodic))
+            self.pairs.append((axis, periodic, value / mesh.cell[axis] ** 2))
+
+    def field(self, m, t=0):
+        H = np.zeros(m.shape)
+        for axis, periodic, coupling in self.pairs:
+            first, second = _pairs(m, axis, periodic)
+            difference = coupling * (second - first)
+            H += _scatter(difference, -difference, axis, periodic, m.shape)
+        return 2 * self.model.inverse * H
+
+
+class DMI(Term):
+    r"""Dzyaloshinskii-Moriya interaction between nearest neighbours.
+
+    The energy of every pair of neighbours along the direction :math:`k` is
+    :math:`V D / \Delta_k \mathbf{a}_k \cdot (\mathbf{m}_i \times \mathbf{m}_j)`
+    with a vector :math:`\mathbf{a}_k` depending on the crystal class.
+
+    """
+
+    def __init__(self, term, model):
+        super().__init__(term, model)
+        crystalclass = {"Cnv": "Cnv_z", "D2d": "D2d_z", "O": "T"}.get(
+            term.crystalclass, term.crystalclass
+        )
+        self.oxs = "DMI_" + crystalclass.split("_")[0]
+        unit = np.eye(3)
+        if crystalclass == "T":
+            vectors = -unit
+        else:
+            axis = "xyz".index(crystalclass[-1])
+            if crystalclass.startswith("Cnv"):
+                vectors = np.cross(unit, unit[axis])
+            else:
+                vectors = np.zeros((3, 3))
+                vectors[(axis + 1) % 3] = unit[(axis + 1) % 3]
+                vectors[(axis + 2) % 3] = -unit[(axis + 2) % 3]
+
+        D = term.D
+        if isinstance(D, dict):
+            D = {key: value for key, value in D.items() if ":" not in key}
+        D = _parameter(D, model.mesh, nvdim=1)
+        self.pairs = []
+        for axis, periodic in model.axes:
+            if not vectors[axis].any():
+                continue
+            value = sum(_pairs(D, axis, periodic)) / 2
+            value = value * np.logical_and(*_pairs(model.magnetic, axis, periodic))
+            coupling = value / model.mesh.cell[axis]
+            self.pairs.append((axis, periodic, coupling, vectors[axis]))
+
+    def field(self, m, t=0):
+        H = np.zeros(m.shape)
+        for axis, periodic, coupling, vector in self.pairs:
+            first, second = _pairs(m, axis, periodic)
+            H -= _scatter(
+                coupling * np.cross(second, vector),
+                coupling * np.cross(vector, first),
+                axis,
+                periodic,
+                m.shape,
+            )
+        return self.model.inverse * H
+
+
+class UniaxialAnisotropy(Term):
+    oxs = "UniaxialAnisotropy"
+
+    def __init__(self, term, model):
+        super().__init__(term, model)
+        K1 = vars(term).get("K", vars(term).get("K1", 0))
+        self.K1 = _parameter(K1, model.mesh, nvdim=1)
+        self.K2 = _parameter(vars(term).get("K2", 0), model.mesh, nvdim=1)
+        self.u = _unit(term.u, model.mesh)
+
+    def _projection(self, m):
+        return np.sum(m * self.u, axis=-1, keepdims=True)
+
+    def field(self, m, t=0):
+        a = self._projection(m)
+        return self.model.inverse * (2 * self.K1 * a + 4 * self.K2 * a**3) * self.u
+
+    def density(self, m, t=0):
+        a = self._projection(m)
+        return -self.K1 * a**2 - self.K2 * a**4
+
+
+class CubicAnisotropy(Term):
+    # The sign follows OOMMF: the axes are easy axes for K > 0.
+    oxs = "CubicAnisotropy"
+
+    def __init__(self, term, model):
+        super().__init__(term, model)
+        self.K = _parameter(term.K, model.mesh, nvdim=1)
+        u1 = _unit(term.u1, model.mesh)
+        u2 = _unit(term.u2, model.mesh)
+        self.u = [u1, u2, np.cross(u1, u2)]
+
+    def _projections(self, m):
+        return [np.sum(m * u, axis=-1, keepdims=True) for u in self.u]
+
+    def field(self, m, t=0):
+        a = self._projections(m)
+        H = sum(
+            a[i] * (a[(i + 1) % 3] ** 2 + a[(i + 2) % 3] ** 2) * self.u[i]
+            for i in range(3)
+        )
+        return -self.model.inverse * 2 * self.K * H
+
+    def density(self, m, t=0):
+        a1, a2, a3 = self._projections(m)
+        return self.K * (a1**2 * a2**2 + a2**2 * a3**2 + a3**2 * a1**2)
+
+
+def _ratio(a, b):
+    return np.divide(a, b, out=np.zeros(np.broadcast(a, b).shape), where=b != 0)
+
+
+def _newell_f(x, y, z):
+    """Newell's function for the diagonal elements of the demagnetisation tensor."""
+    x2, y2, z2 = x * x, y * y, z * z
+    R = np.sqrt(x2 + y2 + z2)
+    return (
+        (2 * x2 - y2 - z2) * R / 6
+        + y / 2 * (z2 - x2) * np.arcsinh(_ratio(y, np.sqrt(x2 + z2)))
+        + z / 2 * (y2 - x2) * np.arcsinh(_ratio(z, np.sqrt(x2 + y2)))
+        - x * y * z * np.arctan(_ratio(y * z, x * R))
+    )
+
+
+def _newell_g(x, y, z):
+    """Newell's function for the off-diagonal elements of the demagnetisation tensor."""
+    x2, y2, z2 = x * x, y * y, z * z
+    R = np.sqrt(x2 + y2 + z2)
+    return (
+        x * y * z * np.arcsinh(_ratio(z, np.sqrt(x2 + y2)))
+        + y / 6 * (3 * z2 - y2) * np.arcsinh(_ratio(x, np.sqrt(y2 + z2)))
+        + x / 6 * (3 * z2 - x2) * np.arcsinh(_ratio(y, np.sqrt(x2 + z2)))
+        - z * z2 / 6 * np.arctan(_ratio(x * y, z * R))
+        - z * y2 / 2 * np.arctan(_ratio(x * z, y * R))
+        - z * x2 / 2 * np.arctan(_ratio(y * z, x * R))
+        - x * y * R / 3
+    )
+
+
+# Index pairs of the components xx, yy, zz, xy, xz, yz of the tensor.
+_COMPONENTS = [(0, 0), (1, 1), (2, 2), (0, 1), (0, 2), (1, 2)]
+
+
+def _newell(r, cell):
+    """Demagnetisation tensor of a cell at the displacements ``r`` of shape (3, N)."""
+    weights = {-1: -1, 0: 2, 1: -1}
+    result = np.zeros((6, r.shape[1]))
+    for i, j, k in itertools.product((-1, 0, 1), repeat=3):
+        weight = weights[i] * weights[j] * weights[k]
+        x, y, z = r + np.multiply((i, j, k), cell)[:, np.newaxis]
+        result[0] += weight * _newell_f(x, y, z)
+        result[1] += weight * _newell_f(y, x, z)
+        result[2] += weight * _newell_f(z, y, x)
+        result[3] += weight * _newell_g(x, y, z)
+        result[4] += weight * _newell_g(x, z, y)
+        result[5] += weight * _newell_g(y, z, x)
+    return result / (4 * np.pi * np.prod(cell))
+
+
+def _dipole(r, cell):
+    """Dipole approximation of the demagnetisation tensor of a cell."""
+    r2 = np.sum(r**2, axis=0)
+    factor = np.prod(cell) / (4 * np.pi * r2**2.5)
+    return np.array(
+        [factor * ((a == b) * r2 - 3 * r[a] * r[b]) for a, b in _COMPONENTS]
+    )
+
+
+def _tensor(r, cell, radius):
+    """Demagnetisation tensor at the displacements ``r`` of shape (3, N)."""
+    if radius < 0:
+        return _newell(r, cell)
+    size = np.prod(cell) ** (1 / 3)
+    near = np.linalg.norm(r, axis=0) <= radius * size
+    result = np.empty((6, r.shape[1]))
+    result[:, near] = _newell(r[:, near], cell)
+    result[:, ~near] = _dipole(r[:, ~near], cell)
+    return result
+
+
+@functools.lru_cache(maxsize=16)
+def demag_kernel(n, cell, pbc, radius):
+    """Fourier transform of the demagnetisation tensor.
+
+    Along directions without periodic boundary conditions, the magnetisation is
+    padded with zeros, so that the cyclic convolution computed with the FFT is the
+    convolution over the sample. Along periodic directions, the tensor contains the
+    contributions of ``PBC_IMAGES`` images of the sample on each side.
+
+    Parameters
+    ----------
+    n : tuple
+
+        Number of cells.
+
+    cell : tuple
+
+        Cell edge lengths.
+
+    pbc : tuple
+
+        Periodicity of the three directions.
+
+    radius : numbers.Real
+
+        Asymptotic radius in units of the cube root of the cell volume. The
+        tensor is computed exactly for all displacements if ``radius < 0``.
+
+    Returns
+    -------
+    tuple
+
+        Shape of the padded arrays and the transformed components ``xx``,
+        ``yy``, ``zz``, ``xy``, ``xz``, ``yz``.
+
+    """
+    shape = tuple(ni if p else 2 * ni - 1 for ni, p in zip(n, pbc))
+    displacements = []
+    for size, h in zip(shape, cell):
+        index = np.arange(size)
+        displacements.append(
+            np.where(index < size - size // 2, index, index - size) * h
+        )
+    r = np.array(np.meshgrid(*displacements, indexing="ij")).reshape(3, -1)
+
+    images = [range(-PBC_IMAGES, PBC_IMAGES + 1) if p else [0] for p in pbc]
+    tensor = np.zeros((6, r.shape[1]))
+    for image in itertools.product(*images):
+        shift = np.multiply(image, n) * cell
+        tensor += _tensor(r + shift[:, np.newaxis], cell, radius)
+    tensor = tensor.reshape((6, *shape))
+    return shape, np.fft.rfftn(tensor, axes=(1, 2, 3))
+
+
+class Demag(Term):
+    oxs = "Demag"
+
+    def __init__(self, term, model):
+        super().__init__(term, model)
+        mesh = model.mesh
+        radius = vars(term).get("asymptotic_radius", ASYMPTOTIC_RADIUS)
+        self.shape, self.kernel = demag_kernel(
+            tuple(int(i) for i in mesh.n),
+            tuple(float(i) for i in mesh.cell),
+            tuple(dim in mesh.bc for dim in "xyz"),
+            radius,
+        )
+
+    def field(self, m, t=0):
+        M = np.fft.rfftn(self.model.Ms * m, s=self.shape, axes=(0, 1, 2))
+        M = np.moveaxis(M, -1, 0)
+        H = np.empty_like(M)
+        for a in range(3):
+            H[a] = -sum(
+                self.kernel[_COMPONENTS.index(tuple(sorted((a, b))))] * M[b]
+                for b in range(3)
+            )
+        H = np.fft.irfftn(H, s=self.shape, axes=(1, 2, 3))
+        n = self.model.mesh.n
+        return np.moveaxis(H[:, : n[0], : n[1], : n[2]], 0, -1)
+
+
+class ReferenceTerm(Term):
+    """Term evaluated with ``micromagnetictests.reference``."""
+
+    oxs = "TwoSurfaceExchange"
+
+    def _m(self, m):
+        return df.Field(self.model.mesh, nvdim=3, value=self.model.Ms * m)
+
+    def field(self, m, t=0):
+        return reference.effective_field(self.term, self._m(m)).array
+
+    def density(self, m, t=0):
+        return reference.density(self.term, self._m(m)).array
+
+
+_TERMS = {
+    mm.Zeeman: Zeeman,
+    mm.Exchange: Exchange,
+    mm.DMI: DMI,
+    mm.UniaxialAnisotropy: UniaxialAnisotropy,
+    mm.CubicAnisotropy: CubicAnisotropy,
+    mm.Demag: Demag,
+}
+
+
+class Model:
+    """Vectorised energy and dynamics of a system.
+
+    Parameters
+    ----------
+    system : micromagneticmodel.System
+
+        System with energy, dynamics, and magnetisation.
+
+    terms : list, optional
+
+        Energy terms. Defaults to all terms of ``system.energy``.
+
+    fixed_subregions : list, optional
+
+        Names of subregions in which the magnetisation does not change. Defaults
+        to ``None``.
+
+    Raises
+    ------
+    NotImplementedError
+
+        If an energy term is not supported.
+
+    Examples
+    --------
+    1. Energy of a macrospin.
+
+    >>> import micromagneticmodel as mm
+    >>> import micromagnetictests as mt
+    ...
+    >>> system = mm.examples.macrospin()
+    >>> model = mt.numpyc.model.Model(system)
+    >>> model.energy(model.m0)
+    -8.88...e-22
+
+    """
+
+    def __init__(self, system, terms=None, fixed_subregions=None):
+        mesh = system.m.mesh
+        self.system = system
+        self.mesh = mesh
+        self.axes = [(axis, dim in mesh.bc) for axis, dim in enumerate("xyz")]
+        self.volume = np.prod(mesh.cell)
+        self.Ms = np.linalg.norm(system.m.array, axis=-1, keepdims=True)
+        self.magnetic = self.Ms > 0
+        self.inverse = np.divide(
+            1, _mu0 * self.Ms, out=np.zeros_like(self.Ms), where=self.magnetic
+        )
+        self.m0 = np.divide(
+            system.m.array,
+            self.Ms,
+            out=np.zeros_like(system.m.array),
+            where=self.magnetic,
+        )
+        self.free = self.magnetic.copy()
+        for name in fixed_subregions or []:
+            self.free[mesh.region2slices(mesh.subregions[name])] = False
+
+        self._labels = None
+        self.terms = [
+            self._term(term) for term in (system.energy if terms is None else terms)
+        ]
+        self._dynamics(system.dynamics)
+
+    def _term(self, term):
+        if isinstance(term, mm.RKKY):
+            return ReferenceTerm(term, self)
+        try:
+            return _TERMS[type(term)](term, self)
+        except KeyError:
+            raise NotImplementedError(
+                f"{type(term).__name__} is not supported."
+            ) from None
+
+    def labels(self):
+        """Array with the name of the (last) subregion of every cell."""
+        if self._labels is None:
+            self._labels = np.full(tuple(self.mesh.n) + (1,), "", dtype=object)
+            for name, region in self.mesh.subregions.items():
+                self._labels[self.mesh.region2slices(region)] = name
+        return self._labels
+
+    def _dynamics(self, dynamics):
+        self.gamma0 = self.alpha = None
+        self.transfer = []
+        for term in dynamics:
+            if isinstance(term, mm.Precession):
+                self.gamma0 = _parameter(term.gamma0, self.mesh, nvdim=1)
+            elif isinstance(term, mm.Damping):
+                self.alpha = _parameter(term.alpha, self.mesh, nvdim=1)
+            else:
+                self.transfer.append(term)
+
+    def field(self, m, t=0):
+        """Effective field in A/m."""
+        return sum((term.field(m, t) for term in self.terms), np.zeros(m.shape))
+
+    def energies(self, m, t=0):
+        """Energies of all terms in J."""
+        return {
+            term: float(np.sum(term.density(m, t)) * self.volume) for term in self.terms
+        }
+
+    def energy(self, m, t=0):
+        """Total energy in J."""
+        return sum(self.energies(m, t).values())
+
+    def dmdt(self, m, t=0, H=None):
+        """Time derivative of the unit magnetisation in 1/s.
+
+        Parameters
+        ----------
+        m : numpy.ndarray
+
+            Unit magnetisation.
+
+        t : numbers.Real, optional
+
+            Time in s. Defaults to 0.
+
+        H : numpy.ndarray, optional
+
+            Additional field in A/m, e.g. thermal field. Defaults to ``None``.
+
+        """
+        Heff = self.field(m, t)
+        if H is not None:
+            Heff = Heff + H
+        gamma0 = mm.consts.gamma0 if self.gamma0 is None else self.gamma0
+        alpha = 0 if self.alpha is None else self.alpha
+        m_x_H = np.cross(m, Heff)
+        result = np.zeros(m.shape)
+        if self.gamma0 is not None:
+            result -= gamma0 / (1 + alpha**2) * m_x_H
+        if self.alpha is not None:
+            result -= gamma0 * alpha / (1 + alpha**2) * np.cross(m, m_x_H)
+        if self.transfer:
+            field = df.Field(self.mesh, nvdim=3, value=self.Ms * m)
+            for term in self.transfer:
+                result += reference.dmdt(
+                    term, field, Heff, alpha=alpha, gamma0=gamma0, t=t
+                ).array
+        return result * self.free
@@ -0,0 +1,164 @@
+"""Output files in the formats written by OOMMF.
+
+Tables are written as OOMMF ``.odt`` files with OOMMF column names, so that they
+are read by ``ubermagtable`` and ``micromagneticdata`` like the output of
+``oommfc``. Rows are appended as soon as they are computed, so that monitors can
+follow running drives.
+
+"""
+
+import datetime
+
+import discretisedfield as df
+import numpy as np
+
+#: Allowed values of ``ovf_format``.
+OVF_FORMATS = ("bin8", "bin4", "txt")
+
+
+def check_ovf_format(ovf_format):
+    """Raise ``ValueError`` if ``ovf_format`` is not supported."""
+    if ovf_format not in OVF_FORMATS:
+        raise ValueError(
+            f"Cannot write magnetisation files with {ovf_format=}; use one of"
+            f" {OVF_FORMATS}."
+        )
+
+
+def _quote(text):
+    return f"{{{text}}}" if " " in text or not text else text
+
+
+class Output:
+    """Table and magnetisation files of a drive.
+
+    Parameters
+    ----------
+    name : str
+
+        Name of the system, which is the base name of all files.
+
+    driver : str
+
+        Name of the OOMMF driver class, e.g. ``'TimeDriver'``.
+
+    evolver : str
+
+        Name of the OOMMF evolver class, e.g. ``'Oxs_RungeKuttaEvolve'``.
+
+    model : micromagnetictests.numpyc.model.Model
+
+        Model of the drive.
+
+    ovf_format : str, optional
+
+        Format of the magnetisation files. Defaults to ``'bin8'``.
+
+    stages : int, optional
+
+        Number of stages, which determines the width of the stage number in file
+        names. Defaults to ``1``.
+
+    """
+
+    def __init__(self, name, driver, evolver, model, ovf_format="bin8", stages=1):
+        check_ovf_format(ovf_format)
+        self.name = name
+        self.driver = driver
+        self.evolver = evolver
+        self.model = model
+        self.ovf_format = ovf_format
+        self.width = max(2, len(str(stages - 1)))
+        self.filename = f"{name}.odt"
+        self.columns = None
+        self.energy = None
+
+    def row(self, m, t, evolver_columns, driver_columns):
+        """Append a row to the table.
+
+        The row contains the evolver columns, the total energy and its change
+        since the last row, the energies and additional columns of all terms, the
+        driver columns, and the average magnetisation. The columns of the first
+        row define the header of the table.
+
+        Parameters
+        ----------
+        m : numpy.ndarray
+
+            Unit magnetisation.
+
+        t : numbers.Real
+
+            Time at which time-dependent terms are evaluated.
+
+        evolver_columns, driver_columns : dict
+
+            Values with tuples ``(column, unit)`` as keys. The names of evolver
+            columns are prefixed with the evolver and the names of driver columns
+            with the driver.
+
+        """
+        prefix = f"{self.evolver}:evolver:"
+        values = {
+            (prefix + name, unit): value
+            for (name, unit), value in evolver_columns.items()
+        }
+        energies = self.model.energies(m, t)
+        energy = sum(energies.values())
+        values[(prefix + "Total energy", "J")] = energy
+        values[(prefix + "Delta E", "J")] = (
+            0 if self.energy is None else energy - self.energy
+        )
+        self.energy = energy
+        for term, value in energies.items():
+            values[(f"Oxs_{term.oxs}:{term.name}:Energy", "J")] = value
+            values.update(term.columns(t))
+
+        prefix = f"Oxs_{self.driver}::"
+        values.update(
+            {
+                (prefix + name, unit): value
+                for (name, unit), value in driver_columns.items()
+            }
+        )
+        magnetic = self.model.magnetic[..., 0]
+        average = m[magnetic].mean(axis=0) if magnetic.any() else np.zeros(3)
+        for component, value in zip("xyz", average):
+            values[(f"{prefix}m{component}", "")] = value
+        self._write(values)
+
+    def _write(self, values):
+        if self.columns is None:
+            self.columns = list(values)
+            now = datetime.datetime.now().strftime("%a %b %d %H:%M:%S %Y")
+            with open(self.filename, "w", encoding="utf-8") as f:
+                f.write("# ODT 1.0\n# Table Start\n")
+                f.write(f"# Title: numpyc Data Table, {now}\n")
+                f.write(
+                    "# Columns: "
+                    + " ".join(_quote(column) for column, _ in self.columns)
+                    + "\n"
+                )
+                f.write(
+                    "# Units: "
+                    + " ".join(_quote(unit) for _, unit in self.columns)
+                    + "\n"
+                )
+        with open(self.filename, "a", encoding="utf-8") as f:
+            f.write(" ".join(f"{float(values[key]):.17g}" for key in self.columns))
+            f.write("\n")
+
+    def close(self):
+        """Write the end of the table."""
+        if self.columns is not None:
+            with open(self.filename, "a", encoding="utf-8") as f:
+                f.write("# Table End\n")
+
+    def omf(self, m, stage, iteration):
+        """Write the magnetisation ``Ms * m`` to an ``.omf`` file."""
+        filename = (
+            f"{self.name}-Oxs_{self.driver}-Magnetization-"
+            f"{stage:0{self.width}d}-{iteration:07d}.omf"
+        )
+        field = df.Field(self.model.mesh, nvdim=3, value=self.model.Ms * m)
+        field.to_file(filename, representation=self.ovf_format)
@@ -0,0 +1,375 @@
+"""Time integration and energy minimisation of unit magnetisation arrays."""
+
+import collections
+
+import micromagneticmodel as mm
+import numpy as np
+
+Tableau = collections.namedtuple("Tableau", ["c", "a", "b", "bhat", "order"])
+Tableau.__doc__ = """Butcher tableau of an embedded Runge-Kutta pair.
+
+The solution is advanced with the weights ``b``; the difference to the solution
+with the weights ``bhat`` estimates the error. ``order`` is the lower of the two
+orders.
+
+"""
+
+# Dormand-Prince 5(4) pair.
+_DP_A = [
+    [],
+    [1 / 5],
+    [3 / 40, 9 / 40],
+    [44 / 45, -56 / 15, 32 / 9],
+    [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729],
+    [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656],
+    [35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84],
+]
+_DP = Tableau(
+    c=[0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1, 1],
+    a=_DP_A,
+    b=_DP_A[-1] + [0],
+    bhat=[
+        5179 / 57600,
+        0,
+        7571 / 16695,
+        393 / 640,
+        -92097 / 339200,
+        187 / 2100,
+        1 / 40,
+    ],
+    order=4,
+)
+
+#: Tableaux of the Runge-Kutta methods. The names are the values of the ``method``
+#: attribute of ``RungeKuttaEvolver``; ``'euler'`` is used by ``EulerEvolver``.
+TABLEAUX = {
+    "euler": Tableau(c=[0, 1], a=[[], [1]], b=[1, 0], bhat=[1 / 2, 1 / 2], order=1),
+    "rk2": Tableau(c=[0, 1 / 2], a=[[], [1 / 2]], b=[0, 1], bhat=[1, 0], order=1),
+    "rk2heun": Tableau(c=[0, 1], a=[[], [1]], b=[1 / 2, 1 / 2], bhat=[1, 0], order=1),
+    "rk4": Tableau(
+        c=[0, 1 / 2, 1 / 2, 1, 1],
+        a=[[], [1 / 2], [0, 1 / 2], [0, 0, 1], [1 / 6, 1 / 3, 1 / 3, 1 / 6]],
+        b=[1 / 6, 1 / 3, 1 / 3, 1 / 6, 0],
+        bhat=[1 / 6, 1 / 3, 1 / 3, 0, 1 / 6],
+        order=3,
+    ),
+    "rkf54": _DP,
+    "rkf54m": _DP,
+    "rkf54s": _DP,
+}
+
+
+def normalise(m):
+    """Unit vectors of ``m``; cells with zero norm stay zero."""
+    norm = np.linalg.norm(m, axis=-1, keepdims=True)
+    return np.divide(m, norm, out=np.zeros_like(m), where=norm > 0)
+
+
+def maxnorm(array):
+    """Largest norm of the vectors in ``array``."""
+    return float(np.sqrt(np.max(np.sum(array**2, axis=-1)))) if array.size else 0.0
+
+
+class RungeKutta:
+    """Adaptive embedded Runge-Kutta integrator.
+
+    The step is accepted if the estimated error of the magnetisation (in radians)
+    does not exceed ``absolute_step_error`` and, if ``relative_step_error`` is
+    defined, its product with the largest change of the magnetisation in the
+    step.
+
+    Parameters
+    ----------
+    rhs : callable
+
+        Function ``rhs(m, t)`` returning the time derivative of ``m``.
+
+    tableau : micromagnetictests.numpyc.solver.Tableau
+
+        Runge-Kutta pair.
+
+    absolute_step_error : numbers.Real, optional
+
+        Allowed error per step in degrees. Defaults to ``0.2``.
+
+    relative_step_error : numbers.Real, optional
+
+        Allowed error per step relative to the largest change of the
+        magnetisation. Defaults to ``0.01``.
+
+    step_headroom : numbers.Real, optional
+
+        Safety factor of the step size. Defaults to ``0.85``.
+
+    min_timestep, max_timestep : numbers.Real, optional
+
+        Bounds of the time step in seconds. Default to ``0`` and ``inf``.
+
+    start_dm : numbers.Real, optional
+
+        Change of the magnetisation in degrees in the first step. Defaults to
+        ``0.01``.
+
+    start_dt : numbers.Real, optional
+
+        Size of the first step in seconds. If defined, ``start_dm`` is ignored.
+        Defaults to ``None``.
+
+    """
+
+    def __init__(
+        self,
+        rhs,
+        tableau,
+        absolute_step_error=0.2,
+        relative_step_error=0.01,
+        step_headroom=0.85,
+        min_timestep=0,
+        max_timestep=np.inf,
+        start_dm=0.01,
+        start_dt=None,
+    ):
+        self.rhs = rhs
+        self.tableau = tableau
+        self.absolute_step_error = np.radians(absolute_step_error)
+        self.relative_step_error = relative_step_error
+        self.step_headroom = step_headroom
+        self.min_timestep = min_timestep
+        self.max_timestep = max_timestep
+        self.start_dm = np.radians(start_dm)
+        self.dt = start_dt
+        self.last_dt = 0.0
+        self.max_dmdt = 0.0
+        self.evaluations = 0
+
+    def _rhs(self, m, t):
+        self.evaluations += 1
+        return self.rhs(m, t)
+
+    def step(self, m, t, t_end):
+        """Advance ``m`` from ``t`` by one accepted step, but not beyond ``t_end``.
+
+        Returns
+        -------
+        tuple
+
+            Magnetisation and time after the step.
+
+        """
+        c, a, b, bhat, order = self.tableau
+        k = [self._rhs(m, t)]
+        self.max_dmdt = maxnorm(k[0])
+        if self.dt is None:
+            if self.max_dmdt > 0:
+                self.dt = self.start_dm / self.max_dmdt
+            else:
+                self.dt = min(t_end - t, self.max_timestep, 1e-12)
+
+        while True:
+            dt = min(max(self.dt, self.min_timestep), self.max_timestep, t_end - t)
+            for ci, ai in zip(c[1:], a[1:]):
+                dm = sum(aij * kj for aij, kj in zip(ai, k) if aij)
+                k.append(self._rhs(normalise(m + dt * dm), t + ci * dt))
+            dm = dt * sum(bi * ki for bi, ki in zip(b, k) if bi)
+            error = maxnorm(dm - dt * sum(bi * ki for bi, ki in zip(bhat, k) if bi))
+            allowed = self.absolute_step_error
+            if self.relative_step_error is not None:
+                allowed = min(allowed, self.relative_step_error * maxnorm(dm))
+
+            if error > 0:
+                factor = self.step_headroom * (allowed / error) ** (1 / (order + 1))
+                factor = min(max(factor, 0.2), 4.0)
+            else:
+                factor = 4.0
+            if error <= allowed or dt <= self.min_timestep:
+                if dt < self.dt and factor >= 1:
+                    # The step was shortened to reach the end of the stage.
+                    self.dt = max(self.dt, dt * factor)
+                else:
+                    self.dt = dt * factor
+                self.last_dt = dt
+                return normalise(m + dm), t + dt
+            self.dt = dt * factor
+            del k[1:]
+
+
+def thermal_field_sigma(model, T, dt):
+    """Standard deviation of the components of the thermal field in A/m.
+
+    Parameters
+    ----------
+    model : micromagnetictests.numpyc.model.Model
+
+        Model with dynamics.
+
+    T : numbers.Real
+
+        Temperature in K.
+
+    dt : numbers.Real
+
+        Time step in s.
+
+    """
+    alpha = 0 if model.alpha is None else model.alpha
+    gamma0 = mm.consts.gamma0 if model.gamma0 is None else model.gamma0
+    variance = np.divide(
+        2 * alpha * mm.consts.kB * T,
+        mm.consts.mu0 * gamma0 * model.Ms * model.volume * dt,
+        out=np.zeros_like(model.Ms),
+        where=model.magnetic,
+    )
+    return np.sqrt(variance)
+
+
+class StochasticHeun:
+    """Stochastic Heun integrator of the equation of motion with a thermal field.
+
+    Parameters
+    ----------
+    model : micromagnetictests.numpyc.model.Model
+
+        Model with dynamics.
+
+    T : numbers.Real
+
+        Temperature in K.
+
+    dt : numbers.Real
+
+        Fixed time step in s.
+
+    seed : int, optional
+
+        Seed of the random number generator. Defaults to ``None``.
+
+    """
+
+    def __init__(self, model, T, dt, seed=None):
+        self.model = model
+        self.dt = dt
+        self.last_dt = dt
+        self.sigma = thermal_field_sigma(model, T, dt)
+        self.rng = np.random.default_rng(seed)
+        self.max_dmdt = 0.0
+        self.evaluations = 0
+
+    def step(self, m, t, t_end):
+        """Advance ``m`` from ``t`` by one step, but not beyond ``t_end``."""
+        dt = min(self.dt, t_end - t)
+        H = self.sigma * np.sqrt(self.dt / dt) * self.rng.standard_normal(m.shape)
+        k1 = self.model.dmdt(m, t, H=H)
+        k2 = self.model.dmdt(normalise(m + dt * k1), t + dt, H=H)
+        self.evaluations += 2
+        self.max_dmdt = maxnorm(k1)
+        self.last_dt = dt
+        return normalise(m + dt / 2 * (k1 + k2)), t + dt
+
+
+#: Torque relative to the largest effective field below which the minimiser stops,
+#: because rounding errors of the field are of the same order.
+PRECISION = 1e-12
+
+
+def torque(m, H, free):
+    """Component of ``H`` perpendicular to ``m``, i.e. ``-m x (m x H)``."""
+    return (H - np.sum(m * H, axis=-1, keepdims=True) * m) * free
+
+
+class Minimiser:
+    """Minimisation of the energy by steepest descent with Barzilai-Borwein steps.
+
+    The magnetisation is moved along the torque ``-m x (m x H)`` and normalised.
+    The step lengths alternate between the two Barzilai-Borwein formulas and the
+    rotation in a single step is limited to ``max_angle``.
+
+    Parameters
+    ----------
+    model : micromagnetictests.numpyc.model.Model
+
+        Model.
+
+    stopping_mxHxm : numbers.Real, optional
+
+        The minimisation stops when the largest torque is below this value in
+        A/m or below ``PRECISION`` times the largest effective field. Defaults to
+        ``1e-4``.
+
+    iteration_limit : int, optional
+
+        Largest number of iterations. Defaults to ``100000``.
+
+    max_angle : numbers.Real, optional
+
+        Largest rotation of the magnetisation in a single step in radians.
+        Defaults to ``0.2``.
+
+    """
+
+    def __init__(
+        self, model, stopping_mxHxm=1e-4, iteration_limit=100000, max_angle=0.2
+    ):
+        self.model = model
+        self.stopping_mxHxm = stopping_mxHxm
+        self.iteration_limit = iteration_limit
+        self.max_angle = max_angle
+        self.evaluations = 0
+        self.mxHxm = 0.0
+
+    def run(self, m, t=0, callback=None):
+        """Minimise the energy starting from ``m``.
+
+        Parameters
+        ----------
+        m : numpy.ndarray
+
+            Unit magnetisation.
+
+        t : numbers.Real, optional
+
+            Time at which time-dependent terms are evaluated. Defaults to 0.
+
+        callback : callable, optional
+
+            Function ``callback(m, iteration)`` called after every iteration.
+
+        Returns
+        -------
+        tuple
+
+            Magnetisation and number of iterations.
+
+        """
+        free = self.model.free
+        H = self.model.field(m, t)
+        d = torque(m, H, free)
+        self.evaluations += 1
+        step = None
+        iteration = 0
+        while True:
+            self.mxHxm = maxnorm(d)
+            stopping = max(self.stopping_mxHxm, PRECISION * maxnorm(H))
+            if self.mxHxm <= stopping or iteration >= self.iteration_limit:
+                return m, iteration
+            if step is None:
+                step = 0.01 / self.mxHxm
+            step = min(step, self.max_angle / self.mxHxm)
+
+            m_new = normalise(m + step * d)
+            H = self.model.field(m_new, t)
+            d_new = torque(m_new, H, free)
+            self.evaluations += 1
+            iteration += 1
+
+            s, y = m_new - m, d - d_new
+            sy = np.sum(s * y)
+            if iteration % 2:
+                numerator, denominator = np.sum(s * s), sy
+            else:
+                numerator, denominator = sy, np.sum(y * y)
+            if numerator > 0 and denominator > 0:
+                step = numerator / denominator
+            m, d = m_new, d_new
+            if callback is not None:
+                self.mxHxm = maxnorm(d)
+                callback(m, iteration)
@@ -0,0 +1,564 @@
+"""Pytest plugin for running calculator tests.
+
+The plugin is registered automatically through the ``pytest11`` entry point when
+``micromagnetictests`` is installed.
+
+"""
+
+import argparse
+import contextlib
+import json
+import pathlib
+import time
+
+import pytest
+
+#: Mesh refinement factors of the ``--mm-scale`` tiers.
+SCALE_TIERS = {"smoke": 1, "full": 4, "stress": 8}
+
+#: Modules of the tests which are run with the ``--mm-scale`` factor.
+SCALED_MODULES = ("micromagnetictests.calculatortests",)
+
+# Factors of the active ``refined_meshes`` contexts.
+_refinements = []
+
+_result_cache_key = pytest.StashKey()
+_shard_key = pytest.StashKey()
+_feature_matrix_key = pytest.StashKey()
+_profile_key = pytest.StashKey()
+
+#: Name of the file listing the files written to the ``--mm-profile`` directory.
+PROFILE_MANIFEST = ".mm-profile"
+
+
+def _scale_factor(value):
+    if value in SCALE_TIERS:
+        return SCALE_TIERS[value]
+    try:
+        factor = int(value)
+    except ValueError:
+        factor = 0
+    if factor < 1:
+        raise argparse.ArgumentTypeError(
+            f"expected one of {list(SCALE_TIERS)} or a positive integer, got {value!r}"
+        )
+    return factor
+
+
+def _shard(value):
+    try:
+        index, count = map(int, value.split("/"))
+    except ValueError:
+        index = count = 0
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(
+            f"expected I/N with 1 <= I <= N, got {value!r}"
+        )
+    return index, count
+
+
+@contextlib.contextmanager
+def refined_meshes(factor):
+    """Refine the meshes created with ``micromagnetictests.cache.mesh``.
+
+    Within the context, the number of cells of every mesh created with
+    ``micromagnetictests.cache.mesh`` is multiplied by ``factor`` in all
+    directions, i.e. the cell size is divided by ``factor``. Meshes created
+    directly with ``discretisedfield.Mesh`` are not changed. An integer factor
+    keeps subregions aligned with the cells. Contexts can be nested, in which case
+    their factors are multiplied.
+
+    With ``--mm-scale``, the pytest plugin runs all calculator tests apart from
+    benchmarks in this context. Only the tests which create their meshes with
+    ``micromagnetictests.cache.mesh`` while they run (including ``setup_method``
+    and fixtures) are refined: the tests of the ``Exchange``, ``Demag``,
+    ``Zeeman``, ``UniaxialAnisotropy``, and ``CubicAnisotropy`` terms, of the
+    ``Precession`` and ``Damping`` terms and their combination, and of the
+    ``TimeDriver``, ``MinDriver``, ``RelaxDriver``, and ``HysteresisDriver``.
+
+    Parameters
+    ----------
+    factor : int
+
+        Refinement factor.
+
+    Examples
+    --------
+    1. Refining a mesh.
+
+    >>> import micromagnetictests as mt
+    >>> from micromagnetictests.plugin import refined_meshes
+    ...
+    >>> with refined_meshes(2):
+    ...     mesh = mt.cache.mesh(p1=(0, 0, 0), p2=(4e-9, 2e-9, 1e-9), n=(4, 2, 1))
+    >>> mesh.n
+    array([8, 4, 2])
+
+    """
+    _refinements.append(factor)
+    try:
+        yield
+    finally:
+        _refinements.remove(factor)
+
+
+def refinement_factor():
+    """Refinement factor of meshes created with ``micromagnetictests.cache.mesh``.
+
+    Returns
+    -------
+    int
+
+        Product of the factors of all active ``refined_meshes`` contexts; ``1``
+        outside of them.
+
+    Examples
+    --------
+    1. Refinement factor inside and outside of ``refined_meshes``.
+
+    >>> from micromagnetictests.plugin import refined_meshes, refinement_factor
+    ...
+    >>> with refined_meshes(2):
+    ...     refinement_factor()
+    2
+    >>> refinement_factor()
+    1
+
+    """
+    factor = 1
+    for active in _refinements:
+        factor *= active
+    return factor
+
+
+def _in_modules(name, modules):
+    return any(name == module or name.startswith(f"{module}.") for module in modules)
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("micromagnetictests")
+    group.addoption(
+        "--mm-benchmark",
+        action="store_true",
+        default=False,
+        help="Run performance tests marked with mm_benchmark.",
+    )
+    group.addoption(
+        "--mm-scale",
+        type=_scale_factor,
+        default=1,
+        metavar="TIER",
+        help=(
+            "Refine the meshes which calculator tests create with"
+            " micromagnetictests.cache.mesh by an integer factor in every direction,"
+            f" or use a tier: {SCALE_TIERS}. Benchmarks are not scaled."
+        ),
+    )
+    group.addoption(
+        "--mm-result-cache",
+        default=None,
+        metavar="DIR",
+        help=(
+            "Reuse the results of identical drives from earlier runs stored in DIR"
+            " instead of calling the calculator."
+        ),
+    )
+    group.addoption(
+        "--mm-shard",
+        type=_shard,
+        default=None,
+        metavar="I/N",
+        help=(
+            "Only run the I-th of N shards of the tests. Shards are balanced with"
+            " the durations from --mm-durations and are the same on all machines."
+        ),
+    )
+    group.addoption(
+        "--mm-durations",
+        default=None,
+        metavar="FILE",
+        help=(
+            "Read the durations of tests used for --mm-shard from FILE and update"
+            " FILE with the durations of this run."
+        ),
+    )
+    group.addoption(
+        "--mm-profile",
+        default=None,
+        metavar="DIR",
+        help=(
+            "Profile every test with cProfile, time the phases of all drives, and"
+            " write per-test and aggregated reports to DIR. Profiles written to DIR"
+            " by an earlier run are removed; other files are kept."
+        ),
+    )
+    group.addoption(
+        "--mm-feature-matrix",
+        default=None,
+        metavar="FILE",
+        help=(
+            "Write the tests and wall time of every combination of term, parameter"
+            " kind, and driver to FILE. FILE is written as JSON if it ends with"
+            " .json. An existing FILE is only replaced if it is a feature matrix."
+        ),
+    )
+    group.addoption(
+        "--mm-budget",
+        type=float,
+        default=None,
+        metavar="RATE",
+        help=(
+            "Stop drives which take longer than 10 s + RATE * cells * steps and fail"
+            " the test. The drive directory is kept."
+        ),
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "mm_benchmark: performance test, only run with --mm-benchmark",
+    )
+    config.addinivalue_line(
+        "markers",
+        "mm_budget(rate, offset=10): time budget of drives, overrides --mm-budget",
+    )
+    config.addinivalue_line(
+        "markers",
+        "mm_spec(api): specification of an API which calculators do not provide yet",
+    )
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _mm_result_cache(request):
+    directory = request.config.getoption("mm_result_cache")
+    if directory is None:
+        yield
+        return
+
+    from .resultcache import ResultCache
+
+    with ResultCache(directory) as cache:
+        request.config.stash[_result_cache_key] = cache
+        yield
+
+
+@pytest.fixture(autouse=True)
+def _mm_result_cache_bypass(request):
+    cache = request.config.stash.get(_result_cache_key, None)
+    if cache is None or "mm_benchmark" not in request.keywords:
+        yield
+        return
+
+    # Benchmarks must measure the calculator.
+    cache.enabled = False
+    try:
+        yield
+    finally:
+        cache.enabled = True
+
+
+@pytest.fixture(autouse=True)
+def _mm_budget(request):
+    marker = request.node.get_closest_marker("mm_budget")
+    kwargs = {} if marker is None else dict(marker.kwargs)
+    if marker is not None and marker.args:
+        kwargs["rate"] = marker.args[0]
+    rate = kwargs.pop("rate", request.config.getoption("mm_budget"))
+    if rate is None:
+        yield
+        return
+
+    from .monitor import Budget
+
+    with Budget(rate, **kwargs):
+        yield
+
+
+def pytest_sessionstart(session):
+    directory = session.config.getoption("mm_profile")
+    if directory is not None:
+        directory = pathlib.Path(directory)
+        # Only the files listed in the manifest of an earlier run are removed.
+        for name in _profile_manifest(directory):
+            (directory / name).unlink(missing_ok=True)
+        (directory / PROFILE_MANIFEST).unlink(missing_ok=True)
+        if (directory / "summary.txt").exists():
+            raise pytest.UsageError(
+                f"--mm-profile: {directory / 'summary.txt'} was not written by"
+                " micromagnetictests; refusing to overwrite it."
+            )
+        session.config.stash[_profile_key] = []
+
+    path = session.config.getoption("mm_feature_matrix")
+    if path is not None and not _is_feature_matrix(pathlib.Path(path)):
+        raise pytest.UsageError(
+            f"--mm-feature-matrix: {path} is not a feature matrix written by"
+            " micromagnetictests; refusing to overwrite it."
+        )
+
+
+def _profile_manifest(directory):
+    manifest = directory / PROFILE_MANIFEST
+    if not manifest.is_file():
+        return []
+    names = manifest.read_text(encoding="utf-8").splitlines()
+    # Names with path separators cannot have been written by the plugin.
+    return [name for name in names if name and pathlib.Path(name).name == name]
+
+
+def _record_profile(config, directory, paths):
+    names = config.stash[_profile_key]
+    names.extend(pathlib.Path(path).name for path in paths)
+    (pathlib.Path(directory) / PROFILE_MANIFEST).write_text(
+        "\n".join(names) + "\n", encoding="utf-8"
+    )
+
+
+def _is_feature_matrix(path):
+    if not path.exists():
+        return True
+    try:
+        text = path.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return False
+    if path.suffix == ".json":
+        try:
+            return set(json.loads(text)) == {"matrix", "durations"}
+        except (ValueError, TypeError):
+            return False
+    return text.startswith("term ") and "\nnot exercised:" in text
+
+
+@pytest.fixture(autouse=True)
+def _mm_profile(request):
+    directory = request.config.getoption("mm_profile")
+    if directory is None:
+        yield
+        return
+
+    from .profiling import Profile
+
+    with Profile() as profile:
+        yield
+    paths = profile.save(directory, request.node.nodeid, overwrite=False)
+    _record_profile(request.config, directory, paths)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _mm_feature_matrix_session(request):
+    if request.config.getoption("mm_feature_matrix") is None:
+        yield
+        return
+
+    from .features import FeatureMatrix
+
+    with FeatureMatrix() as matrix:
+        request.config.stash[_feature_matrix_key] = matrix
+        yield
+
+
+@pytest.fixture(autouse=True)
+def _mm_feature_matrix(request):
+    matrix = request.config.stash.get(_feature_matrix_key, None)
+    if matrix is None:
+        yield
+        return
+
+    matrix.nodeid = request.node.nodeid
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        matrix.durations[matrix.nodeid] = time.perf_counter() - start
+        matrix.nodeid = None
+
+
+def pytest_report_header(config):
+    factor = config.getoption("mm_scale")
+    if factor != 1:
+        return f"micromagnetictests: meshes refined by a factor of {factor}"
+
+
+@pytest.fixture(autouse=True)
+def _mm_scale(request):
+    factor = request.config.getoption("mm_scale")
+    module = getattr(getattr(request.node, "obj", None), "__module__", "")
+    if (
+        factor == 1
+        or "mm_benchmark" in request.keywords
+        or not _in_modules(module, SCALED_MODULES)
+    ):
+        yield
+        return
+
+    with refined_meshes(factor):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def _mm_unsupported(request):
+    # Calculators list the calculator tests they do not support in
+    # ``UNSUPPORTED_TESTS`` (see ``micromagnetictests.numpyc``).
+    if "calculator" not in request.fixturenames:
+        return
+    calculator = request.getfixturevalue("calculator")
+    unsupported = getattr(calculator, "UNSUPPORTED_TESTS", {})
+    function = request.function
+    module = function.__module__.removeprefix(f"{SCALED_MODULES[0]}.")
+    reason = unsupported.get(f"{module}.{function.__qualname__}")
+    if reason is not None:
+        pytest.skip(reason)
+
+
+@pytest.fixture(autouse=True)
+def _mm_compute(request):
+    # ``compute`` does not call ``drive``; it is wrapped so that the result cache,
+    # the budget, the profile and the feature matrix also cover computations.
+    calculator = None
+    if "calculator" in request.fixturenames:
+        calculator = request.getfixturevalue("calculator")
+    if not callable(getattr(calculator, "compute", None)):
+        yield
+        return
+
+    from .hooks import hooked_compute
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(calculator, "compute", hooked_compute(calculator.compute))
+        yield
+
+
+def pytest_collection_modifyitems(config, items):
+    skipped = set()
+    if not config.getoption("mm_benchmark"):
+        skip = pytest.mark.skip(reason="performance test, use --mm-benchmark to run")
+        for item in items:
+            if "mm_benchmark" in item.keywords:
+                item.add_marker(skip)
+                skipped.add(item.nodeid)
+
+    shard = config.getoption("mm_shard")
+    if shard is None:
+        return
+
+    from . import sharding
+
+    index, count = shard
+    durations = {}
+    if config.getoption("mm_durations") is not None:
+        durations = sharding.load_durations(config.getoption("mm_durations"))
+    costs = sharding.costs(
+        [item.nodeid for item in items if item.nodeid not in skipped],
+        durations,
+        benchmarks={item.nodeid for item in items if "mm_benchmark" in item.keywords},
+    )
+    # Skipped performance tests take no time.
+    costs.update(dict.fromkeys(skipped, 0.0))
+    selected = set(sharding.partition(costs, count)[index - 1])
+    deselected = [item for item in items if item.nodeid not in selected]
+    config.stash[_shard_key] = (
+        [item.nodeid for item in deselected],
+        sum(costs[nodeid] for nodeid in selected),
+    )
+    items[:] = [item for item in items if item.nodeid in selected]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+
+
+def pytest_report_collectionfinish(config, start_path, items):
+    if _shard_key in config.stash:
+        index, count = config.getoption("mm_shard")
+        deselected, cost = config.stash[_shard_key]
+        total = len(items) + len(deselected)
+        return (
+            f"micromagnetictests: shard {index}/{count} with {len(items)} of {total}"
+            f" tests, expected duration {cost:.1f} s"
+        )
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if config.getoption("mm_durations") is not None:
+        _write_durations(terminalreporter, config.getoption("mm_durations"))
+
+    if config.getoption("mm_profile") is not None:
+        _write_profile(terminalreporter, config, config.getoption("mm_profile"))
+
+    matrix = config.stash.get(_feature_matrix_key, None)
+    if matrix is not None:
+        path = pathlib.Path(config.getoption("mm_feature_matrix"))
+        if path.suffix == ".json":
+            matrix.save(path)
+        else:
+            path.write_text(matrix.report(), encoding="utf-8")
+        terminalreporter.write_line(
+            f"micromagnetictests feature matrix: {len(matrix.tests)} combinations"
+            f" exercised, {len(matrix.gaps())} not exercised ({path})"
+        )
+
+    cache = config.stash.get(_result_cache_key, None)
+    if cache is not None:
+        terminalreporter.write_line(
+            f"micromagnetictests result cache: {cache.hits} results reused,"
+            f" {cache.misses} computed ({cache.directory})"
+        )
+
+    reports = [
+        report
+        for reports in terminalreporter.stats.values()
+        for report in reports
+        if getattr(report, "when", None) == "call"
+        and "mm_benchmark" in getattr(report, "keywords", {})
+        and report.user_properties
+    ]
+    if not reports:
+        return
+
+    terminalreporter.section("micromagnetictests benchmarks")
+    for report in reports:
+        terminalreporter.write_line(report.nodeid)
+        for name, value in report.user_properties:
+            terminalreporter.write_line(f"    {name}: {value}")
+
+
+def _write_durations(terminalreporter, path):
+    from . import sharding
+
+    # Durations of tests run by other shards are kept, so that all shards compute
+    # the same partition from the file.
+    durations = sharding.load_durations(path)
+    measured = {}
+    skipped = set()
+    for reports in terminalreporter.stats.values():
+        for report in reports:
+            if getattr(report, "when", None) is not None:
+                measured[report.nodeid] = measured.get(report.nodeid, 0.0)
+                measured[report.nodeid] += report.duration
+                if report.skipped:
+                    skipped.add(report.nodeid)
+    # Skipped tests did not run and their durations are not representative.
+    durations.update(
+        (nodeid, duration)
+        for nodeid, duration in measured.items()
+        if nodeid not in skipped
+    )
+    sharding.save_durations(durations, path)
+
+
+def _write_profile(terminalreporter, config, directory):
+    from .profiling import aggregate
+
+    directory = pathlib.Path(directory)
+    names = [pathlib.Path(name).stem for name in config.stash[_profile_key]]
+    if not names:
+        return
+    summary = aggregate(directory, names=names)
+    (directory / "summary.txt").write_text(summary, encoding="utf-8")
+    _record_profile(config, directory, [directory / "summary.txt"])
+
+    terminalreporter.section("micromagnetictests profile")
+    # Header and the ten slowest tests.
+    table = summary.split("\n\n")[0]
+    for line in table.splitlines()[:11]:
+        terminalreporter.write_line(line)
+    terminalreporter.write_line(f"full report: {directory / 'summary.txt'}")
@@ -0,0 +1,297 @@
+"""Combined profiling of Python code and calculators.
+
+With ``--mm-profile=DIR``, the pytest plugin runs every test under ``cProfile``
+and times the phases of all drives. For every test, the directory contains the
+raw profile (``.prof``, e.g. for ``snakeviz``), the phase
+times (``.json``), and a combined text report (``.txt``) of the phases, timing
+lines from the calculator logs, and the hot Python functions. At the end of the
+run, all profiles are aggregated in ``summary.txt``.
+
+"""
+
+import contextlib
+import cProfile
+import hashlib
+import io
+import json
+import pathlib
+import pstats
+import re
+import time
+
+from micromagnetictests.benchmark import PhaseTimer
+from micromagnetictests.hooks import DriveHook
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None  # not available on Windows
+
+#: Patterns of log files written by calculators into drive directories.
+LOG_PATTERNS = ("*.log", "log.txt")
+
+# Length of the readable part of file names; the limit of most file systems is
+# 255 bytes.
+_MAX_NAME = 120
+
+_timing_line = re.compile(r"time|elapsed|duration", re.IGNORECASE)
+
+
+def _children_cpu_time():
+    if resource is None:  # pragma: no cover
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _hot_functions(stats, n):
+    stream = io.StringIO()
+    stats.stream = stream
+    stats.sort_stats("cumulative").print_stats(n)
+    # The header of ``print_stats`` contains the (varying) list of profile files.
+    lines = stream.getvalue().splitlines()
+    start = next((i for i, line in enumerate(lines) if "ncalls" in line), 0)
+    return "\n".join(lines[start:])
+
+
+class Profile(DriveHook):
+    """Profile of Python code and the phases of drives.
+
+    Used as a context manager, Python code is profiled with ``cProfile`` and all
+    drives and hooked computations are intercepted (see
+    ``micromagnetictests.hooks``): the phases of every drive are timed with
+    ``micromagnetictests.benchmark.PhaseTimer``, computations are timed as a whole
+    in the ``compute`` phase, and the CPU time of the calculator processes is
+    measured. Lines mentioning times in log files of calculators are collected
+    from the drive and compute directories.
+
+    The phases within the solver (e.g. the setup of the demagnetisation kernel)
+    are not measured. They are only available from the log lines, which are
+    selected by matching the words ``time``, ``elapsed``, or ``duration`` and are
+    reported as they are, without parsing.
+
+    Examples
+    --------
+    1. Profiling a drive.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> with mt.profiling.Profile() as profile:
+    ...     pass  # md.drive(system)
+    >>> profile.drives
+    0
+
+    """
+
+    def __init__(self):
+        self.drives = 0
+        self.computes = 0
+        self.phases = dict.fromkeys(PhaseTimer.phases, 0.0)
+        self.phases["compute"] = 0.0
+        self.phases["solver_cpu"] = 0.0
+        self.logs = []
+        self.stats = None
+        self._profiler = cProfile.Profile()
+        self._start = None
+
+    def _drive(self, call, driver, system, **kwargs):
+        cpu = _children_cpu_time()
+        timer = PhaseTimer(driver)
+        try:
+            with timer:
+                return call()
+        finally:
+            self.drives += 1
+            for phase, value in timer.times.items():
+                self.phases[phase] += value
+            self.phases["solver_cpu"] += _children_cpu_time() - cpu
+            system_dir = pathlib.Path(kwargs.get("dirname", "."), system.name)
+            self._collect_logs(system_dir, "drive")
+
+    def _compute(self, call, compute, func, system, **kwargs):
+        cpu = _children_cpu_time()
+        start = time.perf_counter()
+        try:
+            return call()
+        finally:
+            self.computes += 1
+            self.phases["compute"] += time.perf_counter() - start
+            self.phases["solver_cpu"] += _children_cpu_time() - cpu
+            system_dir = pathlib.Path(kwargs.get("dirname", "."), system.name)
+            self._collect_logs(system_dir, "compute")
+
+    def _collect_logs(self, system_dir, mode):
+        runs = list(system_dir.glob(f"{mode}-*"))
+        if not runs:
+            return
+        # The last run has the largest number, whether it succeeded or not.
+        workingdir = max(runs, key=lambda path: int(path.name.split("-")[1]))
+        for pattern in LOG_PATTERNS:
+            for path in sorted(workingdir.glob(pattern)):
+                with contextlib.suppress(OSError, UnicodeDecodeError):
+                    self.logs.extend(
+                        f"{path.name}: {line.strip()}"
+                        for line in path.read_text().splitlines()
+                        if _timing_line.search(line)
+                    )
+
+    def report(self, n=20):
+        """Combined text report.
+
+        Parameters
+        ----------
+        n : int, optional
+
+            Number of Python functions with the largest cumulative time. Defaults
+            to ``20``.
+
+        Returns
+        -------
+        str
+
+            Report of drive phases, calculator log lines, and hot functions.
+
+        """
+        lines = [f"drives: {self.drives}", f"computes: {self.computes}"]
+        lines.extend(f"{phase}: {value:.3f} s" for phase, value in self.phases.items())
+        if self.logs:
+            lines.append("")
+            lines.append("calculator logs:")
+            lines.extend(f"    {line}" for line in self.logs)
+        if self.stats is not None:
+            lines.append("")
+            lines.append(_hot_functions(self.stats, n))
+        return "\n".join(lines)
+
+    def save(self, directory, name, overwrite=True):
+        """Write the profile, phases, and report.
+
+        Parameters
+        ----------
+        directory : pathlib.Path, str
+
+            Output directory. It is created if it does not exist.
+
+        name : str
+
+            Base name of the files, e.g. the test node ID. Characters not allowed
+            in file names are replaced, long names are shortened, and a short hash
+            of ``name`` is appended, so that different names give different files.
+
+        overwrite : bool, optional
+
+            If ``False``, existing files are not replaced. Defaults to ``True``.
+
+        Returns
+        -------
+        list
+
+            Paths of the written files.
+
+        Raises
+        ------
+        FileExistsError
+
+            If ``overwrite=False`` and one of the files exists.
+
+        """
+        directory = pathlib.Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha1(name.encode()).hexdigest()[:8]
+        name = re.sub(r"[^\w.-]+", "_", name).strip("_")[:_MAX_NAME]
+        name = f"{name}-{digest}"
+        paths = [directory / f"{name}{suffix}" for suffix in (".prof", ".json", ".txt")]
+        if not overwrite:
+            for path in paths:
+                if path.exists():
+                    raise FileExistsError(f"Refusing to overwrite {path}.")
+        self.stats.dump_stats(paths[0])
+        with paths[1].open("w", encoding="utf-8") as f:
+            json.dump(
+                {"drives": self.drives, "computes": self.computes, **self.phases}, f
+            )
+        paths[2].write_text(self.report(), encoding="utf-8")
+        return paths
+
+    def __enter__(self):
+        super().__enter__()
+        self._start = time.perf_counter()
+        self._profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._profiler.disable()
+        self.phases["total"] = time.perf_counter() - self._start
+        super().__exit__(exc_type, exc_value, traceback)
+        self.stats = pstats.Stats(self._profiler)
+
+
+def aggregate(directory, n=30, names=None):
+    """Aggregate the profiles of all tests.
+
+    Parameters
+    ----------
+    directory : pathlib.Path, str
+
+        Directory with files written by ``Profile.save``.
+
+    n : int, optional
+
+        Number of Python functions with the largest cumulative time. Defaults to
+        ``30``.
+
+    names : list, optional
+
+        Base names of the tests to aggregate. Defaults to all tests in
+        ``directory``.
+
+    Returns
+    -------
+    str
+
+        Report of the tests sorted by total time with their drive phases, and of
+        the hot Python functions of the whole run.
+
+    Examples
+    --------
+    1. Aggregating profiles.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> # print(mt.profiling.aggregate("mm-profile"))
+
+    """
+    directory = pathlib.Path(directory)
+    if names is None:
+        names = [path.stem for path in directory.glob("*.json")]
+    names = sorted(set(names))
+    phases = {
+        name: json.loads((directory / f"{name}.json").read_text(encoding="utf-8"))
+        for name in names
+    }
+    columns = [
+        "total",
+        "call",
+        "compute",
+        "solver_cpu",
+        "write_input_files",
+        "read_data",
+    ]
+    lines = [f"{'test':<60}" + "".join(f"{column:>18}" for column in columns)]
+    for name, values in sorted(
+        phases.items(), key=lambda item: item[1].get("total", 0.0), reverse=True
+    ):
+        lines.append(
+            f"{name:<60}"
+            + "".join(f"{values.get(column, 0.0):>18.3f}" for column in columns)
+        )
+
+    profiles = [
+        str(directory / f"{name}.prof")
+        for name in names
+        if (directory / f"{name}.prof").exists()
+    ]
+    if profiles:
+        lines.append("")
+        lines.append(_hot_functions(pstats.Stats(*profiles), n))
+    return "\n".join(lines)
@@ -0,0 +1,445 @@
+r"""Reference implementations of micromagnetic terms.
+
+The functions in this module evaluate ``micromagneticmodel`` terms directly with
+NumPy on whole arrays. They serve as a ground truth against which the results of
+calculators can be compared cell by cell.
+
+The RKKY energy follows OOMMF's ``Oxs_TwoSurfaceExchange`` and is measured with
+respect to parallel alignment of the facing cells, i.e. the surface energy
+density is :math:`\sigma(1 - \mathbf{m}_1\cdot\mathbf{m}_2) +
+\sigma_2(1 - (\mathbf{m}_1\cdot\mathbf{m}_2)^2)`.
+
+"""
+
+import functools
+
+import discretisedfield as df
+import micromagneticmodel as mm
+import numpy as np
+
+
+def _attribute(term, name, default=None):
+    """Value of a term attribute or ``default`` if the attribute is not set."""
+    return vars(term).get(name, default)
+
+
+def _parameter_array(value, mesh, nvdim):
+    """Per-cell array of a scalar, vector, dict, or field-valued parameter."""
+    return df.Field(mesh, nvdim=nvdim, value=value).array
+
+
+def _unit_array(m):
+    """Array of unit vectors of ``m``; cells with zero norm are set to zero."""
+    norm = np.linalg.norm(m.array, axis=-1, keepdims=True)
+    return np.divide(m.array, norm, out=np.zeros_like(m.array), where=norm > 0)
+
+
+def _derivative(array, axis, h, periodic):
+    """Central-difference derivative of ``array`` along a spatial ``axis``."""
+    if array.shape[axis] == 1:
+        return np.zeros_like(array)
+    if periodic:
+        return (np.roll(array, -1, axis=axis) - np.roll(array, 1, axis=axis)) / (2 * h)
+    return np.gradient(array, h, axis=axis)
+
+
+def _time_factor(term, t):
+    """Time-dependent pre-factor of a term at time ``t``."""
+    if _attribute(term, "tcl_strings") is not None:
+        raise NotImplementedError(
+            "Time dependence defined with tcl_strings cannot be evaluated in Python."
+        )
+    func = _attribute(term, "func")
+    return 1 if func is None else func(t)
+
+
+@functools.singledispatch
+def dmdt(term, m, Heff, *, alpha=0, gamma0=mm.consts.gamma0, t=0):
+    r"""Time derivative of the normalised magnetisation.
+
+    The right-hand side of the equation of motion is evaluated for a single
+    dynamics term or for a whole ``micromagneticmodel.Dynamics`` container in its
+    explicit (Landau-Lifshitz) form. Parameters of the dynamics terms can be
+    scalars, vectors, dictionaries, or ``discretisedfield.Field`` objects. If a
+    term defines a time-dependence ``func``, its value at time ``t`` multiplies
+    the term. Cells in which the norm of ``m`` is zero have zero time
+    derivative.
+
+    Parameters
+    ----------
+    term : micromagneticmodel.DynamicsTerm, micromagneticmodel.Dynamics
+
+        Dynamics term or container.
+
+    m : discretisedfield.Field
+
+        Magnetisation field.
+
+    Heff : discretisedfield.Field, array_like
+
+        Effective field in A/m.
+
+    alpha : numbers.Real, dict, discretisedfield.Field, optional
+
+        Gilbert damping used to convert individual terms into the explicit form.
+        Ignored for containers, which take it from their ``Damping`` term.
+        Defaults to 0.
+
+    gamma0 : numbers.Real, dict, discretisedfield.Field, optional
+
+        Gyromagnetic ratio in m/As used if the term does not define it. Ignored
+        for containers, which take it from their ``Precession`` term. Defaults to
+        ``micromagneticmodel.consts.gamma0``.
+
+    t : numbers.Real, optional
+
+        Time in seconds at which time-dependent terms are evaluated. Defaults to
+        0.
+
+    Returns
+    -------
+    discretisedfield.Field
+
+        Time derivative of the normalised magnetisation in 1/s.
+
+    Raises
+    ------
+    NotImplementedError
+
+        If there is no reference implementation of ``term`` or if its time
+        dependence is defined using ``tcl_strings``.
+
+    Examples
+    --------
+    1. Precession of a uniform magnetisation in a perpendicular field.
+
+    >>> import discretisedfield as df
+    >>> import micromagneticmodel as mm
+    >>> import micromagnetictests as mt
+    ...
+    >>> mesh = df.Mesh(p1=(0, 0, 0), p2=(5e-9, 5e-9, 5e-9), n=(5, 5, 5))
+    >>> m = df.Field(mesh, nvdim=3, value=(1, 0, 0), norm=8e5)
+    >>> dynamics = mm.Precession(gamma0=2.211e5)
+    >>> mt.reference.dmdt(dynamics, m, (0, 0, 1e6)).mean()
+    array([0.000e+00, 2.211e+11, 0.000e+00])
+
+    """
+    raise NotImplementedError(f"No reference implementation for {type(term)}.")
+
+
+@dmdt.register(mm.Dynamics)
+def _(term, m, Heff, *, alpha=0, gamma0=mm.consts.gamma0, t=0):
+    damping = [item for item in term if isinstance(item, mm.Damping)]
+    precession = [item for item in term if isinstance(item, mm.Precession)]
+    if damping:
+        alpha = damping[0].alpha
+    if precession:
+        gamma0 = precession[0].gamma0
+    result = df.Field(m.mesh, nvdim=3, value=(0, 0, 0))
+    for item in term:
+        result += dmdt(item, m, Heff, alpha=alpha, gamma0=gamma0, t=t)
+    return result
+
+
+@dmdt.register(mm.Precession)
+def _(term, m, Heff, *, alpha=0, gamma0=mm.consts.gamma0, t=0):
+    alpha = _parameter_array(alpha, m.mesh, nvdim=1)
+    gamma0 = _parameter_array(term.gamma0, m.mesh, nvdim=1)
+    mu = _unit_array(m)
+    H = _parameter_array(Heff, m.mesh, nvdim=3)
+    value = -gamma0 / (1 + alpha**2) * np.cross(mu, H)
+    return df.Field(m.mesh, nvdim=3, value=value)
+
+
+@dmdt.register(mm.Damping)
+def _(term, m, Heff, *, alpha=0, gamma0=mm.consts.gamma0, t=0):
+    alpha = _parameter_array(term.alpha, m.mesh, nvdim=1)
+    gamma0 = _parameter_array(gamma0, m.mesh, nvdim=1)
+    mu = _unit_array(m)
+    H = _parameter_array(Heff, m.mesh, nvdim=3)
+    value = -gamma0 * alpha / (1 + alpha**2) * np.cross(mu, np.cross(mu, H))
+    return df.Field(m.mesh, nvdim=3, value=value)
+
+
+@dmdt.register(mm.ZhangLi)
+def _(term, m, Heff, *, alpha=0, gamma0=mm.consts.gamma0, t=0):
+    mesh = m.mesh
+    alpha = _parameter_array(alpha, mesh, nvdim=1)
+    beta = term.beta
+
+    # Scalar values of u define a current in x direction.
+    u = term.u
+    if isinstance(u, df.Field):
+        nvdim = u.nvdim
+    elif isinstance(u, dict):
+        nvdim = 1 if np.ndim(next(iter(u.values()))) == 0 else 3
+    else:
+        nvdim = 1 if np.ndim(u) == 0 else 3
+    u = _parameter_array(u, mesh, nvdim=nvdim)
+    if nvdim == 1:
+        u = u * np.array([1, 0, 0])
+    u = u * _time_factor(term, t)
+
+    mu = _unit_array(m)
+    u_grad_m = sum(
+        u[..., i, np.newaxis]
+        * _derivative(mu, axis=i, h=mesh.cell[i], periodic=dim in mesh.bc)
+        for i, dim in enumerate("xyz")
+    )
+
+    # Positive u moves magnetisation textures in the direction of u, which in the
+    # Gilbert form reads dm/dt = ... - (u.grad)m + beta m x (u.grad)m.
+    m_x_ugradm = np.cross(mu, u_grad_m)
+    value = (
+        (1 + alpha * beta) * np.cross(mu, m_x_ugradm) + (beta - alpha) * m_x_ugradm
+    ) / (1 + alpha**2)
+    value[np.linalg.norm(m.array, axis=-1) == 0] = 0
+    return df.Field(mesh, nvdim=3, value=value)
+
+
+@dmdt.register(mm.Slonczewski)
+def _(term, m, Heff, *, alpha=0, gamma0=mm.consts.gamma0, t=0, thickness=None):
+    mesh = m.mesh
+    alpha = _parameter_array(alpha, mesh, nvdim=1)
+    gamma0 = _parameter_array(gamma0, mesh, nvdim=1)
+    J = _parameter_array(term.J, mesh, nvdim=1) * _time_factor(term, t)
+    mp = _parameter_array(term.mp, mesh, nvdim=3)
+    mp = mp / np.linalg.norm(mp, axis=-1, keepdims=True)
+    P = _parameter_array(term.P, mesh, nvdim=1)
+    Lambda = _parameter_array(term.Lambda, mesh, nvdim=1)
+    eps_prime = _parameter_array(_attribute(term, "eps_prime", 0), mesh, nvdim=1)
+
+    # The free layer thickness defaults to the sample thickness in z direction.
+    if thickness is None:
+        thickness = mesh.region.edges[2]
+
+    Ms = np.linalg.norm(m.array, axis=-1, keepdims=True)
+    mu = _unit_array(m)
+    beta = np.divide(
+        abs(mm.consts.hbar / (mm.consts.mu0 * mm.consts.e)) * J,
+        thickness * Ms,
+        out=np.zeros_like(Ms),
+        where=Ms > 0,
+    )
+    m_dot_mp = np.sum(mu * mp, axis=-1, keepdims=True)
+    eps = P * Lambda**2 / ((Lambda**2 + 1) + (Lambda**2 - 1) * m_dot_mp)
+
+    value = gamma0 * beta * (eps + alpha * eps_prime) / (1 + alpha**2) * np.cross(
+        mu, np.cross(mp, mu)
+    ) - gamma0 * beta * (eps_prime - alpha * eps) / (1 + alpha**2) * np.cross(mu, mp)
+    return df.Field(mesh, nvdim=3, value=value)
+
+
+def _rkky_surfaces(term, m):
+    """Slices of the mutually facing cell layers of the two RKKY subregions.
+
+    The first two elements of the returned tuple are index tuples of the facing
+    layers of the two subregions (restricted to their lateral overlap), the last
+    element is the axis the surfaces are perpendicular to.
+
+    """
+    mesh = m.mesh
+    region1, region2 = (mesh.subregions[name] for name in term.subregions)
+    direction, first, second = region1.facing_surface(region2)
+    axis = mesh.region.dims.index(direction)
+
+    slices1 = list(mesh.region2slices(first))
+    slices2 = list(mesh.region2slices(second))
+    for i in range(mesh.region.ndim):
+        if i == axis:
+            slices1[i] = slice(slices1[i].stop - 1, slices1[i].stop)
+            slices2[i] = slice(slices2[i].start, slices2[i].start + 1)
+        else:
+            start = max(slices1[i].start, slices2[i].start)
+            stop = min(slices1[i].stop, slices2[i].stop)
+            slices1[i] = slices2[i] = slice(start, stop)
+    return tuple(slices1), tuple(slices2), axis
+
+
+def _rkky_coupling(term, m):
+    """Facing cells, their unit vectors, norms, and the surface energy density."""
+    slices1, slices2, axis = _rkky_surfaces(term, m)
+    Ms = np.linalg.norm(m.array, axis=-1, keepdims=True)
+    mu = _unit_array(m)
+    m1, m2 = mu[slices1], mu[slices2]
+    dot = np.sum(m1 * m2, axis=-1, keepdims=True)
+    sigma = _attribute(term, "sigma", 0)
+    sigma2 = _attribute(term, "sigma2", 0)
+    valid = (Ms[slices1] > 0) & (Ms[slices2] > 0)
+    surface_density = np.where(valid, sigma * (1 - dot) + sigma2 * (1 - dot**2), 0)
+    return slices1, slices2, axis, m1, m2, Ms, dot, valid, surface_density
+
+
+@functools.singledispatch
+def energy(term, m):
+    """Energy of an energy term or container.
+
+    Parameters
+    ----------
+    term : micromagneticmodel.EnergyTerm, micromagneticmodel.Energy
+
+        Energy term or container.
+
+    m : discretisedfield.Field
+
+        Magnetisation field.
+
+    Returns
+    -------
+    float
+
+        Energy in J.
+
+    Raises
+    ------
+    NotImplementedError
+
+        If there is no reference implementation of ``term``.
+
+    Examples
+    --------
+    1. Energy of two antiparallel layers coupled by RKKY interaction.
+
+    >>> import discretisedfield as df
+    >>> import micromagneticmodel as mm
+    >>> import micromagnetictests as mt
+    ...
+    >>> subregions = {
+    ...     "bottom": df.Region(p1=(0, 0, 0), p2=(10e-9, 10e-9, 2e-9)),
+    ...     "top": df.Region(p1=(0, 0, 3e-9), p2=(10e-9, 10e-9, 5e-9)),
+    ... }
+    >>> mesh = df.Mesh(
+    ...     p1=(0, 0, 0), p2=(10e-9, 10e-9, 5e-9), n=(5, 5, 5), subregions=subregions
+    ... )
+    >>> m = df.Field(mesh, nvdim=3, value={"top": (0, 0, -1), "default": (0, 0, 1)})
+    >>> rkky = mm.RKKY(sigma=1e-4, subregions=["bottom", "top"])
+    >>> area = 10e-9 * 10e-9
+    >>> abs(mt.reference.energy(rkky, m) - 2 * 1e-4 * area) < 1e-30
+    True
+
+    """
+    raise NotImplementedError(f"No reference implementation for {type(term)}.")
+
+
+@energy.register(mm.Energy)
+def _(term, m):
+    return sum(energy(item, m) for item in term)
+
+
+@energy.register(mm.RKKY)
+def _(term, m):
+    *_, axis, _, _, _, _, _, surface_density = _rkky_coupling(term, m)
+    area = np.prod(np.delete(m.mesh.cell, axis))
+    return float(np.sum(surface_density) * area)
+
+
+@functools.singledispatch
+def density(term, m):
+    """Energy density of an energy term or container.
+
+    For terms coupling pairs of cells, the energy of each pair is split equally
+    between the two cells.
+
+    Parameters
+    ----------
+    term : micromagneticmodel.EnergyTerm, micromagneticmodel.Energy
+
+        Energy term or container.
+
+    m : discretisedfield.Field
+
+        Magnetisation field.
+
+    Returns
+    -------
+    discretisedfield.Field
+
+        Energy density in J/m**3.
+
+    Raises
+    ------
+    NotImplementedError
+
+        If there is no reference implementation of ``term``.
+
+    """
+    raise NotImplementedError(f"No reference implementation for {type(term)}.")
+
+
+@density.register(mm.Energy)
+def _(term, m):
+    result = df.Field(m.mesh, nvdim=1, value=0)
+    for item in term:
+        result += density(item, m)
+    return result
+
+
+@density.register(mm.RKKY)
+def _(term, m):
+    slices1, slices2, axis, *_, surface_density = _rkky_coupling(term, m)
+    value = np.zeros((*m.mesh.n, 1))
+    value[slices1] += surface_density / (2 * m.mesh.cell[axis])
+    value[slices2] += surface_density / (2 * m.mesh.cell[axis])
+    return df.Field(m.mesh, nvdim=1, value=value)
+
+
+@functools.singledispatch
+def effective_field(term, m):
+    """Effective field of an energy term or container.
+
+    Parameters
+    ----------
+    term : micromagneticmodel.EnergyTerm, micromagneticmodel.Energy
+
+        Energy term or container.
+
+    m : discretisedfield.Field
+
+        Magnetisation field.
+
+    Returns
+    -------
+    discretisedfield.Field
+
+        Effective field in A/m.
+
+    Raises
+    ------
+    NotImplementedError
+
+        If there is no reference implementation of ``term``.
+
+    """
+    raise NotImplementedError(f"No reference implementation for {type(term)}.")
+
+
+@effective_field.register(mm.Energy)
+def _(term, m):
+    result = df.Field(m.mesh, nvdim=3, value=(0, 0, 0))
+    for item in term:
+        result += effective_field(item, m)
+    return result
+
+
+@effective_field.register(mm.RKKY)
+def _(term, m):
+    slices1, slices2, axis, m1, m2, Ms, dot, valid, _ = _rkky_coupling(term, m)
+    sigma = _attribute(term, "sigma", 0)
+    sigma2 = _attribute(term, "sigma2", 0)
+    coupling = np.where(valid, sigma + 2 * sigma2 * dot, 0)
+    delta = m.mesh.cell[axis]
+
+    value = np.zeros((*m.mesh.n, 3))
+    value[slices1] += np.divide(
+        coupling * m2,
+        mm.consts.mu0 * Ms[slices1] * delta,
+        out=np.zeros_like(m2),
+        where=valid,
+    )
+    value[slices2] += np.divide(
+        coupling * m1,
+        mm.consts.mu0 * Ms[slices2] * delta,
+        out=np.zeros_like(m1),
+        where=valid,
+    )
+    return df.Field(m.mesh, nvdim=3, value=value)
@@ -0,0 +1,271 @@
+"""Cache of drive results across test runs.
+
+Within a ``ResultCache`` context, every drive of a
+``micromagneticmodel.ExternalDriver`` is identified by a hash of the calculator
+version, the driver and its keyword arguments, and the system (mesh, energy,
+dynamics, magnetisation, temperature and name). If the same drive has been run
+before, the output files of the earlier run are copied into the new drive
+directory instead of calling the external calculator. All other steps of the
+drive, i.e. writing the input files and ``info.json`` and reading the results into
+``system.m`` and ``system.table``, are performed as usual.
+
+Computations with a ``compute`` wrapped by ``micromagnetictests.hooks.hooked_compute``
+are identified in the same way by the calculator, the computed property, and the
+system. The returned value is stored with the output files and returned again
+together with a copy of the files in a new compute directory.
+
+The cache is opt-in with the ``--mm-result-cache=DIR`` option of the pytest
+plugin. It must be cleared manually when a calculator changes without a change of
+its version number.
+
+"""
+
+import functools
+import hashlib
+import importlib
+import importlib.metadata
+import inspect
+import os
+import pathlib
+import pickle
+import shutil
+import threading
+
+import discretisedfield as df
+import micromagneticmodel as mm
+import numpy as np
+
+from micromagnetictests.hooks import DriveHook
+
+# Arguments of ``drive`` and ``compute`` that do not change the results.
+_IGNORED_KWARGS = ("dirname", "append", "runner", "verbose", "n_threads")
+
+# Name of the file with the value returned by ``compute`` in cache entries.
+_RESULT = "result.pickle"
+
+
+def _update(digest, obj, seen=None):
+    """Feed a deterministic representation of ``obj`` into ``digest``."""
+    seen = set() if seen is None else seen
+    if obj is None or isinstance(obj, (bool, int, float, complex, str, bytes)):
+        digest.update(repr(obj).encode())
+        return
+    elif isinstance(obj, np.generic):
+        digest.update(repr(obj.item()).encode())
+        return
+    elif isinstance(obj, np.ndarray):
+        digest.update(f"ndarray{obj.dtype}{obj.shape}".encode())
+        digest.update(np.ascontiguousarray(obj).tobytes())
+        return
+    elif inspect.ismodule(obj) or inspect.isclass(obj):
+        digest.update(f"{obj.__name__}".encode())
+        return
+
+    if id(obj) in seen:  # reference cycle
+        digest.update(b"cycle")
+        return
+    seen.add(id(obj))
+    try:
+        _update_object(digest, obj, seen)
+    finally:
+        # Only objects on the current path are tracked; ids of objects which have
+        # been processed can be reused by new objects.
+        seen.discard(id(obj))
+
+
+def _update_object(digest, obj, seen):
+    if isinstance(obj, (list, tuple)):
+        digest.update(f"{type(obj).__name__}{len(obj)}".encode())
+        for item in obj:
+            _update(digest, item, seen)
+    elif isinstance(obj, dict):
+        digest.update(f"dict{len(obj)}".encode())
+        for key in sorted(obj, key=repr):
+            _update(digest, key, seen)
+            _update(digest, obj[key], seen)
+    elif isinstance(obj, df.Region):
+        _update(digest, ("Region", obj.pmin, obj.pmax, obj.dims, obj.units), seen)
+    elif isinstance(obj, df.Mesh):
+        _update(digest, ("Mesh", obj.region, obj.n, obj.bc, obj.subregions), seen)
+    elif isinstance(obj, df.Field):
+        _update(digest, ("Field", obj.mesh, obj.nvdim, obj.array), seen)
+    elif isinstance(obj, mm.System):
+        T = getattr(obj, "T", 0)
+        _update(digest, (obj.name, obj.energy, obj.dynamics, obj.m, T), seen)
+    elif inspect.ismethod(obj):
+        _update(digest, (obj.__func__, obj.__self__), seen)
+    elif inspect.isfunction(obj):
+        # Functions, e.g. the time dependence of a term, are identified by their
+        # source code, default arguments, and the values they close over.
+        try:
+            source = inspect.getsource(obj)
+        except (OSError, TypeError):
+            source = obj.__code__.co_code
+        closure = [cell.cell_contents for cell in obj.__closure__ or ()]
+        _update(digest, (obj.__qualname__, source, obj.__defaults__, closure), seen)
+    elif hasattr(obj, "__dict__"):
+        # Energy and dynamics terms and containers, evolvers, etc.
+        _update(digest, (type(obj).__qualname__, vars(obj)), seen)
+    else:
+        digest.update(f"{type(obj).__qualname__}{obj!r}".encode())
+
+
+def _version(obj):
+    package = obj.__module__.split(".")[0]
+    try:
+        return importlib.metadata.version(package)
+    except importlib.metadata.PackageNotFoundError:
+        return getattr(importlib.import_module(package), "__version__", None)
+
+
+class ResultCache(DriveHook):
+    """Content-addressed cache of drive results.
+
+    Used as a context manager, it intercepts all drives and hooked computations
+    (see ``micromagnetictests.hooks``) and reuses results of identical earlier
+    ones. The numbers of reused and computed results are counted in ``hits`` and
+    ``misses``. Setting ``enabled`` to ``False`` temporarily bypasses the cache,
+    e.g. for benchmarks.
+
+    Parameters
+    ----------
+    directory : pathlib.Path, str
+
+        Directory in which the results are stored. It is created if it does not
+        exist and can be shared between test runs.
+
+    Examples
+    --------
+    1. Reusing the results of a drive.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> # with mt.resultcache.ResultCache("results") as cache:
+    >>> #     md.drive(system)  # runs the calculator
+    >>> #     system.m = m_initial
+    >>> #     md.drive(system)  # copies the results of the first drive
+    >>> # cache.hits, cache.misses
+    >>> # (1, 1)
+
+    """
+
+    def __init__(self, directory):
+        self.directory = pathlib.Path(directory).absolute()
+        self.hits = 0
+        self.misses = 0
+        self.enabled = True
+
+    def key(self, driver, system, **kwargs):
+        """Hash identifying a drive.
+
+        Parameters
+        ----------
+        driver : micromagneticmodel.ExternalDriver
+
+            Driver.
+
+        system : micromagneticmodel.System
+
+            System before the drive.
+
+        kwargs : dict
+
+            Keyword arguments of ``drive``.
+
+        Returns
+        -------
+        str
+
+            Hexadecimal SHA-256 hash.
+
+        """
+        kwargs = {
+            key: value for key, value in kwargs.items() if key not in _IGNORED_KWARGS
+        }
+        # Private attributes of drivers are not part of their configuration, e.g.
+        # methods wrapped by ``micromagnetictests.benchmark.PhaseTimer``.
+        settings = {
+            key: value for key, value in vars(driver).items() if not key.startswith("_")
+        }
+        digest = hashlib.sha256()
+        _update(digest, (_version(driver), type(driver), settings, system, kwargs))
+        return digest.hexdigest()
+
+    def _call(self, call, key, **kwargs):
+        """Copy cached results into the working directory or call the calculator."""
+        entry = self.directory / key
+        if entry.is_dir():
+            ignore = shutil.ignore_patterns("info.json")
+            shutil.copytree(entry, ".", ignore=ignore, dirs_exist_ok=True)
+            self.hits += 1
+            return
+
+        call(**kwargs)
+        self.misses += 1
+        self._store(key, ".")
+
+    def _store(self, key, workingdir, result=None):
+        # Results are first copied to a temporary directory, so that concurrent or
+        # interrupted runs never leave incomplete entries.
+        tmp = self.directory / f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.copytree(workingdir, tmp, ignore=shutil.ignore_patterns("info.json"))
+        if result is not None:
+            with open(tmp / _RESULT, "wb") as f:
+                pickle.dump(result, f)
+        try:
+            tmp.rename(self.directory / key)
+        except OSError:  # the same result has been stored in the meantime
+            shutil.rmtree(tmp)
+
+    def _drive(self, call, driver, system, **kwargs):
+        if not self.enabled:
+            return call()
+        key = self.key(driver, system, **kwargs)
+        instance_call = vars(driver).get("_call")
+        driver._call = functools.partial(self._call, driver._call, key)
+        try:
+            return call()
+        finally:
+            if instance_call is None:
+                del driver._call
+            else:
+                driver._call = instance_call
+
+    def _compute(self, call, compute, func, system, **kwargs):
+        if not self.enabled:
+            return call()
+        dirname = kwargs.get("dirname", ".")
+        append = kwargs.get("append", True)
+        kwargs = {
+            key: value for key, value in kwargs.items() if key not in _IGNORED_KWARGS
+        }
+        digest = hashlib.sha256()
+        _update(digest, (_version(compute), compute, func, system, kwargs))
+        key = digest.hexdigest()
+
+        entry = self.directory / key
+        if (entry / _RESULT).is_file():
+            workingdir = mm.ExternalDriver._setup_working_directory(
+                system=system,
+                dirname=dirname,
+                mode="compute",
+                append=append,
+            )
+            ignore = shutil.ignore_patterns(_RESULT)
+            shutil.copytree(entry, workingdir, ignore=ignore, dirs_exist_ok=True)
+            system.compute_number += 1
+            self.hits += 1
+            with open(entry / _RESULT, "rb") as f:
+                return pickle.load(f)
+
+        result = call()
+        self.misses += 1
+        number = system.compute_number - 1
+        self._store(
+            key, pathlib.Path(dirname, system.name, f"compute-{number}"), result
+        )
+        return result
+
+    def __enter__(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return super().__enter__()
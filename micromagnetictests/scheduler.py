@@ -0,0 +1,221 @@
+"""Local job scheduler for testing ``schedule``.
+
+``micromagneticmodel.ExternalDriver.schedule`` writes a job script and submits it
+by running ``<cmd> <script_name>`` in the drive directory, where ``cmd`` is the
+submission program of a job scheduling system, e.g. ``sbatch``. ``LocalScheduler``
+provides such a submission program and runs the submitted jobs in a bounded pool of
+worker threads on the local machine.
+
+"""
+
+import concurrent.futures
+import json
+import os
+import pathlib
+import shutil
+import stat
+import subprocess as sp
+import sys
+import threading
+import time
+
+_SUBMIT = """#!{python}
+import json, os, pathlib, sys, time, uuid
+
+if len(sys.argv) != 2 or not pathlib.Path(sys.argv[1]).is_file():
+    sys.exit("usage: submit <existing job script>")
+
+queue = pathlib.Path({queue!r})
+job_id = uuid.uuid4().hex[:12]
+job = {{"id": job_id, "cwd": os.getcwd(), "script": sys.argv[1]}}
+job["submitted"] = time.time()
+tmp = queue / (job_id + ".tmp")
+tmp.write_text(json.dumps(job))
+tmp.rename(queue / (job_id + ".json"))
+print("Submitted job " + job_id)
+"""
+
+
+class LocalScheduler:
+    """Job scheduler running submitted job scripts on the local machine.
+
+    Jobs are submitted with the program ``cmd``, which is called with the name of a
+    job script in the job's working directory. Submitted jobs are queued in the spool
+    directory and executed with ``bash`` (or ``sh`` if ``bash`` is not available) by
+    at most ``workers`` worker threads. Standard output and error of a job are
+    written to ``job-<id>.out`` in its working directory.
+
+    The scheduler is started and stopped when used as a context manager.
+
+    Parameters
+    ----------
+    spool : pathlib.Path, str
+
+        Directory in which the submission program and the queue are created.
+
+    workers : int, optional
+
+        Maximum number of jobs running at the same time. Defaults to ``4``.
+
+    interval : numbers.Real, optional
+
+        Polling interval of the queue in seconds. Defaults to ``0.05``.
+
+    Examples
+    --------
+    1. Scheduling a drive.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> # with mt.scheduler.LocalScheduler("spool", workers=2) as scheduler:
+    >>> #     td.schedule(system, scheduler.cmd, "", dirname="runs", t=1e-9, n=10)
+    >>> #     scheduler.wait()
+    >>> #     scheduler.status()
+
+    """
+
+    def __init__(self, spool, workers=4, interval=0.05):
+        self.spool = pathlib.Path(spool).absolute()
+        self.queue = self.spool / "queue"
+        self.cmd = str(self.spool / "submit")
+        self.workers = workers
+        self.interval = interval
+        self.shell = shutil.which("bash") or "sh"
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._executor = None
+        self._thread = None
+
+    def start(self):
+        """Create the submission program and start processing the queue."""
+        self.queue.mkdir(parents=True, exist_ok=True)
+        submit = pathlib.Path(self.cmd)
+        submit.write_text(
+            _SUBMIT.format(python=sys.executable, queue=str(self.queue)),
+            encoding="utf-8",
+        )
+        submit.chmod(submit.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP)
+
+        self._stop.clear()
+        self._executor = concurrent.futures.ThreadPoolExecutor(self.workers)
+        self._thread = threading.Thread(target=self._poll, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop processing the queue and wait for running jobs to finish."""
+        self._stop.set()
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _poll(self):
+        while not self._stop.is_set():
+            self._collect()
+            self._stop.wait(self.interval)
+
+    def _collect(self):
+        for path in sorted(self.queue.glob("*.json"), key=os.path.getmtime):
+            job = json.loads(path.read_text())
+            job.update(
+                status="queued",
+                returncode=None,
+                error=None,
+                started=None,
+                finished=None,
+            )
+            # The job is registered before it is removed from the queue so that
+            # ``wait`` always sees it.
+            with self._lock:
+                self._jobs[job["id"]] = job
+            path.unlink()
+            self._executor.submit(self._run, job["id"])
+
+    def _run(self, job_id):
+        with self._lock:
+            job = self._jobs[job_id]
+            job.update(status="running", started=time.time())
+        cwd = pathlib.Path(job["cwd"])
+        try:
+            with open(cwd / f"job-{job_id}.out", "wb") as out:
+                result = sp.run(
+                    [self.shell, job["script"]], cwd=cwd, stdout=out, stderr=sp.STDOUT
+                )
+        except Exception as e:  # e.g. the working directory was removed
+            with self._lock:
+                job.update(status="failed", error=repr(e), finished=time.time())
+            return
+        with self._lock:
+            job.update(
+                status="done" if result.returncode == 0 else "failed",
+                returncode=result.returncode,
+                finished=time.time(),
+            )
+
+    def status(self, job_id=None):
+        """Status of submitted jobs.
+
+        Parameters
+        ----------
+        job_id : str, optional
+
+            Identifier of a job as printed by the submission program. If not
+            specified, the status of all jobs is returned.
+
+        Returns
+        -------
+        dict
+
+            Job information with keys ``'id'``, ``'cwd'``, ``'script'``,
+            ``'status'`` (one of ``'queued'``, ``'running'``, ``'done'`` and
+            ``'failed'``), ``'returncode'``, ``'error'`` (the exception raised
+            if the job could not be run), ``'submitted'``, ``'started'`` and
+            ``'finished'``. If ``job_id`` is not specified, a dictionary mapping job
+            identifiers to job information is returned.
+
+        Raises
+        ------
+        KeyError
+
+            If the job is not known to the scheduler.
+
+        """
+        with self._lock:
+            if job_id is not None:
+                return dict(self._jobs[job_id])
+            return {key: dict(job) for key, job in self._jobs.items()}
+
+    def wait(self, timeout=None):
+        """Wait until all submitted jobs are finished.
+
+        Parameters
+        ----------
+        timeout : numbers.Real, optional
+
+            Maximum time to wait in seconds. If not specified, wait without limit.
+
+        Raises
+        ------
+        TimeoutError
+
+            If the jobs are not finished within ``timeout``.
+
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                pending = any(
+                    job["status"] in ("queued", "running")
+                    for job in self._jobs.values()
+                )
+            if not pending and not any(self.queue.glob("*.json")):
+                return
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError("Scheduled jobs did not finish in time.")
+            time.sleep(self.interval)
@@ -0,0 +1,287 @@
+"""Cost-balanced sharding of the test suite.
+
+With ``--mm-shard=i/N``, the pytest plugin runs only the ``i``-th of ``N`` shards of
+the collected tests. Tests are assigned to shards with the greedy
+longest-processing-time rule using their expected cost, so that all shards take
+nearly the same wall time. Expected costs are taken from a durations file
+(``--mm-durations=FILE``) written by earlier runs. Tests without a recorded
+duration are assigned the median of the recorded ones (or ``DEFAULT_COST``)
+times a static weight: ``WEIGHTS`` for the known long calculator tests and
+``BENCHMARK_WEIGHT`` for performance tests. The assignment only depends on the
+test node IDs, their markers, and the durations file, so that all machines
+compute the same partition.
+
+After the run, the measured durations of the tests of a shard are merged into
+its durations file; the durations of tests of other shards and of skipped tests
+are kept unchanged. Performance tests skipped without ``--mm-benchmark`` do not
+contribute to the cost of a shard. The durations files and JUnit XML reports
+(``--junitxml``) of all shards are combined with ``merge_durations`` and
+``merge_junitxml``.
+
+"""
+
+import json
+import pathlib
+import statistics
+import xml.etree.ElementTree as ET
+
+#: Cost of tests if no durations are recorded.
+DEFAULT_COST = 1.0
+
+#: Relative cost of long calculator tests without recorded durations, by test
+#: function name.
+WEIGHTS = {
+    "test_stdprob3": 100,
+    "test_stdprob5": 40,
+    "test_stdprob4": 20,
+    "test_soak": 20,
+    "test_simple_hysteresis_loop": 5,
+    "test_stepped_hysteresis_loop": 5,
+}
+
+#: Relative cost of performance tests without recorded durations.
+BENCHMARK_WEIGHT = 10
+
+
+def load_durations(path):
+    """Recorded durations of tests.
+
+    Parameters
+    ----------
+    path : pathlib.Path, str
+
+        JSON file mapping test node IDs to durations in seconds.
+
+    Returns
+    -------
+    dict
+
+        Durations. If the file does not exist, an empty dictionary is returned.
+
+    Examples
+    --------
+    1. Reading a file which does not exist.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> mt.sharding.load_durations("missing.json")
+    {}
+
+    """
+    path = pathlib.Path(path)
+    if not path.exists():
+        return {}
+    with path.open(encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_durations(durations, path):
+    """Write durations of tests.
+
+    Parameters
+    ----------
+    durations : dict
+
+        Durations in seconds with test node IDs as keys.
+
+    path : pathlib.Path, str
+
+        JSON file.
+
+    Examples
+    --------
+    1. Writing durations.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> # mt.sharding.save_durations({"test_exchange.py::test_scalar": 1.5}, "d.json")
+
+    """
+    with pathlib.Path(path).open("w", encoding="utf-8") as f:
+        json.dump(dict(sorted(durations.items())), f, indent=1)
+
+
+def costs(nodeids, durations, benchmarks=()):
+    """Expected costs of tests.
+
+    Parameters
+    ----------
+    nodeids : list
+
+        Test node IDs.
+
+    durations : dict
+
+        Recorded durations of tests in seconds.
+
+    benchmarks : collections.abc.Container, optional
+
+        Node IDs of performance tests. Defaults to none.
+
+    Returns
+    -------
+    dict
+
+        Expected cost of every test. Tests without a recorded duration are
+        assigned the median of all recorded durations (or ``DEFAULT_COST`` if no
+        durations are recorded) times their weight from ``WEIGHTS`` or
+        ``BENCHMARK_WEIGHT``.
+
+    Examples
+    --------
+    1. Estimating the cost of new tests.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> mt.sharding.costs(["a", "b", "new"], {"a": 1.0, "b": 3.0})
+    {'a': 1.0, 'b': 3.0, 'new': 2.0}
+    >>> mt.sharding.costs(["test_exchange", "test_stdprob3"], {})
+    {'test_exchange': 1.0, 'test_stdprob3': 100.0}
+
+    """
+    estimate = statistics.median(durations.values()) if durations else DEFAULT_COST
+    return {
+        nodeid: durations.get(nodeid, estimate * _weight(nodeid, benchmarks))
+        for nodeid in nodeids
+    }
+
+
+def _weight(nodeid, benchmarks):
+    # Parameters and classes of the node ID are not part of the function name.
+    name = nodeid.rsplit("::", 1)[-1].split("[", 1)[0]
+    if name in WEIGHTS:
+        return WEIGHTS[name]
+    return BENCHMARK_WEIGHT if nodeid in benchmarks else 1
+
+
+def partition(costs, n):
+    """Partition tests into shards with nearly equal total cost.
+
+    Tests are sorted by decreasing cost (and by node ID for equal costs) and each
+    test is assigned to the shard with the lowest total cost so far (the first
+    such shard for equal totals). The result does not depend on the order of
+    ``costs``.
+
+    Parameters
+    ----------
+    costs : dict
+
+        Expected cost of every test.
+
+    n : int
+
+        Number of shards.
+
+    Returns
+    -------
+    list
+
+        Sorted node IDs of the tests in each of the ``n`` shards.
+
+    Examples
+    --------
+    1. Partitioning four tests into two shards.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> costs = {"stdprob3": 6, "stdprob5": 5, "zeeman": 4, "exchange": 2}
+    >>> mt.sharding.partition(costs, 2)
+    [['exchange', 'stdprob3'], ['stdprob5', 'zeeman']]
+
+    """
+    shards = [[] for _ in range(n)]
+    totals = [0.0] * n
+    for nodeid in sorted(costs, key=lambda nodeid: (-costs[nodeid], nodeid)):
+        index = totals.index(min(totals))
+        shards[index].append(nodeid)
+        totals[index] += costs[nodeid]
+    return [sorted(shard) for shard in shards]
+
+
+def merge_durations(paths, output, base=None):
+    """Merge the durations files of shards.
+
+    Durations in later files take precedence over earlier ones. If ``base`` is
+    passed, durations equal to those in ``base`` are not measured by the shard and
+    do not override durations measured by other shards.
+
+    Parameters
+    ----------
+    paths : list
+
+        Durations files of the shards.
+
+    output : pathlib.Path, str
+
+        Merged durations file.
+
+    base : pathlib.Path, str, optional
+
+        Durations file all shards started from.
+
+    Examples
+    --------
+    1. Merging the durations of two shards.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> # mt.sharding.merge_durations(
+    >>> #     ["shard-1.json", "shard-2.json"], "all.json", base="durations.json"
+    >>> # )
+
+    """
+    previous = {} if base is None else load_durations(base)
+    durations = dict(previous)
+    for path in paths:
+        durations.update(
+            (nodeid, duration)
+            for nodeid, duration in load_durations(path).items()
+            if previous.get(nodeid) != duration
+        )
+    save_durations(durations, output)
+
+
+def merge_junitxml(paths, output):
+    """Merge the JUnit XML reports of shards into a single test suite.
+
+    The numbers of tests, errors, failures, and skipped tests and the times of
+    all test suites are summed.
+
+    Parameters
+    ----------
+    paths : list
+
+        JUnit XML reports of the shards, written with ``--junitxml``.
+
+    output : pathlib.Path, str
+
+        Merged report.
+
+    Examples
+    --------
+    1. Merging the reports of two shards.
+
+    >>> import micromagnetictests as mt
+    ...
+    >>> # mt.sharding.merge_junitxml(["shard-1.xml", "shard-2.xml"], "all.xml")
+
+    """
+    counts = ("tests", "errors", "failures", "skipped")
+    merged = ET.Element("testsuite", name="pytest")
+    totals = dict.fromkeys(counts, 0)
+    time = 0.0
+    for path in paths:
+        root = ET.parse(path).getroot()
+        suites = [root] if root.tag == "testsuite" else root.iter("testsuite")
+        for suite in suites:
+            for count in counts:
+                totals[count] += int(suite.get(count, 0))
+            time += float(suite.get("time", 0))
+            merged.extend(suite.iter("testcase"))
+
+    for count in counts:
+        merged.set(count, str(totals[count]))
+    merged.set("time", f"{time:.3f}")
+    root = ET.Element("testsuites")
+    root.append(merged)
+    ET.ElementTree(root).write(output, encoding="utf-8", xml_declaration=True)
@@ -0,0 +1,88 @@
+import discretisedfield as df
+import numpy as np
+import pytest
+
+import micromagnetictests as mt
+
+
+@pytest.fixture
+def mesh():
+    p1 = (0, 0, 0)
+    p2 = (10e-9, 4e-9, 2e-9)
+    cell = (1e-9, 1e-9, 1e-9)
+    subregions = {
+        "r1": df.Region(p1=(0, 0, 0), p2=(5e-9, 4e-9, 2e-9)),
+        "r2": df.Region(p1=(5e-9, 0, 0), p2=(10e-9, 4e-9, 2e-9)),
+    }
+    return df.Mesh(p1=p1, p2=p2, cell=cell, subregions=subregions)
+
+
+def test_errors(mesh):
+    field = df.Field(mesh, nvdim=3, value=(0, 0, 1e6))
+    reference = df.Field(mesh, nvdim=3, value=(0, 0, 1e6))
+    reference.array[9, 3, 1] = (0, 0, 1e6 - 80)
+
+    assert mt.assertions.max_error(field, reference) == 80
+    assert np.isclose(mt.assertions.l2_error(field, reference), 80 / np.sqrt(80))
+    assert mt.assertions.max_error(field, reference.array) == 80
+    assert mt.assertions.max_error(field, (0, 0, 1e6)) == 0
+
+    mask = np.ones(mesh.n, dtype=bool)
+    mask[9, 3, 1] = False
+    assert mt.assertions.max_error(field, reference, mask=mask) == 0
+    assert mt.assertions.l2_error(field, reference, mask=mask) == 0
+    assert mt.assertions.max_error(field, reference, mask=np.zeros(mesh.n)) == 0
+
+    assert mt.assertions.subregion_errors(field, reference) == {"r1": 0, "r2": 80}
+    errors = mt.assertions.subregion_errors(field, reference, norm="l2")
+    assert errors["r1"] == 0
+    assert np.isclose(errors["r2"], 80 / np.sqrt(40))
+    with pytest.raises(ValueError):
+        mt.assertions.subregion_errors(field, reference, norm="mean")
+
+
+def test_angle_error(mesh):
+    field = df.Field(mesh, nvdim=3, value=(0, 0, 1e6))
+    field.array[0, 0, 0] = 0
+    field.array[1, 0, 0] = (0, 1e6, 0)
+
+    angles = mt.assertions.angle_error(field, (0, 0, 1))
+    assert angles.size == 79  # cell with zero norm is skipped
+    assert np.isclose(angles.max(), np.pi / 2)
+
+    mask = mt.assertions.nonzero(field)
+    assert np.count_nonzero(~mask) == 1
+    mask[1, 0, 0] = False
+    assert np.allclose(mt.assertions.angle_error(field, (0, 0, 1), mask=mask), 0)
+
+    field.array[1, 0, 0] = (0, 0, -1)
+    assert np.isclose(mt.assertions.angle_error(field, (0, 0, 1)).max(), np.pi)
+
+
+def test_assert_fields_close(mesh):
+    field = df.Field(mesh, nvdim=3, value=(0, 0, 1e6))
+    mt.assertions.assert_fields_close(field, (0, 0, 1e6))
+    mt.assertions.assert_fields_close(field, (0, 0, 1e6 + 5), rtol=1e-5)
+    mt.assertions.assert_fields_close(field, (0, 0, 1e6 + 5), atol=10, rtol=0)
+
+    field.array[3, 2, 1] = (0, 1e6, 0)
+    with pytest.raises(AssertionError, match=r"1 of 80 cells.*cell \(3, 2, 1\)"):
+        mt.assertions.assert_fields_close(field, (0, 0, 1e6))
+
+    mask = np.ones(mesh.n, dtype=bool)
+    mask[3, 2, 1] = False
+    mt.assertions.assert_fields_close(field, (0, 0, 1e6), mask=mask)
+    mt.assertions.assert_fields_close(field, (0, 0, 0), mask=np.zeros(mesh.n))
+
+
+def test_assert_orientations_close(mesh):
+    field = df.Field(mesh, nvdim=3, value=(0, 0, 1e6))
+    field.array[0, 0, 0] = 0
+    mt.assertions.assert_orientations_close(field, (0, 0, 1), max_angle=1e-6)
+
+    field.array[1, 0, 0] = (1e6, 0, 1e6)
+    with pytest.raises(AssertionError, match="1 of 79 cells"):
+        mt.assertions.assert_orientations_close(field, (0, 0, 1), max_angle=0.1)
+    mt.assertions.assert_orientations_close(
+        field, (0, 0, 1), max_angle=np.pi / 4 + 1e-6
+    )
@@ -0,0 +1,165 @@
+import os
+import pathlib
+import subprocess
+import time
+
+import micromagneticmodel as mm
+import numpy as np
+import pytest
+
+import micromagnetictests as mt
+
+
+def test_fit_power_law():
+    x = np.array([1e3, 1e4, 1e5, 1e6])
+    exponent, prefactor = mt.benchmark.fit_power_law(x, 2e-6 * x**1.5)
+    assert np.isclose(exponent, 1.5)
+    assert np.isclose(prefactor, 2e-6)
+
+    exponent, _ = mt.benchmark.fit_power_law([10, 100], [4, 4])
+    assert np.isclose(exponent, 0)
+
+    with pytest.raises(ValueError):
+        mt.benchmark.fit_power_law([1], [1])
+    with pytest.raises(ValueError):
+        mt.benchmark.fit_power_law([1, 2], [1, 2, 3])
+    with pytest.raises(ValueError):
+        mt.benchmark.fit_power_law([0, 1], [1, 2])
+
+
+def test_table_monitor(tmp_path):
+    system = mm.System(name="monitored")
+    old = tmp_path / "monitored" / "drive-0" / "monitored.odt"
+    old.parent.mkdir(parents=True)
+    old.write_text("# header\n1 2\n")
+
+    table = tmp_path / "monitored" / "drive-1" / "monitored.odt"
+    with mt.benchmark.TableMonitor(system, dirname=tmp_path) as monitor:
+        table.parent.mkdir()
+        with table.open("w") as f:
+            f.write("# Table Start\n# Columns: t mx\n1e-12 0.5\n")
+            f.flush()
+            time.sleep(0.1)
+            f.write("2e-12 0.6\n3e-12")
+            f.flush()
+            time.sleep(0.1)
+            f.write(" 0.7\n# Table End\n")
+
+    assert len(monitor.times) == 3
+    assert monitor.times[1] - monitor.times[0] > 0.05
+    assert monitor.times == sorted(monitor.times)
+
+
+class SleepDriver(mm.ExternalDriver):
+    """Driver that only spends time in the phases of ``drive``."""
+
+    _allowed_attributes = []
+    _x = "t"
+
+    def drive_kwargs_setup(self, drive_kwargs):
+        pass
+
+    def schedule_kwargs_setup(self, schedule_kwargs):
+        pass
+
+    def _check_system(self, system):
+        pass
+
+    def _write_input_files(self, system, **kwargs):
+        time.sleep(0.01)
+        pathlib.Path("input.txt").write_text("x" * 10_000)
+
+    def _call(self, system, runner, **kwargs):
+        time.sleep(0.05)
+
+    def _schedule_commands(self, system, runner):
+        return []
+
+    def _read_data(self, system):
+        pass
+
+
+def test_phase_timer(tmp_path):
+    system = mm.System(name="timed")
+    driver = SleepDriver()
+    with mt.benchmark.PhaseTimer(driver) as timer:
+        driver.drive(system, dirname=tmp_path)
+        driver.drive(system, dirname=tmp_path)
+
+    assert set(timer.times) == {"write_input_files", "call", "read_data"}
+    assert 0.02 <= timer.times["write_input_files"] < 0.1
+    assert 0.1 <= timer.times["call"] < 0.5
+    assert timer.times["read_data"] < 0.01
+    assert "_call" not in vars(driver)  # original methods are restored
+
+    with mt.benchmark.PhaseTimer(SleepDriver) as timer:
+        SleepDriver().drive(system, dirname=tmp_path)
+        driver.drive(system, dirname=tmp_path)
+
+    assert 0.1 <= timer.times["call"] < 0.5
+    assert SleepDriver._call is vars(SleepDriver)["_call"]
+    driver.drive(system, dirname=tmp_path)
+    assert 0.1 <= timer.times["call"] < 0.5  # not timed after the context
+
+
+def test_phase_timer_staticmethod(tmp_path):
+    class StaticDriver(SleepDriver):
+        @staticmethod
+        def _read_data(system):
+            time.sleep(0.02)
+
+    system = mm.System(name="timed")
+    driver = StaticDriver()
+    for timed in [StaticDriver, driver]:
+        with mt.benchmark.PhaseTimer(timed) as timer:
+            driver.drive(system, dirname=tmp_path)
+        assert 0.02 <= timer.times["read_data"] < 0.1
+        assert isinstance(vars(StaticDriver)["_read_data"], staticmethod)
+
+
+def test_dry_run(tmp_path):
+    system = mm.System(name="dry")
+    driver = SleepDriver()
+    result = mt.benchmark.dry_run(driver, system, tmp_path / "dry", t=1e-9)
+
+    assert 0.01 <= result["time_s"] < 0.1
+    assert result["peak_memory_B"] >= 10_000
+    assert result["input_size_B"] == 10_000
+    assert (tmp_path / "dry" / "input.txt").exists()
+
+    result = mt.benchmark.dry_run(
+        driver, system, tmp_path / "untraced", trace_memory=False, t=1e-9
+    )
+    assert 0.01 <= result["time_s"] < 0.1
+    assert result["peak_memory_B"] is None
+    assert result["input_size_B"] == 10_000
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="requires /proc")
+def test_processes_and_files(tmp_path):
+    fds = mt.benchmark.open_file_descriptors()
+    with open(tmp_path / "file", "w"):
+        assert mt.benchmark.open_file_descriptors() == fds + 1
+    assert mt.benchmark.open_file_descriptors() == fds
+
+    assert mt.benchmark.child_processes() == []
+    # the shell starts sleep as a grandchild
+    process = subprocess.Popen(["sh", "-c", "sleep 5; true"])
+    try:
+        time.sleep(0.2)
+        descendants = mt.benchmark.child_processes()
+        assert process.pid in descendants
+        assert len(descendants) == 2
+        assert mt.benchmark.child_processes(process.pid) == descendants[1:]
+    finally:
+        process.kill()
+        process.wait()
+    assert mt.benchmark.child_processes() == []
+
+
+def test_growth():
+    assert mt.benchmark.growth([]) == 0
+    assert mt.benchmark.growth([5]) == 0
+    assert np.isclose(mt.benchmark.growth(np.arange(100)), 99)
+    rng = np.random.default_rng(0)
+    assert abs(mt.benchmark.growth(rng.normal(100, 1, 1000))) < 1
@@ -0,0 +1,65 @@
+import discretisedfield as df
+import numpy as np
+import pytest
+
+import micromagnetictests as mt
+from micromagnetictests.plugin import refined_meshes
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    mt.cache.clear()
+    yield
+    mt.cache.clear()
+
+
+def test_mesh():
+    p1 = (0, 0, 0)
+    p2 = (10e-9, 4e-9, 2e-9)
+    subregions = {"r1": df.Region(p1=(0, 0, 0), p2=(5e-9, 4e-9, 2e-9))}
+
+    mesh = mt.cache.mesh(p1=p1, p2=p2, cell=(1e-9, 1e-9, 1e-9))
+    assert mesh == df.Mesh(p1=p1, p2=p2, cell=(1e-9, 1e-9, 1e-9))
+    assert mt.cache.mesh(p1=p1, p2=p2, cell=(1e-9, 1e-9, 1e-9)) is mesh
+    assert mt.cache.mesh(p1=p1, p2=p2, cell=(2e-9, 2e-9, 2e-9)) is not mesh
+    region = df.Region(p1=p1, p2=p2)
+    assert mt.cache.mesh(region=region, cell=(1e-9, 1e-9, 1e-9)) is mesh
+
+    with_subregions = mt.cache.mesh(p1=p1, p2=p2, n=(10, 4, 2), subregions=subregions)
+    assert with_subregions is not mesh
+    assert with_subregions.subregions == subregions
+    periodic = mt.cache.mesh(p1=p1, p2=p2, n=(10, 4, 2), bc="x")
+    assert periodic is not mesh
+    assert periodic.bc == "x"
+
+    # Meshes refined with --mm-scale are cached separately.
+    with refined_meshes(2):
+        refined = mt.cache.mesh(p1=p1, p2=p2, cell=(1e-9, 1e-9, 1e-9))
+        assert refined is not mesh
+        assert np.array_equal(refined.n, 2 * mesh.n)
+        assert mt.cache.mesh(p1=p1, p2=p2, cell=(1e-9, 1e-9, 1e-9)) is refined
+    assert mt.cache.mesh(p1=p1, p2=p2, cell=(1e-9, 1e-9, 1e-9)) is mesh
+
+
+def test_field():
+    mesh = mt.cache.mesh(p1=(0, 0, 0), p2=(4e-9, 2e-9, 2e-9), n=(4, 2, 2))
+    expected = df.Field(mesh, nvdim=3, value=(0, 0.1, 1), norm=1e6)
+
+    m1 = mt.cache.field(mesh, nvdim=3, value=(0, 0.1, 1), norm=1e6)
+    m2 = mt.cache.field(mesh, nvdim=3, value=(0, 0.1, 1), norm=1e6)
+    assert m1 is not m2
+    assert m1.mesh is mesh
+    assert np.array_equal(m1.array, expected.array)
+
+    # Fields are independent of each other and of the cache.
+    m1.array[0, 0, 0] = (1e6, 0, 0)
+    assert np.array_equal(m2.array, expected.array)
+    m3 = mt.cache.field(mesh, nvdim=3, value=(0, 0.1, 1), norm=1e6)
+    assert np.array_equal(m3.array, expected.array)
+
+    assert mt.cache.field(mesh, nvdim=1, value=2.0).mean() == 2.0
+
+    with pytest.raises(TypeError):
+        mt.cache.field(mesh, nvdim=3, value=lambda point: (0, 0, 1))
+    with pytest.raises(TypeError):
+        mt.cache.field(mesh, nvdim=3, value={"default": (0, 0, 1)})
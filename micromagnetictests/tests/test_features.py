@@ -0,0 +1,97 @@
+import json
+
+import discretisedfield as df
+import micromagneticmodel as mm
+
+import micromagnetictests as mt
+from micromagnetictests.tests.test_resultcache import RotateDriver
+
+
+def test_kinds():
+    mesh = df.Mesh(p1=(0, 0, 0), p2=(2e-9, 2e-9, 1e-9), n=(2, 2, 1))
+    field = df.Field(mesh, nvdim=1, value=1e-12)
+
+    assert mt.features.kinds(mm.Exchange(A=1e-12)) == {"constant"}
+    assert mt.features.kinds(mm.Exchange(A=field)) == {"field"}
+    assert mt.features.kinds(mm.UniaxialAnisotropy(K={"r1": 1e5}, u=field)) == {
+        "dict",
+        "field",
+    }
+    assert mt.features.kinds(mm.Zeeman(H=(0, 0, 1), func=abs, dt=1e-12)) == {
+        "constant",
+        "func",
+    }
+    for wave in ["sin", "sinc"]:
+        assert mt.features.kinds(mm.Zeeman(H=(0, 0, 1), func=wave, f=1e9, t0=0)) == {
+            "constant",
+            "wave",
+        }
+        assert mt.features.kinds(mm.Zeeman(H=(0, 0, 1), wave=wave, f=1e9, t0=0)) == {
+            "constant",
+            "wave",
+        }
+    tcl_strings = {"script": "", "script_args": "total_time", "script_name": "f"}
+    assert "tcl_strings" in mt.features.kinds(
+        mm.Slonczewski(J=1, mp=(0, 0, 1), P=0.4, Lambda=2, tcl_strings=tcl_strings)
+    )
+    assert mt.features.kinds(mm.RKKY(sigma=1e-4, subregions=["a", "b"])) == {"constant"}
+    assert mt.features.kinds(mm.Demag()) == {"default"}
+
+
+def test_feature_matrix(tmp_path):
+    mesh = df.Mesh(p1=(0, 0, 0), p2=(2e-9, 2e-9, 1e-9), n=(2, 2, 1))
+    system = mm.System(name="features")
+    system.energy = mm.Exchange(A=1e-12) + mm.Zeeman(H={"r1": (0, 0, 1)})
+    system.dynamics = mm.Damping(alpha=0.1)
+    system.m = df.Field(mesh, nvdim=3, value=(1, 0, 0), norm=1e6)
+    original = mm.ExternalDriver.drive
+
+    with mt.features.FeatureMatrix() as matrix:
+        matrix.nodeid = "test_a"
+        RotateDriver().drive(system, dirname=tmp_path, verbose=0)
+        matrix.nodeid = "test_b"
+        system.energy.exchange.A = mesh.coordinate_field().x * 0 + 1e-12
+        RotateDriver().drive(system, dirname=tmp_path, verbose=0)
+    assert mm.ExternalDriver.drive is original
+    matrix.durations = {"test_a": 1.0, "test_b": 2.5}
+
+    # RotateDriver is a time driver.
+    assert matrix.tests == {
+        ("Exchange", "constant", "RotateDriver"): {"test_a"},
+        ("Exchange", "field", "RotateDriver"): {"test_b"},
+        ("Zeeman", "dict", "RotateDriver"): {"test_a", "test_b"},
+        ("Damping", "constant", "RotateDriver"): {"test_a", "test_b"},
+    }
+    # Every term was driven with every kind of parameters it was seen with.
+    assert matrix.gaps() == []
+
+    report = matrix.report().splitlines()
+    line = next(line for line in report if line.startswith("Zeeman"))
+    assert line.split()[-2:] == ["2", "3.50"]
+    assert "not exercised:" in report
+
+    matrix.save(tmp_path / "matrix.json")
+    saved = json.loads((tmp_path / "matrix.json").read_text())
+    assert len(saved["matrix"]) == 4
+    assert saved["durations"] == matrix.durations
+
+    with matrix:
+        matrix.nodeid = "test_c"
+        MinDriver().drive(system, dirname=tmp_path, verbose=0)
+    # Damping is not a gap of MinDriver and Exchange is not a gap with the kinds
+    # of Zeeman.
+    assert matrix.gaps() == [("Exchange", "constant", "MinDriver")]
+
+    # Computations are recorded with the driver ``compute``.
+    def compute(func, system, /, dirname="."):
+        return 0.0
+
+    with matrix:
+        matrix.nodeid = "test_d"
+        mt.hooks.hooked_compute(compute)(system.energy.zeeman.energy, system)
+    assert matrix.tests[("Zeeman", "dict", "compute")] == {"test_d"}
+    assert ("Exchange", "field", "compute") in matrix.gaps()
+
+
+class MinDriver(RotateDriver):
+    _x = "iteration"
@@ -3,4 +3,9 @@ import micromagnetictests as mt
 
 def test_get_tests():
     tests = list(mt.get_tests())
-    assert len(tests) == 34
+    assert len(tests) == 43
+    assert "TestSession" not in dict(tests)
+
+    specs = dict(mt.get_tests(specs=True))
+    assert len(specs) == 44
+    assert "TestSession" in specs
@@ -0,0 +1,83 @@
+import discretisedfield as df
+import micromagneticmodel as mm
+import pytest
+
+import micromagnetictests as mt
+from micromagnetictests.tests.test_resultcache import RotateDriver
+
+
+class Recorder(mt.hooks.DriveHook):
+    def __init__(self, name, calls):
+        self.name = name
+        self.calls = calls
+
+    def _drive(self, call, driver, system, **kwargs):
+        self.calls.append((self.name, kwargs))
+        return call()
+
+
+@pytest.fixture
+def system():
+    mesh = df.Mesh(p1=(0, 0, 0), p2=(2e-9, 2e-9, 1e-9), n=(2, 2, 1))
+    system = mm.System(name="hooks")
+    system.energy = mm.Exchange(A=1e-12)
+    system.m = df.Field(mesh, nvdim=3, value=(1, 0, 0), norm=1e6)
+    return system
+
+
+def test_drive_hook(system, tmp_path):
+    original = mm.ExternalDriver.drive
+    calls = []
+    driver = RotateDriver()
+
+    with Recorder("outer", calls), Recorder("inner", calls):
+        assert mm.ExternalDriver.drive is not original
+        # Arguments passed by position are forwarded unchanged.
+        driver.drive(system, tmp_path, True, None, "bin8", 0, n=2)
+    assert mm.ExternalDriver.drive is original
+
+    assert [name for name, _ in calls] == ["outer", "inner"]
+    kwargs = calls[0][1]
+    assert kwargs == calls[1][1]
+    assert kwargs["dirname"] == tmp_path
+    assert kwargs["verbose"] == 0
+    assert kwargs["n"] == 2
+    assert (tmp_path / "hooks" / "drive-0" / "m.npy").exists()
+
+    # Hooks see the defaults of arguments which are not passed.
+    calls.clear()
+    with Recorder("hook", calls):
+        driver.drive(system, dirname=tmp_path, verbose=0)
+    assert calls[0][1]["append"] is True
+    assert calls[0][1]["ovf_format"] == "bin8"
+
+
+def test_hooked_compute(system, tmp_path):
+    calls = []
+
+    class ComputeRecorder(mt.hooks.DriveHook):
+        def _compute(self, call, compute, func, system, **kwargs):
+            calls.append((compute, func, kwargs))
+            return call()
+
+    compute = mt.hooks.hooked_compute(mt.numpyc.compute)
+    energy = compute(system.energy.energy, system, tmp_path, verbose=0)
+    assert calls == []
+
+    with ComputeRecorder():
+        assert compute(system.energy.energy, system, tmp_path, verbose=0) == energy
+    assert calls == [
+        (
+            mt.numpyc.compute,
+            system.energy.energy,
+            {
+                "dirname": tmp_path,
+                "append": True,
+                "n_threads": None,
+                "runner": None,
+                "ovf_format": "bin8",
+                "verbose": 0,
+            },
+        )
+    ]
+    assert system.compute_number == 2
@@ -0,0 +1,218 @@
+import contextlib
+import json
+import subprocess
+import sys
+import time
+
+import discretisedfield as df
+import micromagneticmodel as mm
+import numpy as np
+import pytest
+
+import micromagnetictests as mt
+
+# Writes an OOMMF table with one row every 0.05 s; my grows linearly.
+SOLVER = """
+import sys, time
+with open(sys.argv[1], "w") as f:
+    f.write("# ODT 1.0\\n# Table Start\\n# Title: mmArchive Data Table\\n")
+    f.write("# Columns: Oxs_TimeDriver::{Simulation time} Oxs_TimeDriver::my\\n")
+    f.write("# Units: s {}\\n")
+    for i in range(100):
+        f.write(f"{i * 1e-11} {0.1 * i}\\n")
+        f.flush()
+        time.sleep(0.05)
+"""
+
+
+class TableDriver(mm.ExternalDriver):
+    """Driver running a solver which writes a table."""
+
+    _allowed_attributes = []
+    _x = "t"
+
+    def drive_kwargs_setup(self, drive_kwargs):
+        pass
+
+    def schedule_kwargs_setup(self, schedule_kwargs):
+        pass
+
+    def _check_system(self, system):
+        pass
+
+    def _write_input_files(self, system, **kwargs):
+        pass
+
+    def _call(self, system, runner, **kwargs):
+        process = subprocess.run(
+            [sys.executable, "-c", SOLVER, f"{system.name}.odt"], check=False
+        )
+        if process.returncode != 0:
+            raise RuntimeError(f"Solver failed with {process.returncode=}.")
+
+    def _schedule_commands(self, system, runner):
+        return []
+
+    def _read_data(self, system):
+        pass
+
+
+@contextlib.contextmanager
+def unrelated_process():
+    """Child process of the tests which is not started by a drive."""
+    process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        yield process
+    finally:
+        process.kill()
+        process.wait()
+
+
+def test_envelope():
+    envelope = mt.monitor.Envelope("my", lower=-0.5, upper=0.8, start=1e-10)
+    assert envelope.violation({"t": 2e-10, "my": 0.5}) is None
+    assert envelope.violation({"t": 0, "my": 0.9}) is None
+    assert envelope.violation({"t": 2e-10}) is None
+    assert envelope.violation({"my": 0.9}) is None
+    assert "my=0.9" in envelope.violation({"t": 2e-10, "my": 0.9})
+    assert "my=-0.5" in envelope.violation({"t": 2e-10, "my": -0.5})
+    assert "my=nan" in envelope.violation({"t": 2e-10, "my": np.nan})
+
+
+def test_envelope_monitor(tmp_path):
+    system = mm.System(name="monitored")
+    driver = TableDriver()
+
+    envelopes = [mt.monitor.Envelope("my", lower=-1, upper=0.8)]
+    start = time.perf_counter()
+    monitor = mt.monitor.EnvelopeMonitor(system, envelopes, dirname=tmp_path)
+    match = r"my=0\.8 at t=8e-11"
+    with unrelated_process() as process:
+        with pytest.raises(AssertionError, match=match) as excinfo, monitor:
+            driver.drive(system, dirname=tmp_path, verbose=0)
+        # Only the solver is stopped.
+        assert process.poll() is None
+    # The full run would take 5 s.
+    assert time.perf_counter() - start < 2.5
+    assert isinstance(excinfo.value.__cause__, RuntimeError)
+    assert mt.benchmark.child_processes() == []
+
+    # The table of the stopped drive is kept.
+    table = tmp_path / "monitored" / "drive-0" / "monitored.odt"
+    assert len(table.read_text().splitlines()) < 50
+
+
+def test_envelope_monitor_table_txt(tmp_path):
+    system = mm.System(name="monitored")
+    table = tmp_path / "monitored" / "drive-0" / "table.txt"
+    envelopes = [mt.monitor.Envelope("mx", lower=-0.35, upper=0)]
+
+    with mt.monitor.EnvelopeMonitor(system, envelopes, dirname=tmp_path) as monitor:
+        table.parent.mkdir(parents=True)
+        table.write_text("# t (s)\tmx ()\tmy ()\tmz ()\n0\t-0.1\t0\t0.99\n")
+    assert monitor.violation is None
+    assert len(monitor.times) == 1
+
+    table = tmp_path / "monitored" / "drive-1" / "table.txt"
+    monitor = mt.monitor.EnvelopeMonitor(system, envelopes, dirname=tmp_path)
+    with pytest.raises(AssertionError, match="mx=0.1"), monitor:
+        table.parent.mkdir(parents=True)
+        table.write_text("# t (s)\tmx ()\tmy ()\tmz ()\n0\t-0.1\t0\t0.99\n")
+        with table.open("a") as f:
+            f.write("1e-12\t0.1\t0\t0.99\n")
+
+
+class SleepDriver(TableDriver):
+    """Driver running a solver which sleeps for ``t`` seconds."""
+
+    def _call(self, system, runner, **kwargs):
+        sleep = f"import time; time.sleep({kwargs['t']})"
+        subprocess.run([sys.executable, "-c", sleep], check=True)
+
+
+def test_budget(tmp_path):
+    system = mm.System(name="budget")
+    mesh = df.Mesh(p1=(0, 0, 0), p2=(10e-9, 10e-9, 1e-9), n=(10, 10, 1))
+    system.m = df.Field(mesh, nvdim=3, value=(0, 0, 1))
+    driver = SleepDriver()
+    original = mm.ExternalDriver.drive
+
+    budget = mt.monitor.Budget(rate=1e-3, offset=0.2)
+    assert budget.seconds(100) == pytest.approx(0.3)
+    assert budget.seconds(100, t=1e-9, n=10) == pytest.approx(1.2)
+    assert budget.seconds(100, Hsteps=[(0, 1, 5), (1, 0, 5)]) == pytest.approx(1.2)
+
+    with budget:
+        driver.drive(system, dirname=tmp_path, t=0, n=1, verbose=0)
+        assert system.drive_number == 1
+
+        start = time.perf_counter()
+        with unrelated_process() as process:
+            with pytest.raises(TimeoutError, match="budget of 0.3 s") as excinfo:
+                driver.drive(system, dirname=tmp_path, t=30, n=1, verbose=0)
+            # Only the solver is stopped.
+            assert process.poll() is None
+        assert time.perf_counter() - start < 5
+        assert isinstance(excinfo.value.__cause__, subprocess.CalledProcessError)
+        assert mt.benchmark.child_processes() == []
+
+        # The partial drive is kept and later drives are not affected.
+        drive = tmp_path / "budget" / "drive-1"
+        info = json.loads((drive / "budget.json").read_text())
+        assert info["budget_s"] == pytest.approx(0.3)
+        assert info["elapsed_s"] > 0.3
+        assert "CalledProcessError" in info["error"]
+        assert json.loads((drive / "info.json").read_text())["success"] is False
+
+        driver.drive(system, dirname=tmp_path, t=0, n=1, verbose=0)
+        assert (tmp_path / "budget" / "drive-2" / "info.json").exists()
+
+    assert mm.ExternalDriver.drive is original
+
+
+def sleep_compute(func, system, /, dirname=".", t=0):
+    mm.ExternalDriver._setup_working_directory(
+        system=system, dirname=dirname, mode="compute"
+    )
+    subprocess.run([sys.executable, "-c", f"import time; time.sleep({t})"], check=True)
+    system.compute_number += 1
+    return 0.0
+
+
+def test_budget_compute(tmp_path):
+    system = mm.System(name="budget")
+    mesh = df.Mesh(p1=(0, 0, 0), p2=(10e-9, 10e-9, 1e-9), n=(10, 10, 1))
+    system.m = df.Field(mesh, nvdim=3, value=(0, 0, 1))
+    compute = mt.hooks.hooked_compute(sleep_compute)
+
+    with mt.monitor.Budget(rate=0, offset=0.3):
+        assert compute(system.energy.energy, system, tmp_path) == 0.0
+
+        start = time.perf_counter()
+        with pytest.raises(TimeoutError, match="Compute exceeded its budget"):
+            compute(system.energy.energy, system, tmp_path, t=30)
+        assert time.perf_counter() - start < 5
+
+    info = json.loads((tmp_path / "budget" / "compute-1" / "budget.json").read_text())
+    assert "CalledProcessError" in info["error"]
+
+
+class InProcessDriver(TableDriver):
+    """Driver which runs the solver inside the Python process."""
+
+    def _call(self, system, runner, **kwargs):
+        time.sleep(kwargs["t"])
+
+
+def test_budget_in_process(tmp_path):
+    system = mm.System(name="budget")
+    mesh = df.Mesh(p1=(0, 0, 0), p2=(10e-9, 10e-9, 1e-9), n=(10, 10, 1))
+    system.m = df.Field(mesh, nvdim=3, value=(0, 0, 1))
+
+    # The drive cannot be stopped, but exceeding the budget is still reported.
+    budget = mt.monitor.Budget(rate=0, offset=0.1)
+    with budget, pytest.raises(TimeoutError, match="budget of 0.1 s"):
+        InProcessDriver().drive(system, dirname=tmp_path, t=0.3, n=1, verbose=0)
+
+    info = json.loads((tmp_path / "budget" / "drive-0" / "budget.json").read_text())
+    assert info["elapsed_s"] > 0.3
@@ -0,0 +1,190 @@
+import discretisedfield as df
+import micromagneticdata as mdata
+import micromagneticmodel as mm
+import numpy as np
+import pytest
+
+import micromagnetictests as mt
+
+pytest_plugins = ["pytester"]
+
+
+@pytest.fixture
+def macrospin(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return mm.examples.macrospin()
+
+
+def test_demag_cube():
+    mesh = df.Mesh(p1=(0, 0, 0), p2=(4e-9, 4e-9, 4e-9), n=(4, 4, 4))
+    system = mm.System(name="demag_cube")
+    system.energy = mm.Demag()
+    system.m = df.Field(mesh, nvdim=3, value=(0, 0, 1), norm=1e6)
+
+    model = mt.numpyc.model.Model(system)
+    H = model.field(model.m0)
+
+    # The average demagnetisation factor of a cube is 1/3.
+    assert np.allclose(H.mean(axis=(0, 1, 2)), (0, 0, -1e6 / 3), atol=1, rtol=0)
+    energy = mm.consts.mu0 / 6 * 1e12 * 64e-27
+    assert np.isclose(model.energy(model.m0), energy, rtol=1e-6)
+
+
+def test_demag_pbc():
+    mesh = df.Mesh(p1=(0, 0, 0), p2=(4e-9, 4e-9, 1e-9), n=(4, 4, 1), bc="xy")
+    system = mm.System(name="demag_pbc")
+    system.energy = mm.Demag()
+    system.m = df.Field(mesh, nvdim=3, value=(0, 0, 1), norm=1e6)
+
+    # A thin film periodic in the plane approaches the demagnetisation factor 1.
+    model = mt.numpyc.model.Model(system)
+    H = model.field(model.m0)
+    assert np.allclose(H, (0, 0, -1e6), atol=2e4, rtol=0)
+
+
+@pytest.mark.parametrize("bc", ["", "x"])
+def test_exchange_spiral(bc):
+    n, h, A = 20, 1e-9, 1e-11
+    k = 2 * np.pi / (n * h)
+    mesh = df.Mesh(p1=(0, 0, 0), p2=(n * h, h, h), cell=(h, h, h), bc=bc)
+    x = mesh.cells.x[:, np.newaxis, np.newaxis]
+    value = np.zeros((*mesh.n, 3))
+    value[..., 0] = np.sin(k * x)
+    value[..., 2] = np.cos(k * x)
+
+    system = mm.System(name="exchange_spiral")
+    system.energy = mm.Exchange(A=A)
+    system.m = df.Field(mesh, nvdim=3, value=value, norm=8e5)
+
+    model = mt.numpyc.model.Model(system)
+    pairs = n if bc else n - 1
+    energy = pairs * A * h**3 * (2 - 2 * np.cos(k * h)) / h**2
+    assert np.isclose(model.energy(model.m0), energy, rtol=1e-12)
+
+    # The effective field is the negative derivative of the energy.
+    H = model.field(model.m0)
+    assert np.isclose(
+        -0.5 * mm.consts.mu0 * 8e5 * h**3 * np.sum(model.m0 * H),
+        energy,
+        rtol=1e-12,
+    )
+
+
+def test_compute(macrospin):
+    system = macrospin
+    system.energy += mm.UniaxialAnisotropy(K=1e5, u=(0, 0, 1))
+    calculator = mt.numpyc
+
+    energy = calculator.compute(system.energy.energy, system, verbose=0)
+    model = mt.numpyc.model.Model(system)
+    assert np.isclose(energy, model.energy(model.m0), rtol=1e-12)
+
+    density = calculator.compute(system.energy.density, system, verbose=0)
+    assert np.isclose(density.mean().item() * 1e-27, energy, rtol=1e-12)
+
+    field = calculator.compute(system.energy.zeeman.effective_field, system, verbose=0)
+    assert np.allclose(field.array, (0, 0, 1e6))
+    assert system.compute_number == 3
+
+    with pytest.raises(ValueError):
+        calculator.compute(system.energy.zeeman.__repr__, system, verbose=0)
+
+    calculator.delete(system)
+
+
+def test_timedriver_precession(macrospin):
+    system = macrospin
+    system.dynamics = mm.Precession(gamma0=mm.consts.gamma0)
+    system.m = df.Field(system.m.mesh, nvdim=3, value=(1, 0, 0), norm=8e5)
+
+    # Quarter of a precession period about the z axis.
+    t = np.pi / 2 / (mm.consts.gamma0 * 1e6)
+    td = mt.numpyc.TimeDriver()
+    td.drive(system, t=t, n=10, verbose=0)
+
+    # dm/dt = -gamma0 m x H rotates m from x to y.
+    assert np.allclose(system.m.orientation.mean(), (0, 1, 0), atol=1e-4)
+    assert len(system.table.data) == 10
+    assert np.allclose(system.table.data["t"].iloc[-1], t)
+
+    mt.numpyc.delete(system)
+
+
+def test_relaxdriver(macrospin):
+    system = macrospin
+    system.energy += mm.UniaxialAnisotropy(K=1e5, u=(1, 0, 0))
+
+    mt.numpyc.RelaxDriver().drive(system, verbose=0)
+    relaxed = system.m.orientation.mean()
+
+    system.m = df.Field(system.m.mesh, nvdim=3, value=(0, 1, 1), norm=1e6)
+    mt.numpyc.MinDriver().drive(system, verbose=0)
+    assert np.allclose(relaxed, system.m.orientation.mean(), atol=1e-8)
+
+    mt.numpyc.delete(system)
+
+
+def test_hysteresisdriver(macrospin):
+    system = macrospin
+    system.energy = mm.UniaxialAnisotropy(K=1e5, u=(1, 0, 0))
+    system.m = df.Field(system.m.mesh, nvdim=3, value=(1, 0, 0), norm=1e6)
+
+    hd = mt.numpyc.HysteresisDriver()
+    # The field is slightly tilted, because a field along the easy axis exerts no
+    # torque.
+    hd.drive(system, Hmin=(-2e5, 1e3, 0), Hmax=(2e5, 1e3, 0), n=5, verbose=0)
+
+    # The switching field 2K/(mu0 Ms) ~ 1.6e5 A/m is reached at the ends only.
+    mx = system.table.data["mx"].to_numpy()
+    assert np.allclose(mx, [-1, -1, -1, -1, 1, 1, 1, 1, -1], atol=1e-3)
+
+    mt.numpyc.delete(system)
+
+
+def test_schedule(macrospin):
+    system = macrospin
+    td = mt.numpyc.TimeDriver()
+    td.schedule(system, "bash", "#!/bin/bash", t=1e-11, n=5, verbose=0)
+
+    scheduled = mdata.Data(system.name)[-1]
+    assert scheduled.info["driver"] == "TimeDriver"
+
+    reference = mm.examples.macrospin()
+    td.drive(reference, t=1e-11, n=5, verbose=0)
+    assert np.allclose(scheduled.table.data["mz"], reference.table.data["mz"])
+    assert np.allclose(scheduled[-1].array, reference.m.array)
+
+    mt.numpyc.delete(system)
+
+
+def test_unsupported(macrospin):
+    system = macrospin
+    system.energy += mm.Zeeman(H=(1, 0, 0), tcl_strings={"script": ""}, name="tcl")
+
+    with pytest.raises(NotImplementedError):
+        mt.numpyc.TimeDriver().drive(system, t=1e-12, n=1, verbose=0)
+
+    with pytest.raises(ValueError):
+        mt.numpyc.MinDriver().drive(system, ovf_format="vtk", verbose=0)
+
+    with pytest.raises(TypeError):
+        mt.numpyc.MinDriver(evolver=mt.numpyc.RungeKuttaEvolver()).drive(
+            system, verbose=0
+        )
+
+
+def test_calculatortests(pytester):
+    pytester.makeconftest(
+        "import pytest\n\nimport micromagnetictests as mt\n\n\n"
+        "@pytest.fixture(scope='module')\ndef calculator():\n    return mt.numpyc\n"
+    )
+    pytester.makepyfile("from micromagnetictests.calculatortests import *  # noqa\n")
+
+    # All tests not listed in UNSUPPORTED_TESTS pass.
+    result = pytester.runpytest("-p", "no:cacheprovider", "-rs")
+    outcomes = result.parseoutcomes()
+    assert outcomes.get("failed", 0) == 0
+    assert outcomes.get("errors", 0) == 0
+    assert outcomes["passed"] > 80
+    for reason in set(mt.numpyc.UNSUPPORTED_TESTS.values()):
+        result.stdout.fnmatch_lines([f"*{reason}*"])
@@ -0,0 +1,339 @@
+import discretisedfield as df
+import numpy as np
+import pytest
+
+import micromagnetictests as mt
+from micromagnetictests.plugin import refined_meshes, refinement_factor
+
+pytest_plugins = ["pytester"]
+
+BENCHMARK = """
+import pytest
+
+
+@pytest.mark.mm_benchmark
+def test_slow(record_property):
+    record_property("exponent", 1.01)
+
+
+def test_fast():
+    pass
+"""
+
+
+def test_benchmark_skipped_by_default(pytester):
+    pytester.makepyfile(BENCHMARK)
+    result = pytester.runpytest("-rs")
+    result.assert_outcomes(passed=1, skipped=1)
+    result.stdout.fnmatch_lines(["*use --mm-benchmark to run*"])
+    result.stdout.no_fnmatch_line("*micromagnetictests benchmarks*")
+
+
+def test_benchmark_run(pytester):
+    pytester.makepyfile(BENCHMARK)
+    result = pytester.runpytest("--mm-benchmark")
+    result.assert_outcomes(passed=2)
+    result.stdout.fnmatch_lines(
+        ["*micromagnetictests benchmarks*", "*test_slow", "*exponent: 1.01"]
+    )
+
+
+def test_marker_registered(pytester):
+    result = pytester.runpytest("--markers")
+    result.stdout.fnmatch_lines(["@pytest.mark.mm_benchmark:*"])
+
+
+SCALE = """
+import discretisedfield as df
+
+
+def test_mesh():
+    df.Mesh(p1=(0, 0, 0), p2=(1e-9, 1e-9, 1e-9), n=(1, 1, 1))
+"""
+
+
+def test_scale_option(pytester):
+    pytester.makepyfile(SCALE)
+    result = pytester.runpytest("--mm-scale=stress")
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(["*meshes refined by a factor of 8*"])
+
+    result = pytester.runpytest("--mm-scale=3")
+    result.stdout.fnmatch_lines(["*meshes refined by a factor of 3*"])
+
+    result = pytester.runpytest()
+    result.stdout.no_fnmatch_line("*meshes refined*")
+
+    result = pytester.runpytest("--mm-scale=huge")
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(["*expected one of*"])
+
+
+def test_refined_meshes():
+    p1 = (0, 0, 0)
+    p2 = (8e-9, 4e-9, 2e-9)
+    subregions = {"r1": df.Region(p1=(0, 0, 0), p2=(4e-9, 4e-9, 2e-9))}
+    with refined_meshes(2), refined_meshes(2):
+        assert refinement_factor() == 4
+        mesh = mt.cache.mesh(
+            p1=p1, p2=p2, cell=(1e-9, 1e-9, 1e-9), subregions=subregions
+        )
+        submesh = mesh.sel("x")
+        unchanged = df.Mesh(p1=p1, p2=p2, n=(8, 4, 2))
+    assert refinement_factor() == 1
+
+    assert np.array_equal(mesh.n, (32, 16, 8))
+    assert np.allclose(mesh.cell, 0.25e-9)
+    assert mesh.subregions == subregions
+    assert np.array_equal(mesh["r1"].n, (16, 16, 8))
+    # Meshes created by discretisedfield or directly are not refined.
+    assert np.array_equal(submesh.n, (16, 8))
+    assert np.array_equal(unchanged.n, (8, 4, 2))
+
+    assert np.array_equal(mt.cache.mesh(p1=p1, p2=p2, n=(8, 4, 2)).n, (8, 4, 2))
+
+
+def test_result_cache_option(pytester, tmp_path):
+    pytester.makepyfile("def test_nothing():\n    pass\n")
+    result = pytester.runpytest(f"--mm-result-cache={tmp_path / 'cache'}")
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(["*result cache: 0 results reused, 0 computed*"])
+    assert (tmp_path / "cache").is_dir()
+
+    result = pytester.runpytest()
+    result.stdout.no_fnmatch_line("*result cache*")
+
+
+COMPUTE = """
+import discretisedfield as df
+import micromagneticmodel as mm
+import pytest
+
+import micromagnetictests as mt
+
+
+@pytest.fixture
+def calculator():
+    return mt.numpyc
+
+
+@pytest.mark.parametrize("run", [0, 1])
+def test_compute(calculator, run, tmp_path):
+    system = mm.System(name="compute")
+    system.energy = mm.Zeeman(H=(0, 0, 1e5))
+    mesh = df.Mesh(p1=(0, 0, 0), p2=(2e-9, 2e-9, 1e-9), n=(2, 2, 1))
+    system.m = df.Field(mesh, nvdim=3, value=(0, 0, 1), norm=1e6)
+    energy = calculator.compute(system.energy.energy, system, tmp_path, verbose=0)
+    assert energy < 0
+    assert (tmp_path / "compute" / "compute-0").is_dir()
+"""
+
+
+def test_result_cache_compute(pytester, tmp_path):
+    compute = mt.numpyc.compute
+    pytester.makepyfile(COMPUTE)
+    result = pytester.runpytest(f"--mm-result-cache={tmp_path / 'cache'}")
+    result.assert_outcomes(passed=2)
+    result.stdout.fnmatch_lines(["*result cache: 1 results reused, 1 computed*"])
+    assert mt.numpyc.compute is compute
+
+
+BUDGET = """
+import discretisedfield as df
+import micromagneticmodel as mm
+import pytest
+
+from micromagnetictests.tests.test_monitor import SleepDriver
+
+
+@pytest.fixture
+def system(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    system = mm.System(name="budget")
+    mesh = df.Mesh(p1=(0, 0, 0), p2=(2e-9, 2e-9, 1e-9), n=(2, 2, 1))
+    system.m = df.Field(mesh, nvdim=3, value=(0, 0, 1))
+    return system
+
+
+@pytest.mark.mm_budget(0.1, offset=0.2)
+def test_hung(system):
+    SleepDriver().drive(system, t=30, n=1, verbose=0)
+
+
+def test_fast(system):
+    SleepDriver().drive(system, t=0, n=1, verbose=0)
+"""
+
+
+def test_budget_option(pytester):
+    pytester.makepyfile(BUDGET)
+    result = pytester.runpytest("--mm-budget=1e-3")
+    result.assert_outcomes(passed=1, failed=1)
+    result.stdout.fnmatch_lines(["*TimeoutError: Drive exceeded its budget of 0.6 s*"])
+    assert result.duration < 20
+
+    result = pytester.runpytest("--mm-budget=fast")
+    assert result.ret != 0
+
+    result = pytester.runpytest("--markers")
+    result.stdout.fnmatch_lines(["@pytest.mark.mm_budget*"])
+
+
+def test_shard_option(pytester, tmp_path):
+    pytester.makepyfile("\n".join(f"def test_{i}():\n    pass\n" for i in range(10)))
+    nodeids = {f"test_shard_option.py::test_{i}" for i in range(10)}
+    # test_9 is new and its cost is estimated.
+    durations = {f"test_shard_option.py::test_{i}": 1.0 for i in range(1, 9)}
+    durations["test_shard_option.py::test_0"] = 100
+
+    selected = []
+    for index in [1, 2, 3]:
+        # Every machine starts with the same durations.
+        path = tmp_path / f"durations-{index}.json"
+        mt.sharding.save_durations(durations, path)
+        result = pytester.runpytest(f"--mm-shard={index}/3", f"--mm-durations={path}")
+        result.stdout.fnmatch_lines([f"*shard {index}/3 with * of 10 tests*"])
+        reports = result.reprec.getreports("pytest_runtest_logreport")
+        selected.append({report.nodeid for report in reports})
+    assert set.union(*selected) == nodeids
+    assert sum(map(len, selected)) == 10
+    # The expensive test runs alone.
+    assert {"test_shard_option.py::test_0"} in selected
+
+    paths = [tmp_path / f"durations-{index}.json" for index in [1, 2, 3]]
+    # The durations of the other shards are kept in every file.
+    for path, tests in zip(paths, selected):
+        shard_durations = mt.sharding.load_durations(path)
+        assert set(shard_durations) == set(durations) | tests
+        for nodeid in set(durations) - tests:
+            assert shard_durations[nodeid] == durations[nodeid]
+
+    base = tmp_path / "durations.json"
+    mt.sharding.save_durations(durations, base)
+    mt.sharding.merge_durations(paths, tmp_path / "merged.json", base=base)
+    merged = mt.sharding.load_durations(tmp_path / "merged.json")
+    assert set(merged) == nodeids
+    assert merged["test_shard_option.py::test_0"] < 100
+
+    result = pytester.runpytest("--mm-shard=4/3")
+    assert result.ret != 0
+
+
+def test_shard_option_skipped_benchmarks(pytester, tmp_path):
+    pytester.makepyfile(
+        "import pytest\n\n\n@pytest.mark.mm_benchmark\ndef test_benchmark():\n"
+        "    pass\n\n\n" + "\n".join(f"def test_{i}():\n    pass\n" for i in range(4))
+    )
+    benchmark = "test_shard_option_skipped_benchmarks.py::test_benchmark"
+    durations = {
+        f"test_shard_option_skipped_benchmarks.py::test_{i}": 1.0 for i in range(4)
+    }
+    durations[benchmark] = 100
+    path = tmp_path / "durations.json"
+
+    for index in [1, 2]:
+        mt.sharding.save_durations(durations, path)
+        result = pytester.runpytest(f"--mm-shard={index}/2", f"--mm-durations={path}")
+        # The skipped benchmark does not take the place of two tests.
+        result.stdout.fnmatch_lines(["*expected duration 2.0 s*"])
+        # Its recorded duration is kept for runs with --mm-benchmark.
+        assert mt.sharding.load_durations(path)[benchmark] == 100
+
+
+def test_profile_option(pytester, tmp_path):
+    pytester.makepyfile(
+        "def test_a():\n    sum(range(1000))\n\n\ndef test_b():\n    pass\n"
+    )
+    directory = tmp_path / "profile"
+    directory.mkdir()
+    (directory / "notes.txt").write_text("notes")
+    (directory / "notes.json").write_text("{}")
+
+    result = pytester.runpytest(f"--mm-profile={directory}")
+    result.assert_outcomes(passed=2)
+    result.stdout.fnmatch_lines(
+        ["*micromagnetictests profile*", "test_profile_option*"]
+    )
+    names = {path.name for path in directory.iterdir()}
+    assert {"notes.txt", "notes.json", "summary.txt"} <= names
+    assert len(list(directory.glob("test_profile_option.py_test_a-*.prof"))) == 1
+    assert "notes" not in (directory / "summary.txt").read_text()
+
+    # Profiles of earlier runs are removed, files of the user are kept.
+    pytester.makepyfile("def test_c():\n    pass\n")
+    result = pytester.runpytest(f"--mm-profile={directory}")
+    result.assert_outcomes(passed=1)
+    assert not list(directory.glob("test_profile_option.py_test_a-*"))
+    assert len(list(directory.glob("test_profile_option.py_test_c-*.prof"))) == 1
+    assert (directory / "notes.txt").read_text() == "notes"
+    assert (directory / "notes.json").read_text() == "{}"
+
+    result = pytester.runpytest()
+    result.stdout.no_fnmatch_line("*micromagnetictests profile*")
+
+
+def test_profile_option_refuses_overwrite(pytester, tmp_path):
+    pytester.makepyfile("def test_a():\n    pass\n")
+    (tmp_path / "summary.txt").write_text("mine")
+
+    result = pytester.runpytest(f"--mm-profile={tmp_path}")
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    assert (tmp_path / "summary.txt").read_text() == "mine"
+
+    # The directory is a required value and not taken from the next argument.
+    result = pytester.runpytest("--mm-profile")
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+
+
+FEATURES = """
+import discretisedfield as df
+import micromagneticmodel as mm
+
+from micromagnetictests.tests.test_resultcache import RotateDriver
+
+
+def test_drive(tmp_path):
+    mesh = df.Mesh(p1=(0, 0, 0), p2=(2e-9, 2e-9, 1e-9), n=(2, 2, 1))
+    system = mm.System(name="features")
+    system.energy = mm.Exchange(A=1e-12) + mm.Demag()
+    system.m = df.Field(mesh, nvdim=3, value=(1, 0, 0), norm=1e6)
+    RotateDriver().drive(system, dirname=tmp_path, verbose=0)
+
+
+def test_nothing():
+    pass
+"""
+
+
+def test_feature_matrix_option(pytester, tmp_path):
+    pytester.makepyfile(FEATURES)
+    result = pytester.runpytest(f"--mm-feature-matrix={tmp_path / 'matrix.txt'}")
+    result.assert_outcomes(passed=2)
+    result.stdout.fnmatch_lines(["*feature matrix: 2 combinations exercised*"])
+    report = (tmp_path / "matrix.txt").read_text()
+    assert "test_feature_matrix_option.py::test_drive" in report
+    assert "test_nothing" not in report
+
+    result = pytester.runpytest(f"--mm-feature-matrix={tmp_path / 'matrix.json'}")
+    assert (tmp_path / "matrix.json").exists()
+
+    # Feature matrices of earlier runs are replaced.
+    result = pytester.runpytest(f"--mm-feature-matrix={tmp_path / 'matrix.json'}")
+    result.assert_outcomes(passed=2)
+
+    result = pytester.runpytest()
+    result.stdout.no_fnmatch_line("*feature matrix*")
+
+
+def test_feature_matrix_option_refuses_overwrite(pytester):
+    path = pytester.makepyfile(FEATURES)
+    source = path.read_text()
+
+    # The file is a required value and not taken from the next argument.
+    result = pytester.runpytest("--mm-feature-matrix", path.name)
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    assert path.read_text() == source
+
+    result = pytester.runpytest(f"--mm-feature-matrix={path.name}")
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    assert path.read_text() == source
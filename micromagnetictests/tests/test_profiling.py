@@ -0,0 +1,109 @@
+import subprocess
+import sys
+import time
+
+import discretisedfield as df
+import micromagneticmodel as mm
+import ubermagutil as uu
+
+import micromagnetictests as mt
+
+# Busy solver writing a log file.
+SOLVER = """
+import time
+start = time.process_time()
+while time.process_time() - start < 0.2:
+    pass
+with open("log.txt", "w") as f:
+    f.write("solver started\\nTotal time: 0.2 s\\n")
+"""
+
+
+class SolverDriver(mm.ExternalDriver):
+    """Driver running a busy solver."""
+
+    _allowed_attributes = []
+    _x = "t"
+
+    def drive_kwargs_setup(self, drive_kwargs):
+        pass
+
+    def schedule_kwargs_setup(self, schedule_kwargs):
+        pass
+
+    def _check_system(self, system):
+        pass
+
+    def _write_input_files(self, system, **kwargs):
+        time.sleep(0.05)
+
+    def _call(self, system, runner, **kwargs):
+        subprocess.run([sys.executable, "-c", SOLVER], check=True)
+
+    def _schedule_commands(self, system, runner):
+        return []
+
+    def _read_data(self, system):
+        pass
+
+
+def solver_compute(func, system, /, dirname="."):
+    workingdir = mm.ExternalDriver._setup_working_directory(
+        system=system, dirname=dirname, mode="compute"
+    )
+    with uu.changedir(workingdir):
+        subprocess.run([sys.executable, "-c", SOLVER], check=True)
+    system.compute_number += 1
+    return 0.0
+
+
+def python_hot_spot():
+    return sum(i**2 for i in range(100_000))
+
+
+def test_profile(tmp_path):
+    system = mm.System(name="profiled")
+    mesh = df.Mesh(p1=(0, 0, 0), p2=(2e-9, 2e-9, 1e-9), n=(2, 2, 1))
+    system.m = df.Field(mesh, nvdim=3, value=(0, 0, 1))
+    original = mm.ExternalDriver.drive
+
+    with mt.profiling.Profile() as profile:
+        python_hot_spot()
+        SolverDriver().drive(system, dirname=tmp_path, verbose=0)
+        SolverDriver().drive(system, dirname=tmp_path, verbose=0)
+        mt.hooks.hooked_compute(solver_compute)(system.energy.energy, system, tmp_path)
+    assert mm.ExternalDriver.drive is original
+
+    assert profile.drives == 2
+    assert profile.phases["write_input_files"] >= 0.1
+    assert profile.phases["call"] >= 0.4
+    assert profile.phases["solver_cpu"] >= 0.5
+    assert profile.phases["total"] >= profile.phases["call"]
+    assert profile.computes == 1
+    assert profile.phases["compute"] >= 0.2
+    assert profile.logs == ["log.txt: Total time: 0.2 s"] * 3
+
+    report = profile.report()
+    assert "call: " in report
+    assert "computes: 1" in report
+    assert "log.txt: Total time: 0.2 s" in report
+    assert "python_hot_spot" in report
+
+    paths = profile.save(tmp_path / "profile", "test_x.py::test_profile[a]")
+    names = sorted(path.name for path in (tmp_path / "profile").iterdir())
+    stem = paths[0].stem
+    assert stem.startswith("test_x.py_test_profile_a-")
+    assert names == [f"{stem}.json", f"{stem}.prof", f"{stem}.txt"]
+
+    # Node IDs which only differ in replaced characters, and long node IDs, give
+    # different files.
+    for name in ["test_x.py::test_profile[a b]", "test_x.py::test_profile[a_b]"]:
+        profile.save(tmp_path / "names", name, overwrite=False)
+    for name in ["a" * 300, "a" * 300 + "b"]:
+        (path, *_) = profile.save(tmp_path / "names", name, overwrite=False)
+        assert len(path.name) < 150
+    assert len(list((tmp_path / "names").glob("*.prof"))) == 4
+
+    summary = mt.profiling.aggregate(tmp_path / "profile")
+    assert summary.splitlines()[1].startswith(stem)
+    assert "python_hot_spot" in summary
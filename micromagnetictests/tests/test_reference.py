@@ -0,0 +1,263 @@
+import discretisedfield as df
+import micromagneticmodel as mm
+import numpy as np
+import pytest
+
+import micromagnetictests as mt
+
+
+@pytest.fixture
+def mesh():
+    p1 = (0, 0, 0)
+    p2 = (20e-9, 10e-9, 4e-9)
+    cell = (1e-9, 1e-9, 2e-9)
+    subregions = {
+        "r1": df.Region(p1=(0, 0, 0), p2=(10e-9, 10e-9, 4e-9)),
+        "r2": df.Region(p1=(10e-9, 0, 0), p2=(20e-9, 10e-9, 4e-9)),
+    }
+    return df.Mesh(p1=p1, p2=p2, cell=cell, subregions=subregions)
+
+
+@pytest.fixture
+def m_spiral(mesh):
+    """Magnetisation rotating in the xz plane with wave number k along x."""
+    k = 2 * np.pi / 20e-9
+    x = mesh.cells.x[:, np.newaxis, np.newaxis]
+    value = np.zeros((*mesh.n, 3))
+    value[..., 0] = np.sin(k * x)
+    value[..., 2] = np.cos(k * x)
+    return df.Field(mesh, nvdim=3, value=value, norm=8e5), k
+
+
+def test_precession_damping(mesh):
+    m = df.Field(mesh, nvdim=3, value=(1, 0, 0), norm=8e5)
+    H = (0, 0, 1e6)
+    gamma0 = 2.211e5
+    alpha = 0.5
+
+    dynamics = mm.Precession(gamma0=gamma0) + mm.Damping(alpha=alpha)
+    result = mt.reference.dmdt(dynamics, m, H)
+
+    factor = gamma0 * 1e6 / (1 + alpha**2)
+    assert np.allclose(result.array, (0, factor, alpha * factor))
+
+    # Damping alone relaxes m towards H without precession.
+    result = mt.reference.dmdt(mm.Damping(alpha=alpha), m, H, gamma0=gamma0)
+    assert np.allclose(result.array, (0, 0, alpha * factor))
+
+    # Dictionary-valued damping is resolved per subregion.
+    dynamics = mm.Precession(gamma0=gamma0) + mm.Damping(alpha={"r1": 0, "r2": 1})
+    result = mt.reference.dmdt(dynamics, m, H)
+    assert np.allclose(result["r1"].array, (0, gamma0 * 1e6, 0))
+    assert np.allclose(result["r2"].array, (0, gamma0 * 5e5, gamma0 * 5e5))
+
+
+def test_zhangli(mesh, m_spiral):
+    m, k = m_spiral
+    u = 100
+
+    # Uniform magnetisation does not feel a current.
+    m_uniform = df.Field(mesh, nvdim=3, value=(0, 0, 1), norm=8e5)
+    result = mt.reference.dmdt(mm.ZhangLi(u=u, beta=0.5), m_uniform, (0, 0, 0))
+    assert np.allclose(result.array, 0)
+
+    # Without damping and non-adiabatic torque, dm/dt = -(u.grad)m which is
+    # orthogonal to m. Central differences underestimate the derivative by
+    # sin(kh)/(kh) ~ 2% and are only used in the interior.
+    result = mt.reference.dmdt(mm.ZhangLi(u=u, beta=0), m, (0, 0, 0))
+    expected = np.zeros((*mesh.n, 3))
+    x = mesh.cells.x[:, np.newaxis, np.newaxis]
+    expected[..., 0] = -u * k * np.cos(k * x)
+    expected[..., 2] = u * k * np.sin(k * x)
+    assert np.allclose(result.array[1:-1], expected[1:-1], atol=3e-2 * u * k, rtol=0)
+    m_dot_dmdt = np.sum(result.array * m.orientation.array, axis=-1)
+    assert np.allclose(m_dot_dmdt, 0, atol=1e-6 * u * k)
+
+    # Scalar, vector, dict, and field-valued u give the same result.
+    for value in [
+        (u, 0, 0),
+        {"r1": u, "r2": u},
+        {"r1": (u, 0, 0), "r2": (u, 0, 0)},
+        df.Field(mesh, nvdim=1, value=u),
+        df.Field(mesh, nvdim=3, value=(u, 0, 0)),
+    ]:
+        other = mt.reference.dmdt(mm.ZhangLi(u=value, beta=0), m, (0, 0, 0))
+        assert np.allclose(other.array, result.array)
+
+    # Current in y direction does not act on a texture varying along x.
+    result = mt.reference.dmdt(mm.ZhangLi(u=(0, u, 0), beta=0.5), m, (0, 0, 0))
+    assert np.allclose(result.array, 0)
+
+
+def test_zhangli_time_dependence(m_spiral):
+    m, _ = m_spiral
+
+    def half(t):
+        return 0.5
+
+    full = mt.reference.dmdt(mm.ZhangLi(u=100, beta=0.1), m, (0, 0, 0), alpha=0.3)
+    scaled = mt.reference.dmdt(
+        mm.ZhangLi(u=100, beta=0.1, func=half, dt=1e-13), m, (0, 0, 0), alpha=0.3
+    )
+    assert np.allclose(scaled.array, 0.5 * full.array)
+
+    tcl_strings = {
+        "script": "proc TimeFunction { total_time } { return 1 }",
+        "script_args": "total_time",
+        "script_name": "TimeFunction",
+    }
+    with pytest.raises(NotImplementedError):
+        mt.reference.dmdt(
+            mm.ZhangLi(u=100, beta=0.1, tcl_strings=tcl_strings), m, (0, 0, 0)
+        )
+
+
+def test_slonczewski(mesh):
+    Ms = 8e5
+    J = 1e12
+    P = 0.4
+    Lambda = 2
+    gamma0 = 2.211e5
+    term = mm.Slonczewski(J=J, mp=(1, 0, 0), P=P, Lambda=Lambda)
+
+    # No torque if m is parallel to mp.
+    m = df.Field(mesh, nvdim=3, value=(1, 0, 0), norm=Ms)
+    result = mt.reference.dmdt(term, m, (0, 0, 0), gamma0=gamma0)
+    assert np.allclose(result.array, 0)
+
+    # For m perpendicular to mp, the damping-like torque points along mp.
+    m = df.Field(mesh, nvdim=3, value=(0, 0, 1), norm=Ms)
+    result = mt.reference.dmdt(term, m, (0, 0, 0), gamma0=gamma0)
+    beta = mm.consts.hbar / (mm.consts.mu0 * mm.consts.e) * J / (4e-9 * Ms)
+    eps = P * Lambda**2 / (Lambda**2 + 1)
+    assert np.allclose(result.array, (gamma0 * beta * eps, 0, 0))
+
+    # The field-like torque is controlled by eps_prime.
+    term = mm.Slonczewski(J=J, mp=(1, 0, 0), P=P, Lambda=Lambda, eps_prime=1)
+    result = mt.reference.dmdt(term, m, (0, 0, 0), gamma0=gamma0)
+    assert np.allclose(result.array, (gamma0 * beta * eps, -gamma0 * beta, 0))
+
+    # Time dependence multiplies J.
+    term = mm.Slonczewski(J=J, mp=(1, 0, 0), P=P, Lambda=Lambda, func=np.cos, dt=1e-13)
+    result = mt.reference.dmdt(term, m, (0, 0, 0), gamma0=gamma0, t=np.pi)
+    assert np.allclose(result.array, (-gamma0 * beta * eps, 0, 0))
+
+    # Dictionary-valued parameters are resolved per subregion.
+    term = mm.Slonczewski(
+        J={"r1": J, "r2": 0}, mp={"r1": (1, 0, 0), "r2": (0, 1, 0)}, P=P, Lambda=Lambda
+    )
+    result = mt.reference.dmdt(term, m, (0, 0, 0), gamma0=gamma0)
+    assert np.allclose(result["r1"].array, (gamma0 * beta * eps, 0, 0))
+    assert np.allclose(result["r2"].array, 0)
+
+
+def test_not_implemented(mesh):
+    m = df.Field(mesh, nvdim=3, value=(0, 0, 1), norm=8e5)
+    with pytest.raises(NotImplementedError):
+        mt.reference.dmdt(mm.Exchange(A=1e-12), m, (0, 0, 0))
+
+
+@pytest.fixture
+def stack():
+    p1 = (0, 0, 0)
+    p2 = (20e-9, 10e-9, 7e-9)
+    cell = (2e-9, 2e-9, 1e-9)
+    subregions = {
+        "bottom": df.Region(p1=(0, 0, 0), p2=(20e-9, 10e-9, 3e-9)),
+        "spacer": df.Region(p1=(0, 0, 3e-9), p2=(20e-9, 10e-9, 4e-9)),
+        "top": df.Region(p1=(0, 0, 4e-9), p2=(20e-9, 10e-9, 7e-9)),
+    }
+    return df.Mesh(p1=p1, p2=p2, cell=cell, subregions=subregions)
+
+
+def test_rkky(stack):
+    Ms = 8e5
+    sigma = -1e-4
+    area = 20e-9 * 10e-9
+    rkky = mm.RKKY(sigma=sigma, subregions=["bottom", "top"])
+
+    m = df.Field(stack, nvdim=3, value=(0, 0, 1), norm=Ms)
+    assert mt.reference.energy(rkky, m) == 0
+
+    m = df.Field(
+        stack, nvdim=3, value={"top": (0, 0, -1), "default": (0, 0, 1)}, norm=Ms
+    )
+    assert np.isclose(mt.reference.energy(rkky, m), 2 * sigma * area)
+    assert np.isclose(mt.reference.density(rkky, m).integrate(), 2 * sigma * area)
+
+    # Only the two facing layers experience the coupling.
+    Heff = mt.reference.effective_field(rkky, m)
+    value = sigma / (mm.consts.mu0 * Ms * 1e-9)
+    assert np.allclose(Heff.array[:, :, 2], (0, 0, -value))
+    assert np.allclose(Heff.array[:, :, 4], (0, 0, value))
+    assert np.allclose(np.delete(Heff.array, [2, 4], axis=2), 0)
+
+    # The order of the subregions does not matter.
+    other = mm.RKKY(sigma=sigma, subregions=["top", "bottom"])
+    assert np.isclose(mt.reference.energy(other, m), mt.reference.energy(rkky, m))
+    assert np.allclose(mt.reference.effective_field(other, m).array, Heff.array)
+
+
+def test_rkky_biquadratic(stack):
+    Ms = 8e5
+    sigma = 1e-4
+    sigma2 = -2e-4
+    area = 20e-9 * 10e-9
+    rkky = mm.RKKY(sigma=sigma, sigma2=sigma2, subregions=["bottom", "top"])
+
+    # 90 degree alignment.
+    m = df.Field(
+        stack, nvdim=3, value={"top": (1, 0, 0), "default": (0, 0, 1)}, norm=Ms
+    )
+    assert np.isclose(mt.reference.energy(rkky, m), (sigma + sigma2) * area)
+    Heff = mt.reference.effective_field(rkky, m)
+    value = sigma / (mm.consts.mu0 * Ms * 1e-9)
+    assert np.allclose(Heff.array[:, :, 2], (value, 0, 0))
+    assert np.allclose(Heff.array[:, :, 4], (0, 0, value))
+
+    # The effective field is the negative variational derivative of the energy.
+    rng = np.random.default_rng(1)
+    m = df.Field(stack, nvdim=3, value=rng.normal(size=(*stack.n, 3)), norm=Ms)
+    Heff = mt.reference.effective_field(rkky, m)
+    delta = 1e-6
+    dm = np.zeros((*stack.n, 3))
+    dm[3, 2, 2] = (delta, 0, 0)
+    dE = mt.reference.energy(
+        rkky, df.Field(stack, nvdim=3, value=m.array + Ms * dm)
+    ) - mt.reference.energy(rkky, df.Field(stack, nvdim=3, value=m.array - Ms * dm))
+    # The energy depends on the unit vector, so only the transverse part of the
+    # variation contributes.
+    mu = m.orientation.array[3, 2, 2]
+    transverse = np.subtract((delta, 0, 0), mu * mu[0] * delta)
+    expected = -mm.consts.mu0 * Ms * stack.dV * np.dot(Heff.array[3, 2, 2], transverse)
+    assert np.isclose(dE / 2, expected, rtol=1e-4)
+
+
+def test_rkky_zero_norm(stack):
+    Ms = {"bottom": 8e5, "spacer": 0, "top": 8e5}
+    rkky = mm.RKKY(sigma=-1e-4, subregions=["bottom", "top"])
+
+    # top layer partially empty
+    m_antiparallel = df.Field(
+        stack, nvdim=3, value={"top": (0, 0, -1), "default": (0, 0, 1)}, norm=Ms
+    )
+    m_antiparallel.array[:5, :, 4:] = 0
+
+    assert np.isclose(
+        mt.reference.energy(rkky, m_antiparallel), 2 * -1e-4 * 10e-9 * 10e-9
+    )
+    Heff = mt.reference.effective_field(rkky, m_antiparallel)
+    assert np.allclose(Heff.array[:5, :, 2], 0)
+    assert np.allclose(Heff.array[:5, :, 4], 0)
+    assert not np.allclose(Heff.array[5:, :, 2], 0)
+
+    energy = mm.RKKY(sigma=-1e-4, subregions=["bottom", "top"]) + mm.RKKY(
+        sigma=-1e-4, subregions=["bottom", "top"], name="second"
+    )
+    assert np.isclose(
+        mt.reference.energy(energy, m_antiparallel),
+        2 * mt.reference.energy(rkky, m_antiparallel),
+    )
+    assert np.allclose(
+        mt.reference.effective_field(energy, m_antiparallel).array, 2 * Heff.array
+    )
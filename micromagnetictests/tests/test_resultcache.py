@@ -0,0 +1,136 @@
+import pathlib
+
+import discretisedfield as df
+import micromagneticmodel as mm
+import numpy as np
+import pytest
+
+import micromagnetictests as mt
+
+
+class RotateDriver(mm.ExternalDriver):
+    """Driver rotating the magnetisation by 90 degrees around the z-axis."""
+
+    _allowed_attributes = ["angle"]
+    _x = "t"
+    calls = 0
+
+    def drive_kwargs_setup(self, drive_kwargs):
+        pass
+
+    def schedule_kwargs_setup(self, schedule_kwargs):
+        pass
+
+    def _check_system(self, system):
+        pass
+
+    def _write_input_files(self, system, **kwargs):
+        np.save("m0.npy", system.m.array)
+
+    def _call(self, system, runner, **kwargs):
+        type(self).calls += 1
+        m = np.load("m0.npy")
+        np.save("m.npy", np.stack([-m[..., 1], m[..., 0], m[..., 2]], axis=-1))
+
+    def _schedule_commands(self, system, runner):
+        return []
+
+    def _read_data(self, system):
+        system.m = df.Field(system.m.mesh, nvdim=3, value=np.load("m.npy"))
+
+
+@pytest.fixture
+def system():
+    mesh = df.Mesh(p1=(0, 0, 0), p2=(2e-9, 2e-9, 1e-9), n=(2, 2, 1))
+    system = mm.System(name="resultcache")
+    system.energy = mm.Exchange(A=1e-12) + mm.Zeeman(H=(0, 0, 1e5))
+    system.m = df.Field(mesh, nvdim=3, value=(1, 0, 0), norm=1e6)
+    return system
+
+
+def test_result_cache(system, tmp_path):
+    RotateDriver.calls = 0
+    driver = RotateDriver()
+    initial = system.m
+
+    with mt.resultcache.ResultCache(tmp_path / "cache") as cache:
+        driver.drive(system, dirname=tmp_path / "run-1", verbose=0)
+        first = system.m
+        driver.drive(system, dirname=tmp_path / "run-1", verbose=0)
+        assert RotateDriver.calls == 2
+
+        system.m = initial
+        driver.drive(system, dirname=tmp_path / "run-2", verbose=0)
+        assert RotateDriver.calls == 2
+        assert (cache.hits, cache.misses) == (1, 2)
+
+        mt.assertions.assert_fields_close(system.m, first, rtol=0)
+        mt.assertions.assert_orientations_close(system.m, (0, 1, 0), max_angle=1e-12)
+        drive = pathlib.Path(tmp_path / "run-2" / "resultcache" / "drive-0")
+        assert (drive / "m.npy").exists()
+        assert (drive / "info.json").exists()
+
+        # Any change of the system requires a new computation.
+        system.m = initial
+        system.energy.zeeman.H = (0, 0, 2e5)
+        driver.drive(system, dirname=tmp_path / "run-3", verbose=0)
+        assert RotateDriver.calls == 3
+
+    # The original drive is restored.
+    system.m = initial
+    driver.drive(system, dirname=tmp_path / "run-4", verbose=0)
+    assert RotateDriver.calls == 4
+
+    # Results are kept across runs.
+    system.m = initial
+    with mt.resultcache.ResultCache(tmp_path / "cache") as cache:
+        cache.enabled = False
+        driver.drive(system, dirname=tmp_path / "run-5", verbose=0)
+        cache.enabled = True
+        system.m = initial
+        driver.drive(system, dirname=tmp_path / "run-5", verbose=0)
+        assert (cache.hits, cache.misses) == (1, 0)
+    assert RotateDriver.calls == 5
+
+
+def test_result_cache_positional(system, tmp_path):
+    RotateDriver.calls = 0
+    driver = RotateDriver()
+    initial = system.m
+
+    with mt.resultcache.ResultCache(tmp_path / "cache") as cache:
+        driver.drive(system, tmp_path / "run-1", verbose=0)
+        system.m = initial
+        driver.drive(system, dirname=tmp_path / "run-2", verbose=0)
+
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert RotateDriver.calls == 1
+    assert (tmp_path / "run-1" / "resultcache" / "drive-0" / "m.npy").exists()
+
+
+def test_key(system):
+    cache = mt.resultcache.ResultCache(".")
+    driver = RotateDriver()
+    key = cache.key(driver, system, t=1e-9, n=10)
+
+    assert cache.key(driver, system, t=1e-9, n=10, dirname="other") == key
+    assert cache.key(driver, system, t=1e-9, n=20) != key
+    assert cache.key(RotateDriver(angle=1), system, t=1e-9, n=10) != key
+
+    system.m.array[0, 0, 0] *= -1
+    assert cache.key(driver, system, t=1e-9, n=10) != key
+    system.m.array[0, 0, 0] *= -1
+    system.T = 10
+    assert cache.key(driver, system, t=1e-9, n=10) != key
+    system.T = 0
+
+    # Time dependences are compared by code and captured values.
+    def oscillation(frequency):
+        return lambda t: np.sin(frequency * t)
+
+    for frequency in [1e9, 2e9]:
+        system.energy.zeeman.func = oscillation(frequency)
+        system.energy.zeeman.dt = 1e-12
+        keys = {cache.key(driver, system, t=1e-9, n=10) for _ in range(2)}
+        assert len(keys) == 1 and key not in keys
+        key = keys.pop()
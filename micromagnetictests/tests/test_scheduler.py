@@ -0,0 +1,139 @@
+import subprocess as sp
+import sys
+
+import micromagneticmodel as mm
+import pytest
+
+import micromagnetictests as mt
+
+pytestmark = pytest.mark.skipif(
+    sys.platform == "win32", reason="Job scripts are run with a POSIX shell."
+)
+
+
+def submit(scheduler, cwd, script):
+    (cwd / "job.sh").write_text(script)
+    result = sp.run([scheduler.cmd, "job.sh"], cwd=cwd, capture_output=True, text=True)
+    assert result.returncode == 0
+    assert result.stdout.startswith("Submitted job ")
+    return result.stdout.split()[-1]
+
+
+def test_run_jobs(tmp_path):
+    with mt.scheduler.LocalScheduler(tmp_path / "spool", workers=2) as scheduler:
+        # Jobs wait until all of them are submitted, so that the workers are busy
+        # however long the submissions take.
+        wait = f"while [ ! -e {tmp_path / 'go'} ]; do sleep 0.05; done\n"
+        job_ids = []
+        for i in range(6):
+            cwd = tmp_path / f"job{i}"
+            cwd.mkdir()
+            job_ids.append(
+                submit(scheduler, cwd, f"{wait}sleep 0.2\necho {i} > result\n")
+            )
+        failing = submit(scheduler, tmp_path, "echo failure\nexit 3\n")
+        (tmp_path / "go").touch()
+        scheduler.wait(timeout=30)
+
+        status = scheduler.status()
+
+    assert len(status) == 7
+    for i, job_id in enumerate(job_ids):
+        assert status[job_id]["status"] == "done"
+        assert status[job_id]["returncode"] == 0
+        assert (tmp_path / f"job{i}" / "result").read_text() == f"{i}\n"
+        assert (tmp_path / f"job{i}" / f"job-{job_id}.out").exists()
+
+    assert scheduler.status(failing)["status"] == "failed"
+    assert scheduler.status(failing)["returncode"] == 3
+    assert (tmp_path / f"job-{failing}.out").read_text() == "failure\n"
+
+    # at most two jobs run at the same time
+    events = sorted(
+        [(job["started"], 1) for job in status.values()]
+        + [(job["finished"], -1) for job in status.values()]
+    )
+    running = [0]
+    for _, change in events:
+        running.append(running[-1] + change)
+    assert max(running) == 2
+
+    with pytest.raises(KeyError):
+        scheduler.status("unknown")
+
+
+def test_run_error(tmp_path):
+    with mt.scheduler.LocalScheduler(tmp_path / "spool") as scheduler:
+        scheduler.shell = str(tmp_path / "missing-shell")
+        job_id = submit(scheduler, tmp_path, "echo unreachable\n")
+        scheduler.wait(timeout=30)
+
+    # The job is not left running if it cannot be started.
+    status = scheduler.status(job_id)
+    assert status["status"] == "failed"
+    assert status["returncode"] is None
+    assert "FileNotFoundError" in status["error"]
+    assert status["finished"] >= status["started"]
+
+
+def test_invalid_submission(tmp_path):
+    with mt.scheduler.LocalScheduler(tmp_path / "spool") as scheduler:
+        result = sp.run(
+            [scheduler.cmd, "missing.sh"], cwd=tmp_path, capture_output=True
+        )
+        assert result.returncode != 0
+        assert scheduler.status() == {}
+
+
+def test_wait_timeout(tmp_path):
+    with mt.scheduler.LocalScheduler(tmp_path / "spool") as scheduler:
+        submit(scheduler, tmp_path, "sleep 1\n")
+        with pytest.raises(TimeoutError):
+            scheduler.wait(timeout=0.1)
+        scheduler.wait(timeout=30)
+
+
+class EchoDriver(mm.ExternalDriver):
+    """Driver whose scheduled job only writes a result file."""
+
+    _allowed_attributes = []
+    _x = "t"
+
+    def drive_kwargs_setup(self, drive_kwargs):
+        pass
+
+    def schedule_kwargs_setup(self, schedule_kwargs):
+        pass
+
+    def _check_system(self, system):
+        pass
+
+    def _write_input_files(self, system, **kwargs):
+        pass
+
+    def _call(self, system, runner, **kwargs):
+        pass
+
+    def _schedule_commands(self, system, runner):
+        return [f"echo {system.name} > result"]
+
+    def _read_data(self, system):
+        pass
+
+
+def test_schedule(tmp_path):
+    system = mm.System(name="scheduled")
+    driver = EchoDriver()
+    with mt.scheduler.LocalScheduler(tmp_path / "spool") as scheduler:
+        for _ in range(3):
+            driver.schedule(
+                system, scheduler.cmd, "#!/bin/bash", dirname=tmp_path, verbose=0
+            )
+        scheduler.wait(timeout=30)
+
+    status = scheduler.status()
+    assert len(status) == 3
+    assert all(job["status"] == "done" for job in status.values())
+    for i in range(3):
+        result = tmp_path / "scheduled" / f"drive-{i}" / "result"
+        assert result.read_text() == "scheduled\n"
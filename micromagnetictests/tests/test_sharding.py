@@ -0,0 +1,93 @@
+import json
+import random
+import xml.etree.ElementTree as ET
+
+import pytest
+
+import micromagnetictests as mt
+
+
+def test_costs():
+    durations = {"a": 1.0, "b": 2.0, "c": 10.0}
+    assert mt.sharding.costs(["a", "d"], durations) == {"a": 1.0, "d": 2.0}
+    assert mt.sharding.costs(["a", "d"], {}) == {
+        "a": mt.sharding.DEFAULT_COST,
+        "d": mt.sharding.DEFAULT_COST,
+    }
+
+
+def test_costs_without_durations():
+    nodeids = [f"calculatortests.py::TestZeeman::test_{i}" for i in range(20)] + [
+        "calculatortests.py::test_stdprob3",
+        "calculatortests.py::test_stdprob4",
+        "calculatortests.py::test_stdprob5",
+        "calculatortests.py::test_soak[10]",
+        "calculatortests.py::TestDemagCost::test_asymptotic_radius[x]",
+    ]
+    costs = mt.sharding.costs(nodeids, {}, benchmarks={nodeids[-1]})
+    assert costs[nodeids[0]] == mt.sharding.DEFAULT_COST
+    assert (
+        costs["calculatortests.py::test_soak[10]"] == mt.sharding.WEIGHTS["test_soak"]
+    )
+    assert costs[nodeids[-1]] == mt.sharding.BENCHMARK_WEIGHT
+
+    # The long tests are split across shards.
+    long = {"calculatortests.py::test_stdprob3", "calculatortests.py::test_stdprob5"}
+    assert not any(long <= set(shard) for shard in mt.sharding.partition(costs, 2))
+    for shard in mt.sharding.partition(costs, 3):
+        assert sum("stdprob" in nodeid for nodeid in shard) == 1
+
+
+def test_partition():
+    costs = {f"test_{i}": (i * 7919) % 100 + 1 for i in range(50)}
+    costs["test_stdprob3"] = 200
+    costs["test_stdprob5"] = 150
+
+    shards = mt.sharding.partition(costs, 4)
+    assert len(shards) == 4
+    assert sorted(sum(shards, [])) == sorted(costs)
+    totals = [sum(costs[nodeid] for nodeid in shard) for shard in shards]
+    assert max(totals) - min(totals) <= max(costs.values()) - 1
+    assert not any({"test_stdprob3", "test_stdprob5"} <= set(s) for s in shards)
+
+    # The partition does not depend on the order of the tests.
+    items = list(costs.items())
+    random.Random(0).shuffle(items)
+    assert mt.sharding.partition(dict(items), 4) == shards
+
+    assert mt.sharding.partition({"a": 1}, 3) == [["a"], [], []]
+
+
+def test_durations(tmp_path):
+    mt.sharding.save_durations({"b": 2.0, "a": 1.0}, tmp_path / "1.json")
+    mt.sharding.save_durations({"b": 3.0, "c": 4.0}, tmp_path / "2.json")
+    assert mt.sharding.load_durations(tmp_path / "1.json") == {"a": 1.0, "b": 2.0}
+
+    mt.sharding.merge_durations(
+        [tmp_path / "1.json", tmp_path / "2.json", tmp_path / "missing.json"],
+        tmp_path / "all.json",
+    )
+    merged = json.loads((tmp_path / "all.json").read_text())
+    assert merged == {"a": 1.0, "b": 3.0, "c": 4.0}
+
+
+def test_merge_junitxml(tmp_path):
+    (tmp_path / "1.xml").write_text(
+        '<testsuites><testsuite name="pytest" tests="2" errors="0" failures="1"'
+        ' skipped="0" time="1.5"><testcase name="a"/><testcase name="b"/>'
+        "</testsuite></testsuites>"
+    )
+    (tmp_path / "2.xml").write_text(
+        '<testsuite name="pytest" tests="1" errors="1" failures="0" skipped="0"'
+        ' time="2.0"><testcase name="c"/></testsuite>'
+    )
+
+    mt.sharding.merge_junitxml(
+        [tmp_path / "1.xml", tmp_path / "2.xml"], tmp_path / "all.xml"
+    )
+    suite = ET.parse(tmp_path / "all.xml").getroot().find("testsuite")
+    assert [case.get("name") for case in suite] == ["a", "b", "c"]
+    assert suite.get("tests") == "3"
+    assert suite.get("errors") == "1"
+    assert suite.get("failures") == "1"
+    assert float(suite.get("time")) == pytest.approx(3.5)
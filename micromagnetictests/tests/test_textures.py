@@ -0,0 +1,108 @@
+import discretisedfield as df
+import numpy as np
+import pytest
+
+import micromagnetictests as mt
+
+
+@pytest.fixture
+def mesh():
+    p1 = (-20e-9, -10e-9, 0)
+    p2 = (20e-9, 10e-9, 4e-9)
+    cell = (2e-9, 2e-9, 1e-9)
+    return df.Mesh(p1=p1, p2=p2, cell=cell)
+
+
+def test_coordinates(mesh):
+    x, y, z = mt.textures.coordinates(mesh)
+    for coordinate in [x, y, z]:
+        assert coordinate.shape == tuple(mesh.n)
+
+    for index, point in zip(mesh.indices, mesh):
+        assert np.allclose((x[index], y[index], z[index]), point)
+
+
+@pytest.mark.parametrize(
+    "builder, function",
+    [
+        (
+            lambda x, y, z: mt.textures.vortex(
+                x, y, center=(5e-9, 0), core_radius=-3e-9, circulation=-1
+            ),
+            lambda p: (p[1], -(p[0] - 5e-9), -3e-9),
+        ),
+        (
+            lambda x, y, z: mt.textures.flower(
+                x, y, z, center=(0, 0, 2e-9), size=10e-9, splay=0.5
+            ),
+            lambda p: (
+                0.5 * p[0] * (p[2] - 2e-9) / 1e-16,
+                0.5 * p[1] * (p[2] - 2e-9) / 1e-16,
+                1,
+            ),
+        ),
+        (
+            lambda x, y, z: mt.textures.domain_wall(x, center=3e-9, width=4e-9),
+            lambda p: (
+                0,
+                1 / np.cosh((p[0] - 3e-9) / 4e-9),
+                np.tanh((p[0] - 3e-9) / 4e-9),
+            ),
+        ),
+        (
+            lambda x, y, z: mt.textures.two_region(
+                mt.textures.disk(x, y, radius=8e-9), (0, 0.1, -1), (0, 0.1, 1)
+            ),
+            lambda p: (0, 0.1, -1) if np.hypot(p[0], p[1]) <= 8e-9 else (0, 0.1, 1),
+        ),
+    ],
+)
+def test_builders(mesh, builder, function):
+    m = builder(*mt.textures.coordinates(mesh))
+    expected = df.Field(mesh, nvdim=3, value=function)
+
+    assert m.shape == (*mesh.n, 3)
+    assert np.allclose(m, expected.array, rtol=1e-12, atol=0)
+
+
+def test_domain_wall(mesh):
+    x, y, z = mt.textures.coordinates(mesh)
+    bloch = mt.textures.domain_wall(x, width=2e-9)
+    neel = mt.textures.domain_wall(x, width=2e-9, kind="neel")
+
+    assert np.allclose(np.linalg.norm(bloch, axis=-1), 1)
+    assert np.allclose(neel[..., [1, 0, 2]], bloch)
+
+    with pytest.raises(ValueError):
+        mt.textures.domain_wall(x, width=2e-9, kind="wrong")
+
+
+@pytest.mark.parametrize("helicity", [0, np.pi / 2])
+def test_skyrmion(mesh, helicity):
+    x, y, z = mt.textures.coordinates(mesh)
+    m = mt.textures.skyrmion(
+        x, y, center=(1e-9, 1e-9), radius=5e-9, wall_width=1e-9, helicity=helicity
+    )
+
+    assert np.allclose(np.linalg.norm(m, axis=-1), 1)
+    r = np.hypot(x - 1e-9, y - 1e-9)
+    assert np.all(m[..., 2][r < 2e-9] < -0.9)
+    assert np.all(m[..., 2][r > 10e-9] > 0.99)
+    # The in-plane component is perpendicular to the radius for helicity pi/2.
+    radial = (x - 1e-9) * m[..., 0] + (y - 1e-9) * m[..., 1]
+    assert np.all(radial >= -1e-20) if helicity == 0 else np.allclose(radial, 0)
+
+
+def test_masks(mesh):
+    x, y, z = mt.textures.coordinates(mesh)
+    disk = mt.textures.disk(x, y, center=(2e-9, 0), radius=6e-9)
+    cylinder = mt.textures.cylinder(
+        x, y, z, center=(2e-9, 0, 1e-9), radius=6e-9, height=2e-9
+    )
+
+    assert disk.dtype == bool
+    assert np.array_equal(disk, np.hypot(x - 2e-9, y) <= 6e-9)
+    assert np.array_equal(cylinder, disk & (z < 2e-9))
+
+    m = df.Field(mesh, nvdim=3, value=(0, 0, 1), norm=8e5 * cylinder)
+    assert np.array_equal(mt.assertions.nonzero(m), cylinder)
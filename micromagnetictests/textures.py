@@ -0,0 +1,411 @@
+"""Vectorised builders of initial magnetisation textures.
+
+Defining the initial magnetisation with a Python function evaluates the function
+once per cell, which dominates the setup of large meshes. The builders in this
+module operate on whole coordinate arrays as returned by ``coordinates``. Vector
+textures are returned as arrays with shape ``(*mesh.n, 3)`` and masks as boolean
+arrays with shape ``mesh.n``. Both can be passed directly to
+``discretisedfield.Field`` as ``value`` and ``norm``, respectively (a mask has to be
+multiplied with the saturation magnetisation).
+
+"""
+
+import numpy as np
+
+
+def coordinates(mesh):
+    """Coordinates of all cell centres of a mesh.
+
+    Parameters
+    ----------
+    mesh : discretisedfield.Mesh
+
+        Mesh.
+
+    Returns
+    -------
+    tuple
+
+        Arrays of x, y, and z coordinates with shape ``mesh.n``.
+
+    Examples
+    --------
+    1. Coordinates of a mesh.
+
+    >>> import discretisedfield as df
+    >>> import micromagnetictests as mt
+    ...
+    >>> mesh = df.Mesh(p1=(0, 0, 0), p2=(4e-9, 2e-9, 1e-9), n=(4, 2, 1))
+    >>> x, y, z = mt.textures.coordinates(mesh)
+    >>> x.shape
+    (4, 2, 1)
+    >>> x[:, 0, 0] * 1e9
+    array([0.5, 1.5, 2.5, 3.5])
+
+    """
+    return tuple(np.meshgrid(*mesh.cells, indexing="ij"))
+
+
+def _stack(*components):
+    return np.stack(np.broadcast_arrays(*components), axis=-1).astype(float)
+
+
+def two_region(condition, inside, outside):
+    """Piecewise uniform texture with two values.
+
+    Parameters
+    ----------
+    condition : array_like
+
+        Boolean array selecting the cells in which ``inside`` is used, e.g.
+        ``x < 50e-9`` or a mask returned by ``disk``.
+
+    inside : array_like
+
+        Vector in cells where ``condition`` is true.
+
+    outside : array_like
+
+        Vector in all other cells.
+
+    Returns
+    -------
+    numpy.ndarray
+
+        Vector texture.
+
+    Examples
+    --------
+    1. Two domains along x.
+
+    >>> import discretisedfield as df
+    >>> import micromagnetictests as mt
+    ...
+    >>> mesh = df.Mesh(p1=(0, 0, 0), p2=(4e-9, 1e-9, 1e-9), n=(4, 1, 1))
+    >>> x, y, z = mt.textures.coordinates(mesh)
+    >>> m = mt.textures.two_region(x < 2e-9, (0, 0, -1), (0, 0, 1))
+    >>> m[:, 0, 0, 2]
+    array([-1., -1.,  1.,  1.])
+
+    """
+    condition = np.asarray(condition, dtype=bool)[..., np.newaxis]
+    return np.where(condition, inside, outside).astype(float)
+
+
+def vortex(x, y, *, center=(0, 0), core_radius=0, circulation=1):
+    r"""Vortex in the xy-plane.
+
+    The in-plane magnetisation circulates around ``center``. The out-of-plane
+    component is constant and equal to ``core_radius``, so that the
+    magnetisation is tilted out of the plane by an angle of
+    :math:`\arctan(r_\text{c}/r)` at a distance :math:`r` from the centre.
+
+    Parameters
+    ----------
+    x, y : array_like
+
+        Coordinates.
+
+    center : array_like, optional
+
+        Centre of the vortex in the xy-plane. Defaults to ``(0, 0)``.
+
+    core_radius : numbers.Real, optional
+
+        Radius of the vortex core. The sign defines the core polarisation. If it
+        is zero, the vector at the centre is zero. Defaults to ``0``.
+
+    circulation : int, optional
+
+        Counterclockwise (``1``) or clockwise (``-1``) circulation. Defaults to
+        ``1``.
+
+    Returns
+    -------
+    numpy.ndarray
+
+        Vector texture. It is not normalised.
+
+    Examples
+    --------
+    1. Vortex in a square.
+
+    >>> import discretisedfield as df
+    >>> import micromagnetictests as mt
+    ...
+    >>> mesh = df.Mesh(p1=(-2e-9, -2e-9, 0), p2=(2e-9, 2e-9, 1e-9), n=(2, 2, 1))
+    >>> x, y, z = mt.textures.coordinates(mesh)
+    >>> m = mt.textures.vortex(x, y, core_radius=1e-9)
+    >>> m[1, 0, 0] * 1e9
+    array([1., 1., 1.])
+
+    """
+    x = np.asarray(x) - center[0]
+    y = np.asarray(y) - center[1]
+    return _stack(-circulation * y, circulation * x, core_radius)
+
+
+def flower(x, y, z, *, center=(0, 0, 0), size, splay=1):
+    r"""Flower state along the z-direction.
+
+    The magnetisation points in the z-direction and splays outwards near the top
+    and inwards near the bottom face:
+
+    .. math::
+
+        \mathbf{m} = \left(s\frac{(x - x_0)(z - z_0)}{a^2},
+        s\frac{(y - y_0)(z - z_0)}{a^2}, 1\right)
+
+    Parameters
+    ----------
+    x, y, z : array_like
+
+        Coordinates.
+
+    center : array_like, optional
+
+        Centre of the sample. Defaults to ``(0, 0, 0)``.
+
+    size : numbers.Real
+
+        Half edge length :math:`a` of the sample.
+
+    splay : numbers.Real, optional
+
+        Ratio :math:`s` of the in-plane and the z-component at the corners of the
+        sample. Defaults to ``1``.
+
+    Returns
+    -------
+    numpy.ndarray
+
+        Vector texture. It is not normalised.
+
+    Examples
+    --------
+    1. Flower state in a cube.
+
+    >>> import discretisedfield as df
+    >>> import micromagnetictests as mt
+    ...
+    >>> mesh = df.Mesh(p1=(-1e-9, -1e-9, -1e-9), p2=(1e-9, 1e-9, 1e-9), n=(2, 2, 2))
+    >>> x, y, z = mt.textures.coordinates(mesh)
+    >>> m = mt.textures.flower(x, y, z, size=1e-9, splay=0.4)
+    >>> m[1, 1, 1]
+    array([0.1, 0.1, 1. ])
+
+    """
+    dz = (np.asarray(z) - center[2]) / size**2
+    mx = splay * (np.asarray(x) - center[0]) * dz
+    my = splay * (np.asarray(y) - center[1]) * dz
+    return _stack(mx, my, 1)
+
+
+def domain_wall(x, *, center=0, width, kind="bloch"):
+    r"""Domain wall between domains along :math:`-z` and :math:`+z`.
+
+    The profile is :math:`m_z = \tanh((x - x_0)/\Delta)` with the in-plane
+    component :math:`1/\cosh((x - x_0)/\Delta)` in the y-direction for a Bloch
+    wall and in the x-direction for a Néel wall. The wall normal is the direction
+    of the passed coordinate, which is called x here.
+
+    Parameters
+    ----------
+    x : array_like
+
+        Coordinates along the wall normal.
+
+    center : numbers.Real, optional
+
+        Position of the wall. Defaults to ``0``.
+
+    width : numbers.Real
+
+        Wall width parameter :math:`\Delta`.
+
+    kind : str, optional
+
+        ``'bloch'`` or ``'neel'``. Defaults to ``'bloch'``.
+
+    Returns
+    -------
+    numpy.ndarray
+
+        Normalised vector texture.
+
+    Raises
+    ------
+    ValueError
+
+        If ``kind`` is not known.
+
+    Examples
+    --------
+    1. Bloch wall.
+
+    >>> import discretisedfield as df
+    >>> import micromagnetictests as mt
+    ...
+    >>> mesh = df.Mesh(p1=(-5e-9, 0, 0), p2=(5e-9, 1e-9, 1e-9), n=(10, 1, 1))
+    >>> x, y, z = mt.textures.coordinates(mesh)
+    >>> m = mt.textures.domain_wall(x, width=1e-9)
+    >>> bool(m[0, 0, 0, 2] < -0.99), bool(m[-1, 0, 0, 2] > 0.99)
+    (True, True)
+
+    """
+    u = (np.asarray(x) - center) / width
+    transverse = 1 / np.cosh(u)
+    zero = np.zeros_like(u)
+    if kind == "bloch":
+        return _stack(zero, transverse, np.tanh(u))
+    elif kind == "neel":
+        return _stack(transverse, zero, np.tanh(u))
+    raise ValueError(f"Unknown domain wall {kind=}.")
+
+
+def skyrmion(x, y, *, center=(0, 0), radius, wall_width, helicity=0):
+    r"""Skyrmion with the core along :math:`-z` in a background along :math:`+z`.
+
+    The polar angle follows the profile :math:`\theta(r) = 2\arctan(\sinh(R/w) /
+    \sinh(r/w))`, which is :math:`\pi` at the centre and :math:`\pi/2` at the
+    radius :math:`R`. The in-plane component points along the azimuthal angle
+    rotated by the helicity.
+
+    Parameters
+    ----------
+    x, y : array_like
+
+        Coordinates.
+
+    center : array_like, optional
+
+        Centre of the skyrmion in the xy-plane. Defaults to ``(0, 0)``.
+
+    radius : numbers.Real
+
+        Radius :math:`R` at which :math:`m_z = 0`.
+
+    wall_width : numbers.Real
+
+        Width :math:`w` of the skyrmion wall.
+
+    helicity : numbers.Real, optional
+
+        Helicity in radians, ``0`` for a Néel and ``pi/2`` for a Bloch skyrmion.
+        Defaults to ``0``.
+
+    Returns
+    -------
+    numpy.ndarray
+
+        Normalised vector texture.
+
+    Examples
+    --------
+    1. Néel skyrmion.
+
+    >>> import discretisedfield as df
+    >>> import micromagnetictests as mt
+    ...
+    >>> mesh = df.Mesh(p1=(-50e-9, -50e-9, 0), p2=(50e-9, 50e-9, 1e-9), n=(50, 50, 1))
+    >>> x, y, z = mt.textures.coordinates(mesh)
+    >>> m = mt.textures.skyrmion(x, y, radius=10e-9, wall_width=2e-9)
+    >>> bool(m[25, 25, 0, 2] < -0.99), bool(m[0, 0, 0, 2] > 0.99)
+    (True, True)
+
+    """
+    x = np.asarray(x) - center[0]
+    y = np.asarray(y) - center[1]
+    r = np.hypot(x, y)
+    theta = 2 * np.arctan2(np.sinh(radius / wall_width), np.sinh(r / wall_width))
+    phi = np.arctan2(y, x) + helicity
+    return _stack(
+        np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi), np.cos(theta)
+    )
+
+
+def disk(x, y, *, center=(0, 0), radius):
+    """Mask of a disk in the xy-plane.
+
+    Parameters
+    ----------
+    x, y : array_like
+
+        Coordinates.
+
+    center : array_like, optional
+
+        Centre of the disk. Defaults to ``(0, 0)``.
+
+    radius : numbers.Real
+
+        Radius of the disk.
+
+    Returns
+    -------
+    numpy.ndarray
+
+        Boolean array, true for points within ``radius``.
+
+    Examples
+    --------
+    1. Saturation magnetisation of a disk.
+
+    >>> import discretisedfield as df
+    >>> import micromagnetictests as mt
+    ...
+    >>> mesh = df.Mesh(p1=(-5e-9, -5e-9, 0), p2=(5e-9, 5e-9, 1e-9), n=(10, 10, 1))
+    >>> x, y, z = mt.textures.coordinates(mesh)
+    >>> Ms = 8e5 * mt.textures.disk(x, y, radius=5e-9)
+    >>> m = df.Field(mesh, nvdim=3, value=(0, 0, 1), norm=Ms)
+    >>> int(mt.assertions.nonzero(m).sum())
+    80
+
+    """
+    return np.hypot(np.asarray(x) - center[0], np.asarray(y) - center[1]) <= radius
+
+
+def cylinder(x, y, z, *, center=(0, 0, 0), radius, height):
+    """Mask of a cylinder along the z-direction.
+
+    Parameters
+    ----------
+    x, y, z : array_like
+
+        Coordinates.
+
+    center : array_like, optional
+
+        Centre of the cylinder. Defaults to ``(0, 0, 0)``.
+
+    radius : numbers.Real
+
+        Radius of the cylinder.
+
+    height : numbers.Real
+
+        Height of the cylinder.
+
+    Returns
+    -------
+    numpy.ndarray
+
+        Boolean array, true for points inside the cylinder.
+
+    Examples
+    --------
+    1. Cylinder in the lower half of a box.
+
+    >>> import discretisedfield as df
+    >>> import micromagnetictests as mt
+    ...
+    >>> mesh = df.Mesh(p1=(-5e-9, -5e-9, 0), p2=(5e-9, 5e-9, 4e-9), n=(10, 10, 4))
+    >>> x, y, z = mt.textures.coordinates(mesh)
+    >>> mask = mt.textures.cylinder(x, y, z, center=(0, 0, 1e-9), radius=5e-9,
+    ...                             height=2e-9)
+    >>> int(mask.sum())
+    160
+
+    """
+    inside = disk(x, y, center=center[:2], radius=radius)
+    return inside & (np.abs(np.asarray(z) - center[2]) <= height / 2)